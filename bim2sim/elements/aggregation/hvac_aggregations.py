@@ -82,6 +82,8 @@ class HVACAggregationMixin(AggregationMixin):
         base_graph: networkx graph that should be searched for aggregations
         match_graph: networkx graph that only holds matches
     """
+    # element attributes find_matches depends on besides the graph structure
+    match_attributes: Tuple[str, ...] = ()
 
     def __init__(self, base_graph: nx.Graph, match_graph: nx.Graph, *args,
                  **kwargs):
@@ -275,6 +277,7 @@ class UnderfloorHeating(PipeStrand):
 
     The normal pitch (spacing) between pipes is typically between 0.1m and 0.2m.
     """
+    match_attributes = ('length', 'diameter')
 
     @classmethod
     def find_matches(cls, base_graph: HvacGraph
@@ -576,6 +579,7 @@ class ParallelPump(HVACAggregationMixin, hvac.Pump):
     """ Aggregates pumps in parallel."""
     aggregatable_classes = {hvac.Pump, hvac.Pipe, hvac.PipeFitting, PipeStrand}
     whitelist_classe = {hvac.Pump}
+    match_attributes = ('rated_power',)
 
     multi = ('rated_power', 'rated_height', 'rated_volume_flow', 'diameter',
              'diameter_strand', 'length')
@@ -0,0 +1,332 @@
+"""Search for aggregation matches in independent parts of a HvacGraph.
+
+Aggregations never span hydraulically independent circuits. The port graph is
+therefore split into its connected components and find_matches of an
+aggregation class is executed per component. This allows to
+
+* search the components in forked worker processes. As elements and ports
+  can't be pickled, the workers return matches and metas as references
+  (indices into the port and element lists of the graph) which are resolved
+  in the main process afterwards.
+* reuse the matches of components which did not change since the last run
+  (see MatchCache). There, the references are based on the guids of the
+  underlying IFC elements and ports, which are stable between runs.
+"""
+from __future__ import annotations
+
+import hashlib
+import logging
+import pickle
+from pathlib import Path
+from typing import Callable, List, Optional, Tuple, Type
+
+import networkx as nx
+
+from bim2sim.elements.base_elements import ProductBased
+from bim2sim.elements.graphs.hvac_graph import HvacGraph
+from bim2sim.elements.hvac_elements import HVACPort
+from bim2sim.utilities.parallel import can_fork, map_in_processes
+
+logger = logging.getLogger(__name__)
+
+# state inherited by forked worker processes
+_worker_state = {}
+
+
+class _Ref:
+    """Picklable reference to a port, element or match graph.
+
+    For ports and elements value is an identifier (index in the port or
+    element list or a stable key), for graphs it is the list of references to
+    the graphs ports.
+    """
+    __slots__ = ('kind', 'value')
+
+    def __init__(self, kind: str, value):
+        self.kind = kind
+        self.value = value
+
+
+class _Unresolvable(Exception):
+    """A reference can't be resolved in the current graph."""
+
+
+def get_component_graphs(graph: HvacGraph) -> List[HvacGraph]:
+    """Split graph into subgraphs of its connected components.
+
+    The components are ordered by the first occurrence of their ports in the
+    graph, which makes the order deterministic.
+
+    Args:
+        graph: the HVAC graph
+
+    Returns:
+        list of subgraph views, one for each connected component
+    """
+    return [graph.subgraph(component)
+            for component in nx.connected_components(graph)]
+
+
+def _encode(obj, port_ref: Callable, element_ref: Callable):
+    """Replace ports and elements in (nested) obj by references.
+
+    port_ref and element_ref return the identifier of a port or element or
+    None if the object should be kept as it is.
+    """
+    if isinstance(obj, HVACPort):
+        ref = port_ref(obj)
+        if ref is not None:
+            return _Ref('port', ref)
+    if isinstance(obj, ProductBased):
+        ref = element_ref(obj)
+        if ref is not None:
+            return _Ref('element', ref)
+    if isinstance(obj, HvacGraph):
+        return _Ref('graph', [_encode(node, port_ref, element_ref)
+                              for node in obj.nodes])
+    if isinstance(obj, dict):
+        return {_encode(k, port_ref, element_ref):
+                _encode(v, port_ref, element_ref) for k, v in obj.items()}
+    if isinstance(obj, (list, tuple, set, frozenset)):
+        return type(obj)(_encode(item, port_ref, element_ref) for item in obj)
+    return obj
+
+
+def _decode(obj, graph: HvacGraph, ports, elements):
+    """Resolve references created by _encode.
+
+    Raises:
+        _Unresolvable: if a reference is not found in ports or elements
+    """
+    if isinstance(obj, _Ref):
+        try:
+            if obj.kind == 'port':
+                return ports[obj.value]
+            if obj.kind == 'element':
+                return elements[obj.value]
+        except (KeyError, IndexError):
+            raise _Unresolvable(obj.value)
+        return graph.subgraph(
+            [_decode(node, graph, ports, elements) for node in obj.value])
+    if isinstance(obj, dict):
+        return {_decode(k, graph, ports, elements):
+                _decode(v, graph, ports, elements) for k, v in obj.items()}
+    if isinstance(obj, (list, tuple, set, frozenset)):
+        return type(obj)(
+            _decode(item, graph, ports, elements) for item in obj)
+    return obj
+
+
+def _rebase(obj, graph: HvacGraph):
+    """Replace the match graphs in (nested) obj by subgraph views of graph.
+
+    find_matches on the complete graph returns views of it, so matches found
+    in component copies, in worker processes or in the cache are all based on
+    the searched graph as well.
+    """
+    keep = lambda obj: None
+    return _decode(_encode(obj, keep, keep), graph, None, None)
+
+
+def _find_matches_in_component(index: int):
+    """Worker function executed in forked process for one component."""
+    agg_class = _worker_state['agg_class']
+    component = _worker_state['components'][index]
+    port_ids = _worker_state['port_ids']
+    element_ids = _worker_state['element_ids']
+    matches, metas = agg_class.find_matches(component.copy())
+    port_ref = lambda port: port_ids.get(id(port))
+    element_ref = lambda ele: element_ids.get(id(ele))
+    return (_encode(list(matches), port_ref, element_ref),
+            _encode(list(metas), port_ref, element_ref))
+
+
+def _search_components(agg_class: Type, graph: HvacGraph,
+                       components: List[HvacGraph], processes: int
+                       ) -> List[Tuple[list, list]]:
+    """Run find_matches for each of the components.
+
+    Returns:
+        list with a tuple of matches and metas for each component
+    """
+    if processes <= 1 or len(components) < 2 or not can_fork():
+        return [_rebase(tuple(map(list, agg_class.find_matches(
+                    component.copy()))), graph)
+                for component in components]
+
+    ports = list(graph.nodes)
+    elements = graph.elements
+    _worker_state.update(
+        agg_class=agg_class,
+        components=components,
+        port_ids={id(port): i for i, port in enumerate(ports)},
+        element_ids={id(ele): i for i, ele in enumerate(elements)},
+    )
+    try:
+        results = map_in_processes(
+            _find_matches_in_component, range(len(components)), processes,
+            fork=True)
+    finally:
+        _worker_state.clear()
+    return [(_decode(encoded_matches, graph, ports, elements),
+             _decode(encoded_metas, graph, ports, elements))
+            for encoded_matches, encoded_metas in results]
+
+
+def find_matches_per_component(
+        agg_class: Type, graph: HvacGraph, processes: int = 1,
+        cache: MatchCache = None) -> Tuple[List[nx.Graph], List[dict]]:
+    """Find matches of an aggregation class separately for each component.
+
+    Components with an entry in cache reuse the stored matches, all other
+    components are searched (in parallel if possible). Without cache and if
+    parallel execution is not possible (only one process requested, only
+    one component or no fork support) find_matches is executed on the
+    complete graph as before.
+
+    Args:
+        agg_class: aggregation class with find_matches method
+        graph: the HVAC graph to search in
+        processes: maximum number of worker processes
+        cache: MatchCache to reuse the matches of unchanged components
+
+    Returns:
+        matches and metas in the same format as agg_class.find_matches,
+        ordered by component
+    """
+    processes = int(processes or 1)
+    if cache is None:
+        components = get_component_graphs(graph) \
+            if processes > 1 and can_fork() else []
+        if len(components) < 2:
+            return agg_class.find_matches(graph)
+    else:
+        components = get_component_graphs(graph)
+
+    results = [None] * len(components)
+    if cache is not None:
+        results = [cache.get(agg_class, component)
+                   for component in components]
+        results = [_rebase(result, graph) if result is not None else None
+                   for result in results]
+    missing = [i for i, result in enumerate(results) if result is None]
+    searched = _search_components(
+        agg_class, graph, [components[i] for i in missing], processes)
+    for i, result in zip(missing, searched):
+        results[i] = result
+        if cache is not None:
+            cache.put(agg_class, components[i], result)
+
+    matches = []
+    metas = []
+    for component_matches, component_metas in results:
+        matches.extend(component_matches)
+        metas.extend(component_metas)
+    logger.info("Searched %d of %d independent parts of the network for %s",
+                len(missing), len(components), agg_class.__name__)
+    return matches, metas
+
+
+class MatchCache:
+    """Persistent cache of aggregation matches per network component.
+
+    A component is identified by a fingerprint of the aggregation class, the
+    classes and IFC guids of its elements, the positions of its ports, its
+    connections and the values of the aggregation's match_attributes.
+    Matches and metas are stored with references to IFC guids, so they can
+    be resolved in the graph of the next run. Components which changed since the last run (e.g. due to a
+    different decision) get a new fingerprint and are searched again, all
+    others reuse the stored matches.
+
+    Args:
+        path: pickle file the cache is loaded from and saved to
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self._entries = {}
+        self._used = {}
+        self.hits = 0
+        self.misses = 0
+
+    def load(self):
+        """Load entries of the previous run, a broken cache is ignored."""
+        if not self.path.is_file():
+            return
+        try:
+            with open(self.path, 'rb') as f:
+                self._entries = pickle.load(f)
+        except Exception as ex:
+            logger.warning("Unable to load aggregation cache %s (%s)",
+                           self.path, ex)
+            self._entries = {}
+
+    def save(self):
+        """Save the entries used in the current run."""
+        try:
+            with open(self.path, 'wb') as f:
+                pickle.dump(self._used, f)
+        except Exception as ex:
+            logger.warning("Unable to save aggregation cache %s (%s)",
+                           self.path, ex)
+
+    @staticmethod
+    def element_key(element: ProductBased) -> frozenset:
+        """Stable key of element based on guids of the original elements."""
+        if hasattr(element, 'elements'):
+            return frozenset(guid for ele in element.elements
+                             for guid in MatchCache.element_key(ele))
+        return frozenset((element.guid,))
+
+    @staticmethod
+    def port_key(port: HVACPort) -> frozenset:
+        """Stable key of port based on guids of the original ports."""
+        if hasattr(port, 'originals'):
+            return frozenset(guid for original in port.originals
+                             for guid in MatchCache.port_key(original))
+        return frozenset((port.guid,))
+
+    def fingerprint(self, agg_class: Type, component: HvacGraph) -> str:
+        """Hash of everything find_matches of agg_class depends on."""
+        attributes = getattr(agg_class, 'match_attributes', ())
+        elements = sorted(
+            (type(ele).__name__, sorted(self.element_key(ele)),
+             [str(getattr(ele, name, None)) for name in attributes])
+            for ele in component.elements)
+        ports = sorted(
+            (sorted(self.port_key(port)), str(getattr(port, 'position', None)))
+            for port in component.nodes)
+        edges = sorted(
+            sorted((sorted(self.port_key(port0)), sorted(self.port_key(port1))))
+            for port0, port1 in component.edges)
+        content = repr((agg_class.__name__, elements, ports, edges))
+        return hashlib.sha1(content.encode()).hexdigest()
+
+    def get(self, agg_class: Type, component: HvacGraph
+            ) -> Optional[Tuple[list, list]]:
+        """Get matches and metas of component if it did not change."""
+        key = self.fingerprint(agg_class, component)
+        entry = self._entries.get(key)
+        if entry is not None:
+            ports = {self.port_key(port): port for port in component.nodes}
+            elements = {self.element_key(ele): ele
+                        for ele in component.elements}
+            try:
+                result = (_decode(entry[0], component, ports, elements),
+                          _decode(entry[1], component, ports, elements))
+            except _Unresolvable:
+                pass
+            else:
+                self._used[key] = entry
+                self.hits += 1
+                return result
+        self.misses += 1
+        return None
+
+    def put(self, agg_class: Type, component: HvacGraph,
+            result: Tuple[list, list]):
+        """Store matches and metas found for component."""
+        key = self.fingerprint(agg_class, component)
+        self._used[key] = (
+            _encode(list(result[0]), self.port_key, self.element_key),
+            _encode(list(result[1]), self.port_key, self.element_key))
@@ -5,7 +5,6 @@ from json import JSONEncoder
 from typing import Union, Iterable, Dict, List, Tuple, Type, Optional, Any
 
 import numpy as np
-import ifcopenshell.geom
 from ifcopenshell import guid
 
 from bim2sim.elements.aggregation import AggregationMixin
@@ -17,12 +16,13 @@ from bim2sim.elements.mapping.units import ureg
 from bim2sim.utilities.common_functions import angle_equivalent, vector_angle, \
     remove_umlaut
 from bim2sim.utilities.pyocc_tools import PyOCCTools
+from bim2sim.utilities.geometry_service import create_shape, get_settings
+from bim2sim.utilities.shape_cache import cached_shape, get_shape_profile
 from bim2sim.utilities.types import IFCDomain, AttributeDataSource
 
 logger = logging.getLogger(__name__)
 quality_logger = logging.getLogger('bim2sim.QualityReport')
-settings_products = ifcopenshell.geom.main.settings()
-settings_products.set(settings_products.USE_PYTHON_OPENCASCADE, True)
+settings_products = get_settings('product_shape')
 
 
 class ElementError(Exception):
@@ -549,8 +549,11 @@ class ProductBased(IFCBased):
         """Calculate the product shape based on IfcProduct representation."""
         if hasattr(self.ifc, 'Representation'):
             try:
-                shape = ifcopenshell.geom.create_shape(
-                            settings_products, self.ifc).geometry
+                shape = cached_shape(
+                    self.ifc,
+                    get_shape_profile('product_shape', settings_products),
+                    lambda: create_shape(
+                        self.ifc, 'product_shape').geometry)
                 return shape
             except:
                 logger.warning(f"No calculation of product shape possible "
@@ -562,8 +565,11 @@ class ProductBased(IFCBased):
         #  https://wiki.osarch.org/index.php?title=IfcOpenShell_code_examples
         if hasattr(self.ifc, 'Representation'):
             try:
-                shape = ifcopenshell.geom.create_shape(
-                            settings_products, self.ifc).geometry
+                shape = cached_shape(
+                    self.ifc,
+                    get_shape_profile('product_shape', settings_products),
+                    lambda: create_shape(
+                        self.ifc, 'product_shape').geometry)
                 vol = PyOCCTools.get_shape_volume(shape)
                 vol = vol * ureg.meter ** 3
                 return vol
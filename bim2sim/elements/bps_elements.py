@@ -10,24 +10,23 @@ from typing import Set, List, Union
 import ifcopenshell
 import ifcopenshell.geom
 from OCC.Core.BRepBndLib import brepbndlib_Add
-from OCC.Core.BRepBuilderAPI import BRepBuilderAPI_Transform
 from OCC.Core.BRepExtrema import BRepExtrema_DistShapeShape
-from OCC.Core.BRepGProp import brepgprop_SurfaceProperties
-from OCC.Core.BRepLib import BRepLib_FuseEdges
 from OCC.Core.Bnd import Bnd_Box
 from OCC.Core.Extrema import Extrema_ExtFlag_MIN
-from OCC.Core.GProp import GProp_GProps
-from OCC.Core.ShapeUpgrade import ShapeUpgrade_UnifySameDomain
-from OCC.Core.gp import gp_Trsf, gp_Vec, gp_XYZ, gp_Pnt, \
-    gp_Mat, gp_Quaternion
+from OCC.Core.gp import gp_XYZ, gp_Pnt
 from ifcopenshell import guid
 
 from bim2sim.elements.mapping import condition, attribute
 from bim2sim.elements.base_elements import ProductBased, RelationBased
 from bim2sim.elements.mapping.units import ureg
-from bim2sim.tasks.common.inner_loop_remover import remove_inner_loops
+from bim2sim.utilities.bound_index import SpaceBoundaryIndex
 from bim2sim.utilities.common_functions import vector_angle, angle_equivalent
+from bim2sim.utilities.geometry import get_space_shape_settings, \
+    get_bound_shape_settings, calc_bound_shape
+from bim2sim.utilities.geometry_service import create_shape
+from bim2sim.utilities.shape_cache import cached_shape, get_shape_profile
 from bim2sim.utilities.pyocc_tools import PyOCCTools
+from bim2sim.utilities.shape_data import shape_data_cache
 from bim2sim.utilities.types import IFCDomain, BoundaryOrientation
 
 logger = logging.getLogger(__name__)
@@ -232,13 +231,14 @@ class ThermalZone(BPSProduct):
         return neighbors
 
     def _get_space_shape(self, name):
-        """returns topods shape of the IfcSpace"""
-        settings = ifcopenshell.geom.main.settings()
-        settings.set(settings.USE_PYTHON_OPENCASCADE, True)
-        settings.set(settings.USE_WORLD_COORDS, True)
-        settings.set(settings.EXCLUDE_SOLIDS_AND_SURFACES, False)
-        settings.set(settings.INCLUDE_CURVES, True)
-        return ifcopenshell.geom.create_shape(settings, self.ifc).geometry
+        """returns topods shape of the IfcSpace
+
+        For many zones prefer bim2sim.utilities.geometry.prefetch_space_shapes
+        which creates the shapes of all zones at once."""
+        return cached_shape(
+            self.ifc,
+            get_shape_profile('space_shape', get_space_shape_settings()),
+            lambda: create_shape(self.ifc, 'space_shape').geometry)
 
     def _get_space_center(self, name) -> float:
         """
@@ -671,10 +671,27 @@ class ExternalSpatialElement(ThermalZone):
     }
 
 
+class ShapeAttribute(attribute.Attribute):
+    """Attribute holding a shape.
+
+    Replacing the shape invalidates the cached data derived from the
+    replaced shape, see bim2sim.utilities.shape_data, and the spatial index
+    of the space boundaries of bind, see SpaceBoundaryIndex."""
+
+    def __set__(self, bind, value):
+        old_shape = self._inner_get(bind)[0]
+        super().__set__(bind, value)
+        shape_data_cache.invalidate(old_shape)
+        bound_index = getattr(bind, 'bound_index', None)
+        if bound_index is not None:
+            bound_index.invalidate()
+
+
 class SpaceBoundary(RelationBased):
     ifc_types = {'IfcRelSpaceBoundary': ['*']}
 
-    def __init__(self, *args, elements: dict, **kwargs):
+    def __init__(self, *args, elements: dict,
+                 bound_index: SpaceBoundaryIndex = None, **kwargs):
         """spaceboundary __init__ function"""
         super().__init__(*args, **kwargs)
         self.disaggregation = []
@@ -682,6 +699,7 @@ class SpaceBoundary(RelationBased):
         self.disagg_parent = None
         self.bound_thermal_zone = None
         self._elements = elements
+        self.bound_index = bound_index
         self.parent_bound = None
         self.opening_bounds = []
 
@@ -711,9 +729,7 @@ class SpaceBoundary(RelationBased):
 
     def get_bound_area(self, name) -> ureg.Quantity:
         """compute area of a space boundary"""
-        bound_prop = GProp_GProps()
-        brepgprop_SurfaceProperties(self.bound_shape, bound_prop)
-        area = bound_prop.Mass()
+        area = PyOCCTools.get_shape_area(self.bound_shape)
         return area * ureg.meter ** 2
 
     bound_area = attribute.Attribute(
@@ -752,9 +768,7 @@ class SpaceBoundary(RelationBased):
 
     def _get_bound_center(self, name):
         """ compute center of the bounding box of a space boundary"""
-        p = GProp_GProps()
-        brepgprop_SurfaceProperties(self.bound_shape, p)
-        return p.CentreOfMass().XYZ()
+        return PyOCCTools.get_center_of_face(self.bound_shape).XYZ()
 
     def _get_related_bound(self, name):
         """
@@ -804,9 +818,14 @@ class SpaceBoundary(RelationBased):
                 corr_bound = None
                 # cover virtual space boundaries without related IfcVirtualElement
                 if not self.ifc.RelatedBuildingElement:
-                    vbs = [b for b in self._elements.values() if
-                           isinstance(b, SpaceBoundary) and not
-                           b.ifc.RelatedBuildingElement]
+                    if self.bound_index is not None:
+                        # only bounds within the maximum center distance
+                        vbs = self.bound_index.query_virtual(
+                            self, math.sqrt(0.5))
+                    else:
+                        vbs = [b for b in self._elements.values() if
+                               isinstance(b, SpaceBoundary) and not
+                               b.ifc.RelatedBuildingElement]
                     for b in vbs:
                         if b is self:
                             continue
@@ -907,97 +926,22 @@ class SpaceBoundary(RelationBased):
         return self.ifc.PhysicalOrVirtualBoundary.lower() == 'physical'
 
     def _get_bound_shape(self, name):
-        settings = ifcopenshell.geom.settings()
-        settings.set(settings.USE_PYTHON_OPENCASCADE, True)
-        settings.set(settings.USE_WORLD_COORDS, True)
-        settings.set(settings.EXCLUDE_SOLIDS_AND_SURFACES, False)
-        settings.set(settings.INCLUDE_CURVES, True)
-
-        # check if the space boundary shapes need a unit conversion (i.e.,
-        # an additional transformation to the correct size and position)
-        length_unit = self.ifc_units.get('IfcLengthMeasure'.lower())
-        conv_required = length_unit != ureg.meter
-
-        try:
-            sore = self.ifc.ConnectionGeometry.SurfaceOnRelatingElement
-            # if sore.get_info()["InnerBoundaries"] is None:
-            shape = ifcopenshell.geom.create_shape(settings, sore)
-
-            if sore.InnerBoundaries:
-                # shape = remove_inner_loops(shape)  # todo: return None if not horizontal shape
-                # if not shape:
-                if self.bound_element.ifc.is_a(
-                        'IfcWall'):  # todo: remove this hotfix (generalize)
-                    ifc_new = ifcopenshell.file()
-                    temp_sore = ifc_new.create_entity('IfcCurveBoundedPlane',
-                                                      OuterBoundary=sore.OuterBoundary,
-                                                      BasisSurface=sore.BasisSurface)
-                    temp_sore.InnerBoundaries = ()
-                    shape = ifcopenshell.geom.create_shape(settings, temp_sore)
-                else:
-                    shape = remove_inner_loops(shape)
-            if not (sore.InnerBoundaries and not self.bound_element.ifc.is_a(
-                    'IfcWall')):
-                faces = PyOCCTools.get_faces_from_shape(shape)
-                if len(faces) > 1:
-                    unify = ShapeUpgrade_UnifySameDomain()
-                    unify.Initialize(shape)
-                    unify.Build()
-                    shape = unify.Shape()
-                    faces = PyOCCTools.get_faces_from_shape(shape)
-                face = faces[0]
-                face = PyOCCTools.remove_coincident_and_collinear_points_from_face(
-                    face)
-                shape = face
-        except:
-            try:
-                sore = self.ifc.ConnectionGeometry.SurfaceOnRelatingElement
-                ifc_new = ifcopenshell.file()
-                temp_sore = ifc_new.create_entity('IfcCurveBoundedPlane',
-                                                  OuterBoundary=sore.OuterBoundary,
-                                                  BasisSurface=sore.BasisSurface)
-                temp_sore.InnerBoundaries = ()
-                shape = ifcopenshell.geom.create_shape(settings, temp_sore)
-            except:
-                poly = self.ifc.ConnectionGeometry.SurfaceOnRelatingElement.OuterBoundary.Points
-                pnts = []
-                for p in poly:
-                    p.Coordinates = (p.Coordinates[0], p.Coordinates[1], 0.0)
-                    pnts.append((p.Coordinates[:]))
-                shape = PyOCCTools.make_faces_from_pnts(pnts)
-        shape = BRepLib_FuseEdges(shape).Shape()
-
-        if conv_required:
-            # scale newly created shape of space boundary to correct size
-            conv_factor = (1 * length_unit).to(
-                ureg.metre).m
-            # shape scaling seems to be covered by ifcopenshell, obsolete
-            # shape = PyOCCTools.scale_shape(shape, conv_factor, gp_Pnt(0, 0,
-            # 0))
-
-        if self.ifc.RelatingSpace.ObjectPlacement:
-            lp = PyOCCTools.local_placement(
-                self.ifc.RelatingSpace.ObjectPlacement).tolist()
-            # transform newly created shape of space boundary to correct
-            # position if a unit conversion is required.
-            if conv_required:
-                for i in range(len(lp)):
-                    for j in range(len(lp[i])):
-                        coord = lp[i][j] * length_unit
-                        lp[i][j] = coord.to(ureg.meter).m
-            mat = gp_Mat(lp[0][0], lp[0][1], lp[0][2], lp[1][0], lp[1][1],
-                         lp[1][2], lp[2][0], lp[2][1], lp[2][2])
-            vec = gp_Vec(lp[0][3], lp[1][3], lp[2][3])
-            trsf = gp_Trsf()
-            trsf.SetTransformation(gp_Quaternion(mat), vec)
-            shape = BRepBuilderAPI_Transform(shape, trsf).Shape()
-
-        # shape = shape.Reversed()
-        unify = ShapeUpgrade_UnifySameDomain()
-        unify.Initialize(shape)
-        unify.Build()
-        shape = unify.Shape()
+        """returns topods shape of the space boundary
 
+        For many space boundaries prefer
+        bim2sim.utilities.geometry.prefetch_bound_shapes which creates the
+        shapes in parallel worker processes."""
+        length_unit = self.ifc_units.get('IfcLengthMeasure'.lower())
+        bound_element_ifc = self.bound_element.ifc \
+            if self.bound_element is not None else None
+        shape = cached_shape(
+            self.ifc,
+            get_shape_profile('bound_shape', get_bound_shape_settings()),
+            lambda: calc_bound_shape(self.ifc, length_unit, bound_element_ifc))
+        return self.finish_bound_shape(shape)
+
+    def finish_bound_shape(self, shape):
+        """Final step of bound shape creation depending on bound element."""
         if self.bound_element is not None:
             bi = self.bound_element
             if not hasattr(bi, "related_openings"):
@@ -1047,7 +991,7 @@ class SpaceBoundary(RelationBased):
         functions=[_get_is_external]
     )
 
-    bound_shape = attribute.Attribute(
+    bound_shape = ShapeAttribute(
         description="Bound shape element of the SB.",
         functions=[_get_bound_shape]
     )
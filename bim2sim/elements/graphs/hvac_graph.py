@@ -5,16 +5,20 @@ from __future__ import annotations
 
 import itertools
 import logging
-import os
-import shutil
 from pathlib import Path
-from typing import Set, Iterable, Type, List, Union
+from collections import deque
+from typing import Set, Iterable, Type, List, Union, Iterator, Tuple, \
+    Dict, TYPE_CHECKING
 import json
 
 import networkx as nx
 from networkx import json_graph
 
 from bim2sim.elements.base_elements import ProductBased, ElementEncoder
+from bim2sim.elements.graphs.plotting import prepare_plot_data, render_plot
+
+if TYPE_CHECKING:
+    from bim2sim.elements.hvac_elements import HVACPort
 
 logger = logging.getLogger(__name__)
 
@@ -186,9 +190,12 @@ class HvacGraph(nx.Graph):
     #     return list(self.nodes)
 
     def plot(self, path: Path = None, ports: bool = False, dpi: int = 400,
-             use_pyvis=False):
+             use_pyvis=False, max_nodes: int = None):
         """Plot graph and either display or save as pdf file.
 
+        Rendering is delegated to the plotting module. Use
+        plotting.GraphPlotter to render plots in a background process.
+
         Args:
             path: If provided, the graph is saved there as pdf file or html
              if use_pyvis=True.
@@ -196,162 +203,11 @@ class HvacGraph(nx.Graph):
             dpi: dots per inch, increase for higher quality (takes longer to
              render)
             use_pyvis: exports graph to interactive html
+            max_nodes: maximum number of plotted nodes, larger graphs are
+             sampled
         """
-        # importing matplotlib is slow and plotting is optional
-        import matplotlib.pyplot as plt
-        from pyvis.network import Network
-
-        # https://plot.ly/python/network-graphs/
-        edge_colors_flow_side = {
-            1: dict(edge_color='red'),
-            -1: dict(edge_color='blue'),
-            0: dict(edge_color='grey'),
-            None: dict(edge_color='grey'),
-        }
-        node_colors_flow_direction = {
-            1: dict(node_color='white', edgecolors='blue'),
-            -1: dict(node_color='blue', edgecolors='black'),
-            0: dict(node_color='grey', edgecolors='black'),
-            None: dict(node_color='grey', edgecolors='black'),
-        }
-
-        kwargs = {}
-        if ports:
-            # set port (nodes) colors based on flow direction
-            graph = self
-            kwargs['node_color'] = [
-                node_colors_flow_direction[
-                    port.flow_direction]['node_color'] for port in self]
-            kwargs['edgecolors'] = [
-                node_colors_flow_direction[
-                    port.flow_direction]['edgecolors'] for port in self]
-            kwargs['edge_color'] = 'grey'
-        else:
-            kwargs['node_color'] = 'blue'
-            kwargs['edgecolors'] = 'black'
-            # set connection colors (edges) based on flow side
-            graph = self.element_graph
-            edge_color_map = []
-            for edge in graph.edges:
-                sides0 = {port.flow_side for port in edge[0].ports}
-                sides1 = {port.flow_side for port in edge[1].ports}
-                side = None
-                # element with multiple sides is usually a consumer / generator
-                # (or result of conflicts) hence side of definite element is
-                # used
-                if len(sides0) == 1:
-                    side = sides0.pop()
-                elif len(sides1) == 1:
-                    side = sides1.pop()
-                edge_color_map.append(edge_colors_flow_side[side]['edge_color'])
-            kwargs['edge_color'] = edge_color_map
-        if use_pyvis:
-            # convert all edges to strings to use dynamic plotting via pyvis
-            graph_cp = graph.copy()
-            nodes = graph_cp.nodes()
-            replace = {}
-            for node in nodes.keys():
-                # use guid because str must be unique to prevent overrides
-                replace[node] = str(node) + ' ' + str(node.guid)
-
-            # Todo Remove temp code. This is for Abschlussbericht Plotting only!
-            # start of temp plotting code
-            bypass_nodes_guids = []
-            small_pump_guids = []
-            parallel_pump_guids = []
-            for node in nodes:
-                try:
-                    if node.length.m == 34:
-                        bypass_nodes_guids.append(node.guid)
-                except AttributeError:
-                    pass
-                try:
-                    if node.rated_power.m == 0.6:
-                        small_pump_guids.append(node.guid)
-                except AttributeError:
-                    pass
-                try:
-                    if node.rated_power.m == 1:
-                        parallel_pump_guids.append(node.guid)
-                except AttributeError:
-                    pass
-            # end of temp plotting code
-
-            nx.relabel_nodes(graph_cp, replace, copy=False)
-            net = Network(height='1000', width='1000', notebook=False,
-                          bgcolor='white', font_color='black', layout=False)
-            net.barnes_hut(gravity=-17000, spring_length=55)
-            # net.show_buttons()
-            pyvis_json = Path(__file__).parent.parent.parent / \
-                'assets/configs/pyvis/pyvis_options.json'
-            f = open(pyvis_json)
-            net.options = json.load(f)
-
-            net.from_nx(graph_cp, default_node_size=50)
-            for node in net.nodes:
-                try:
-                    node['label'] = node['label'].split('<')[1]
-                except:
-                    pass
-                node['label'] = node['label'].split('(ports')[0]
-                if 'agg' in node['label'].lower():
-                    node['label'] = node['label'].split('Agg0')[0]
-                if 'storage' in node['label'].lower():
-                    node['color'] = 'purple'
-                if 'distributor' in node['label'].lower():
-                    node['color'] = 'gray'
-                if 'pump' in node['label'].lower():
-                    node['color'] = 'blue'
-                if 'spaceheater' in node['label'].lower():
-                    node['color'] = 'purple'
-                if 'pipestrand' in node['label'].lower():
-                    node['color'] = 'blue'
-                if any([ele in node['label'].lower() for ele in [
-                    'parallelpump',
-                    'boiler',
-                    'generatoronefluid',
-                    'heatpump',
-                ]]):
-                    node['color'] = 'yellow'
-                # bypass color for parallelpump test
-                if node['id'].split('> ')[-1] in bypass_nodes_guids:
-                    node['color'] = 'green'
-                if node['id'].split('> ')[-1] in small_pump_guids:
-                    node['color'] = 'purple'
-                if node['id'].split('> ')[-1] in parallel_pump_guids:
-                    node['color'] = 'red'
-
-        else:
-            plt.figure(dpi=dpi)
-            nx.draw(graph, node_size=10, font_size=5, linewidths=0.5, alpha=0.7,
-                    with_labels=True, **kwargs)
-            plt.draw()
-        if path:
-            if use_pyvis:
-                name = "%s_graph_pyvis.html" % ("port" if ports else "element")
-                try:
-                    net.save_graph(name)
-                    shutil.move(name, path)
-                except Exception as ex:
-                    logger.error("Unable to save plot of graph (%s)", ex)
-            else:
-                name = "%s_graph.pdf" % ("port" if ports else "element")
-                try:
-                    plt.savefig(
-                        os.path.join(path, name),
-                        bbox_inches='tight')
-                except IOError as ex:
-                    logger.error("Unable to save plot of graph (%s)", ex)
-        else:
-            if use_pyvis:
-                name = "graph.html"
-                try:
-                    net.show(name)
-                except Exception as ex:
-                    logger.error("Unable to show plot of graph (%s)", ex)
-            else:
-                plt.show()
-        plt.clf()
+        data = prepare_plot_data(self, ports, use_pyvis, max_nodes)
+        render_plot(data, path, dpi)
 
     def dump_to_cytoscape_json(self, path: Path, ports: bool = True):
         """Dumps the current state of the graph to a json file in cytoscape
@@ -654,88 +510,107 @@ class HvacGraph(nx.Graph):
                 graphs.append(_graph)
         return graphs
 
-    def recurse_set_side(self, port, side, known: dict = None,
-                         raise_error=True):
-        """Recursive set flow_side to connected ports"""
-        if known is None:
-            known = {}
-
-        # set side suggestion
-        is_known = port in known
-        current_side = known.get(port, port.flow_side)
-        if not is_known:
-            known[port] = side
-        elif is_known and current_side == side:
-            return known
-        else:
-            # conflict
-            if raise_error:
-                raise AssertionError("Conflicting flow_side in %r" % port)
-            else:
-                logger.error("Conflicting flow_side in %r", port)
-                known[port] = None
-                return known
+    def get_side_neighbors(self, port) -> Iterator[Tuple[HVACPort, int]]:
+        """Yields neighbours of port together with a flow side factor.
 
-        # call neighbours
+        The factor is -1 if the connection to the neighbour is an inner
+        connection of a consumer or generator, as the flow side switches
+        there, and 1 otherwise.
+        """
         for neigh in self.neighbors(port):
             if (neigh.parent.is_consumer() or neigh.parent.is_generator()) \
                     and port.parent is neigh.parent:
-                # switch flag over consumers / generators
-                self.recurse_set_side(neigh, -side, known, raise_error)
+                yield neigh, -1
             else:
-                self.recurse_set_side(neigh, side, known, raise_error)
+                yield neigh, 1
+
+    def propagate_side(self, port, side, known: dict = None,
+                       raise_error=True) -> dict:
+        """Propagate flow_side suggestion from port to all connected ports.
 
+        Breadth-first search over the port graph which switches the side over
+        consumers and generators.
+
+        Args:
+            port: port to start from
+            side: flow_side suggestion for port
+            known: already known suggestions, updated in place
+            raise_error: raise AssertionError on conflicting suggestions,
+                else the conflicting port is suggested with None
+
+        Returns:
+            dict with ports as keys and suggested flow_side as values
+        """
+        if known is None:
+            known = {}
+        queue = deque([(port, side)])
+        while queue:
+            port, side = queue.popleft()
+            if port in known:
+                if known[port] == side or known[port] is None:
+                    continue
+                # conflict
+                if raise_error:
+                    raise AssertionError("Conflicting flow_side in %r" % port)
+                logger.error("Conflicting flow_side in %r", port)
+                known[port] = None
+                continue
+            known[port] = side
+            for neigh, factor in self.get_side_neighbors(port):
+                queue.append((neigh, side * factor))
         return known
 
-    def recurse_set_unknown_sides(self, port, visited: list = None,
-                                  masters: list = None):
-        """Recursive checks neighbours flow_side.
-        :returns tuple of
-            common flow_side (None if conflict)
-            list of checked ports
-            list of ports on which flow_side s are determined"""
-
-        if visited is None:
-            visited = []
-        if masters is None:
-            masters = []
-
-        # mark as visited to prevent deadloops
-        visited.append(port)
-
-        if port.flow_side in (-1, 1):
-            # use port with known flow_side as master
-            masters.append(port)
-            return port.flow_side, visited, masters
-
-        # call neighbours
-        neighbour_sides = {}
-        for neigh in self.neighbors(port):
-            if neigh not in visited:
-                if (neigh.parent.is_consumer() or neigh.parent.is_generator()) \
-                        and port.parent is neigh.parent:
-                    # switch flag over consumers / generators
-                    side, _, _ = self.recurse_set_unknown_sides(
-                        neigh, visited, masters)
-                    side = -side
-                else:
-                    side, _, _ = self.recurse_set_unknown_sides(
-                        neigh, visited, masters)
-                neighbour_sides[neigh] = side
-
-        sides = set(neighbour_sides.values())
-        if not sides:
-            return port.flow_side, visited, masters
-        elif len(sides) == 1:
-            # all neighbours have same site
-            side = sides.pop()
-            return side, visited, masters
-        elif len(sides) == 2 and 0 in sides:
-            side = (sides - {0}).pop()
-            return side, visited, masters
-        else:
-            # conflict
-            return None, visited, masters
+    def propagate_flow_sides(self) -> Tuple[Dict[HVACPort, int],
+                                            List[Tuple[list, list]]]:
+        """Determine flow_side for all ports with unknown flow_side.
+
+        Connected ports with unknown flow_side form a region which is
+        traversed once by breadth-first search, storing the relative side
+        (switched over consumers and generators) of every port to the first
+        port of the region. Adjacent ports with known flow_side (masters)
+        then determine the side of the whole region. This runs in
+        O(V + E) for the whole graph.
+
+        Returns:
+            sides: dict with ports whose flow_side could be determined as
+                keys and the determined flow_side as values.
+            conflicts: list of tuples (ports, masters) for regions whose
+                masters suggest different sides.
+            Regions without any master are neither in sides nor in
+            conflicts.
+        """
+        sides = {}
+        conflicts = []
+        visited = set()
+        for start in self.nodes:
+            if start in visited or start.flow_side in (-1, 1) \
+                    or not self[start]:
+                continue
+            visited.add(start)
+            relative = {start: 1}
+            region = [start]
+            masters = {}
+            suggested = set()
+            queue = deque([start])
+            while queue:
+                port = queue.popleft()
+                for neigh, factor in self.get_side_neighbors(port):
+                    if neigh.flow_side in (-1, 1):
+                        masters[neigh] = None
+                        suggested.add(
+                            neigh.flow_side * factor * relative[port])
+                    elif neigh not in visited:
+                        visited.add(neigh)
+                        relative[neigh] = relative[port] * factor
+                        region.append(neigh)
+                        queue.append(neigh)
+            if len(suggested) == 1:
+                side = suggested.pop()
+                for port in region:
+                    sides[port] = side * relative[port]
+            elif len(suggested) > 1:
+                conflicts.append((region, list(masters)))
+        return sides, conflicts
 
     @staticmethod
     def get_dir_paths_between(graph, nodes, include_edges=False):
@@ -0,0 +1,347 @@
+"""Plotting of HvacGraphs decoupled from the graph itself.
+
+A plot is created in two steps. First the graph is converted into a plain
+networkx graph holding only strings and colors (see `prepare_plot_data`).
+This happens in the main process, as only there the elements and ports are
+available. The resulting `GraphPlotData` is picklable and can be rendered
+with `render_plot` either directly or in a background process, which keeps
+matplotlib and pyvis off the critical path of the task pipeline.
+"""
+from __future__ import annotations
+
+import json
+import logging
+import os
+import shutil
+from concurrent.futures import Future, ProcessPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import TYPE_CHECKING, List, Optional
+
+import networkx as nx
+
+if TYPE_CHECKING:
+    from bim2sim.elements.graphs.hvac_graph import HvacGraph
+
+logger = logging.getLogger(__name__)
+
+EDGE_COLORS_FLOW_SIDE = {
+    1: 'red',
+    -1: 'blue',
+    0: 'grey',
+    None: 'grey',
+}
+NODE_COLORS_FLOW_DIRECTION = {
+    1: dict(node_color='white', edgecolors='blue'),
+    -1: dict(node_color='blue', edgecolors='black'),
+    0: dict(node_color='grey', edgecolors='black'),
+    None: dict(node_color='grey', edgecolors='black'),
+}
+
+
+@dataclass
+class GraphPlotData:
+    """Picklable representation of a HvacGraph plot.
+
+    Args:
+        graph: graph with unique string ids as nodes. Nodes hold the
+            attributes 'label', 'node_color' and 'edgecolors', edges hold the
+            attribute 'edge_color'.
+        ports: True if graph represents the port graph, False for the
+            element graph.
+        use_pyvis: render an interactive html instead of a pdf
+        highlights: node ids with a special color in pyvis plots
+        n_nodes_total: number of nodes before sampling was applied
+    """
+    graph: nx.Graph
+    ports: bool = False
+    use_pyvis: bool = False
+    highlights: dict = field(default_factory=dict)
+    n_nodes_total: int = 0
+
+    @property
+    def file_name(self) -> str:
+        if self.use_pyvis:
+            return "%s_graph_pyvis.html" % ("port" if self.ports else "element")
+        return "%s_graph.pdf" % ("port" if self.ports else "element")
+
+
+def sample_graph(graph: nx.Graph, max_nodes: int) -> nx.Graph:
+    """Reduce graph to at most max_nodes nodes.
+
+    Nodes are collected by breadth-first search starting with the largest
+    connected component, so the sampled graph keeps contiguous parts of the
+    network instead of scattered single nodes. The node order of the
+    original graph is used for determinism.
+
+    Args:
+        graph: graph to sample
+        max_nodes: maximum number of nodes in the result
+
+    Returns:
+        subgraph view of graph with at most max_nodes nodes
+    """
+    if max_nodes is None or graph.number_of_nodes() <= max_nodes:
+        return graph
+    components = sorted(
+        nx.connected_components(graph), key=len, reverse=True)
+    order = {node: i for i, node in enumerate(graph.nodes)}
+    selected = []
+    for component in components:
+        start = min(component, key=order.get)
+        for node in nx.bfs_tree(graph, start):
+            selected.append(node)
+            if len(selected) >= max_nodes:
+                return graph.subgraph(selected)
+    return graph.subgraph(selected)
+
+
+def prepare_plot_data(graph: HvacGraph, ports: bool = False,
+                      use_pyvis: bool = False,
+                      max_nodes: int = None) -> GraphPlotData:
+    """Convert a HvacGraph into picklable GraphPlotData.
+
+    Args:
+        graph: the HVAC graph to plot
+        ports: If True, the port graph is plotted, else the element graph.
+        use_pyvis: prepare data for an interactive html plot
+        max_nodes: maximum number of nodes to plot, larger graphs are
+            sampled with `sample_graph`
+
+    Returns:
+        GraphPlotData ready to be passed to `render_plot`
+    """
+    source = graph if ports else graph.element_graph
+    n_nodes_total = source.number_of_nodes()
+    source = sample_graph(source, max_nodes)
+    if source.number_of_nodes() < n_nodes_total:
+        logger.warning(
+            "Graph with %d nodes exceeds the plot limit, only %d nodes are "
+            "plotted.", n_nodes_total, source.number_of_nodes())
+
+    # use guid because str must be unique to prevent overrides
+    ids = {node: str(node) + ' ' + str(node.guid) for node in source.nodes}
+    plot_graph = nx.Graph()
+    for node, node_id in ids.items():
+        if ports:
+            colors = NODE_COLORS_FLOW_DIRECTION[node.flow_direction]
+        else:
+            colors = dict(node_color='blue', edgecolors='black')
+        plot_graph.add_node(node_id, label=str(node), **colors)
+    for edge in source.edges:
+        if ports:
+            edge_color = 'grey'
+        else:
+            edge_color = EDGE_COLORS_FLOW_SIDE[_element_edge_side(*edge)]
+        plot_graph.add_edge(
+            ids[edge[0]], ids[edge[1]], edge_color=edge_color)
+
+    highlights = {}
+    if use_pyvis:
+        # Todo Remove temp code. This is for Abschlussbericht Plotting only!
+        # start of temp plotting code
+        for node, node_id in ids.items():
+            try:
+                if node.length.m == 34:
+                    highlights[node_id] = 'green'
+            except AttributeError:
+                pass
+            try:
+                if node.rated_power.m == 0.6:
+                    highlights[node_id] = 'purple'
+            except AttributeError:
+                pass
+            try:
+                if node.rated_power.m == 1:
+                    highlights[node_id] = 'red'
+            except AttributeError:
+                pass
+        # end of temp plotting code
+
+    return GraphPlotData(
+        graph=plot_graph,
+        ports=ports,
+        use_pyvis=use_pyvis,
+        highlights=highlights,
+        n_nodes_total=n_nodes_total,
+    )
+
+
+def _element_edge_side(element0, element1):
+    """Get flow side of the connection between two elements."""
+    sides0 = {port.flow_side for port in element0.ports}
+    sides1 = {port.flow_side for port in element1.ports}
+    # element with multiple sides is usually a consumer / generator
+    # (or result of conflicts) hence side of definite element is used
+    if len(sides0) == 1:
+        return sides0.pop()
+    elif len(sides1) == 1:
+        return sides1.pop()
+    return None
+
+
+def render_plot(data: GraphPlotData, path: Path = None, dpi: int = 400):
+    """Render GraphPlotData and either display or save it.
+
+    This function only depends on the picklable data and is therefore safe
+    to run in a worker process.
+
+    Args:
+        data: prepared plot data
+        path: If provided, the graph is saved there as pdf file or html
+         if data.use_pyvis is True.
+        dpi: dots per inch, increase for higher quality (takes longer to
+         render)
+    """
+    if data.use_pyvis:
+        _render_pyvis(data, path)
+    else:
+        _render_matplotlib(data, path, dpi)
+
+
+def _render_matplotlib(data: GraphPlotData, path: Path = None,
+                       dpi: int = 400):
+    # importing matplotlib is slow and plotting is optional
+    import matplotlib.pyplot as plt
+
+    graph = data.graph
+    plt.figure(dpi=dpi)
+    nx.draw(graph, node_size=10, font_size=5, linewidths=0.5, alpha=0.7,
+            with_labels=True,
+            labels=dict(graph.nodes(data='label')),
+            node_color=[c for _, c in graph.nodes(data='node_color')],
+            edgecolors=[c for _, c in graph.nodes(data='edgecolors')],
+            edge_color=[c for _, _, c in graph.edges(data='edge_color')])
+    plt.draw()
+    if path:
+        try:
+            plt.savefig(
+                os.path.join(path, data.file_name),
+                bbox_inches='tight')
+        except IOError as ex:
+            logger.error("Unable to save plot of graph (%s)", ex)
+    else:
+        plt.show()
+    plt.close()
+
+
+def _render_pyvis(data: GraphPlotData, path: Path = None):
+    from pyvis.network import Network
+
+    graph = nx.Graph()
+    graph.add_nodes_from(data.graph.nodes)
+    graph.add_edges_from(data.graph.edges)
+    net = Network(height='1000', width='1000', notebook=False,
+                  bgcolor='white', font_color='black', layout=False)
+    net.barnes_hut(gravity=-17000, spring_length=55)
+    # net.show_buttons()
+    pyvis_json = Path(__file__).parent.parent.parent / \
+        'assets/configs/pyvis/pyvis_options.json'
+    with open(pyvis_json) as f:
+        net.options = json.load(f)
+
+    net.from_nx(graph, default_node_size=50)
+    for node in net.nodes:
+        try:
+            node['label'] = node['label'].split('<')[1]
+        except:
+            pass
+        node['label'] = node['label'].split('(ports')[0]
+        if 'agg' in node['label'].lower():
+            node['label'] = node['label'].split('Agg0')[0]
+        if 'storage' in node['label'].lower():
+            node['color'] = 'purple'
+        if 'distributor' in node['label'].lower():
+            node['color'] = 'gray'
+        if 'pump' in node['label'].lower():
+            node['color'] = 'blue'
+        if 'spaceheater' in node['label'].lower():
+            node['color'] = 'purple'
+        if 'pipestrand' in node['label'].lower():
+            node['color'] = 'blue'
+        if any([ele in node['label'].lower() for ele in [
+            'parallelpump',
+            'boiler',
+            'generatoronefluid',
+            'heatpump',
+        ]]):
+            node['color'] = 'yellow'
+        if node['id'] in data.highlights:
+            node['color'] = data.highlights[node['id']]
+
+    if path:
+        name = data.file_name
+        try:
+            net.save_graph(name)
+            shutil.move(name, os.path.join(path, name))
+        except Exception as ex:
+            logger.error("Unable to save plot of graph (%s)", ex)
+    else:
+        name = "graph.html"
+        try:
+            net.show(name)
+        except Exception as ex:
+            logger.error("Unable to show plot of graph (%s)", ex)
+
+
+class GraphPlotter:
+    """Creates plots of HvacGraphs, optionally in a background process.
+
+    The graph is always converted to GraphPlotData in the calling process.
+    If background is True, rendering happens in a single worker process and
+    the caller continues immediately. Call `wait` to block until all
+    pending plots are written.
+
+    Args:
+        path: export directory for the plots
+        background: render plots in a worker process
+        max_nodes: maximum number of nodes per plot
+        dpi: resolution of pdf plots
+    """
+
+    def __init__(self, path: Path, background: bool = True,
+                 max_nodes: int = None, dpi: int = 400):
+        self.path = path
+        self.background = background
+        self.max_nodes = max_nodes
+        self.dpi = dpi
+        self.futures: List[Future] = []
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+    @classmethod
+    def from_sim_settings(cls, path: Path, sim_settings) -> GraphPlotter:
+        """Create a GraphPlotter configured by PlantSimSettings."""
+        return cls(
+            path,
+            background=sim_settings.graph_plots_in_background,
+            max_nodes=sim_settings.graph_plot_max_nodes,
+        )
+
+    def plot(self, graph: HvacGraph, ports: bool = False,
+             use_pyvis: bool = False):
+        """Plot the current state of graph.
+
+        Args:
+            graph: the HVAC graph to plot
+            ports: If True, the port graph is plotted, else the element graph.
+            use_pyvis: exports graph to interactive html
+        """
+        data = prepare_plot_data(graph, ports, use_pyvis, self.max_nodes)
+        if not self.background:
+            render_plot(data, self.path, self.dpi)
+            return
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=1)
+        self.futures.append(
+            self._executor.submit(render_plot, data, self.path, self.dpi))
+
+    def wait(self):
+        """Block until all pending plots are rendered and log failures."""
+        for future in self.futures:
+            ex = future.exception()
+            if ex:
+                logger.error("Unable to render plot of graph (%s)", ex)
+        self.futures.clear()
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
@@ -258,13 +258,15 @@ class HVACProduct(ProductBased):
             connections.append((port0, port1))
         return connections
 
-    def decide_inner_connections(self) -> Generator[DecisionBunch, None, None]:
-        """Generator method yielding decisions to set inner connections."""
+    def get_inner_connection_scores(self) -> Tuple[dict, dict]:
+        """Score each port as possible VL and RL port.
 
-        if len(self.ports) < 2:
-            # not possible to connect anything
-            return
+        The score is based on connections to pipes, string hints in the port
+        groups and the flow direction of the port.
 
+        Returns:
+            tuple of dicts with port as key and VL / RL score as value
+        """
         # TODO: extend pattern
         vl_pattern = re.compile('.*vorlauf.*', re.IGNORECASE)
         rl_pattern = re.compile('.*rücklauf.*', re.IGNORECASE)
@@ -292,7 +294,30 @@ class HVACProduct(ProductBased):
                 bonus_rl += .5
             score_vl[port] = bonus_vl
             score_rl[port] = bonus_rl
+        return score_vl, score_rl
 
+    def get_port_layout(self) -> tuple:
+        """Layout of the ports relevant for deciding inner connections.
+
+        Elements of the same class with equal layout are structurally
+        identical, so the port at the same index plays the same role in each
+        of them and one inner connection decision applies to all.
+        """
+        score_vl, score_rl = self.get_inner_connection_scores()
+        return (type(self),) + tuple(
+            (score_vl[port], score_rl[port]) for port in self.ports)
+
+    def get_inner_connection_decisions(self, similar: int = 0
+                                       ) -> Tuple[ListDecision, ListDecision]:
+        """Create decisions to select VL and RL port of this element.
+
+        Args:
+            similar: number of further elements the answer applies to
+
+        Returns:
+            tuple of VL and RL decision, choices are port guids sorted by score
+        """
+        score_vl, score_rl = self.get_inner_connection_scores()
         # created sorted choices
         choices_vl = [port.guid for port, score in
                       sorted(score_vl.items(), key=lambda item: item[1],
@@ -300,26 +325,42 @@ class HVACProduct(ProductBased):
         choices_rl = [port.guid for port, score in
                       sorted(score_rl.items(), key=lambda item: item[1],
                              reverse=True)]
-        decision_vl = ListDecision(f"Please select VL Port for {self}.",
+        hint = f" (applies to {similar} identical elements as well)" \
+            if similar else ""
+        decision_vl = ListDecision(f"Please select VL Port for {self}{hint}.",
                                    choices=choices_vl,
                                    default=choices_vl[0],  # best guess
                                    key='VL',
                                    global_key='VL_port_of_' + self.guid)
-        decision_rl = ListDecision(f"Please select RL Port for {self}.",
+        decision_rl = ListDecision(f"Please select RL Port for {self}{hint}.",
                                    choices=choices_rl,
                                    default=choices_rl[0],  # best guess
                                    key='RL',
                                    global_key='RL_port_of_' + self.guid)
+        return decision_vl, decision_rl
+
+    def set_inner_connection(self, vl: HVACPort, rl: HVACPort):
+        """Connect VL and RL port inside this element and set flow sides."""
+        # set flow correct side
+        vl.flow_side = 1
+        rl.flow_side = -1
+        self.inner_connections.append((vl, rl))
+
+    def decide_inner_connections(self) -> Generator[DecisionBunch, None, None]:
+        """Generator method yielding decisions to set inner connections."""
+
+        if len(self.ports) < 2:
+            # not possible to connect anything
+            return
+
+        decision_vl, decision_rl = self.get_inner_connection_decisions()
         decisions = DecisionBunch((decision_vl, decision_rl))
         yield decisions
 
         port_dict = {port.guid: port for port in self.ports}
         vl = port_dict[decision_vl.value]
         rl = port_dict[decision_rl.value]
-        # set flow correct side
-        vl.flow_side = 1
-        rl.flow_side = -1
-        self.inner_connections.append((vl, rl))
+        self.set_inner_connection(vl, rl)
 
     def validate_ports(self):
         if isinstance(self.expected_hvac_ports, tuple):
@@ -1,14 +1,16 @@
 ﻿"""Package for Modelica export"""
-import codecs
+import io
 import logging
 import os
 from pathlib import Path
 from threading import Lock
-from typing import Union, Type, Dict, Container, Callable, List, Any, Iterable
+from typing import Union, Type, Dict, Container, Callable, List, Any, \
+    Iterable, TextIO
 
 import numpy as np
 import pint
-from mako.template import Template
+from mako.lookup import TemplateLookup
+from mako.runtime import Context
 
 import bim2sim
 from bim2sim.elements import base_elements as elem
@@ -17,12 +19,19 @@ from bim2sim.elements.hvac_elements import HVACProduct, HVACPort
 from bim2sim.kernel import log
 from bim2sim.kernel.decision import DecisionBunch, RealDecision
 
-TEMPLATEPATH = (Path(bim2sim.__file__).parent /
-                'assets/templates/modelica/tmplModel.txt')
-# prevent mako newline bug by reading file separately
-with open(TEMPLATEPATH) as f:
-    templateStr = f.read()
-template = Template(templateStr)
+TEMPLATEDIR = Path(bim2sim.__file__).parent / 'assets/templates/modelica'
+TEMPLATENAME = 'tmplModel.txt'
+TEMPLATEPATH = TEMPLATEDIR / TEMPLATENAME
+
+
+def _normalize_newlines(text: str) -> str:
+    """Prevent mako newline bug with templates checked out with CRLF."""
+    return text.replace('\r\n', '\n')
+
+
+# the lookup compiles each template once and keeps it for the process
+lookup = TemplateLookup(directories=[str(TEMPLATEDIR)],
+                        preprocessor=_normalize_newlines)
 lock = Lock()
 
 logger = logging.getLogger(__name__)
@@ -116,8 +125,24 @@ class ModelicaModel:
         Returns
             str: The Modelica code representation of the model.
         """
+        buffer = io.StringIO()
+        self.write(buffer)
+        return buffer.getvalue()
+
+    def write(self, file: TextIO):
+        """ Renders the Modelica code of the model into a file-like object.
+
+        The code is written while rendering, element by element, so the
+        complete model code is never held in memory.
+
+        Args:
+            file: text stream the code is written to
+        """
+        template = lookup.get_template(TEMPLATENAME)
+        unknowns = self.unknown_params()
         with lock:
-            return template.render(model=self, unknowns=self.unknown_params())
+            template.render_context(
+                Context(file, model=self, unknowns=unknowns))
 
     def unknown_params(self) -> list:
         """ Identifies unknown parameters in the model. Unknown parameters are
@@ -149,11 +174,9 @@ class ModelicaModel:
         if not _path.endswith(".mo"):
             _path += ".mo"
 
-        data = self.code()
-
         user_logger.info("Saving '%s' to '%s'", self.name, _path)
-        with codecs.open(_path, "w", "utf-8") as file:
-            file.write(data)
+        with open(_path, "w", encoding="utf-8", newline="") as file:
+            self.write(file)
 
 
 class ModelicaElement:
@@ -171,6 +194,8 @@ class ModelicaElement:
         lookup: A dictionary mapping element types to instance types.
         dummy: A placeholder for an instance.
         _initialized: Indicates whether the instance has been initialized.
+        _lookups: Lookups already created by init_factory, reused if the
+            factory is initialized again with the same libraries.
 
     # TODO describe the total process
 
@@ -183,6 +208,7 @@ class ModelicaElement:
     lookup: Dict[Type[Element], Type['ModelicaElement']] = {}
     dummy: Type['ModelicaElement'] = None
     _initialized = False
+    _lookups: Dict[tuple, Dict[Type[Element], Type['ModelicaElement']]] = {}
 
     def __init__(self, element: HVACProduct):
         """ Initializes an Instance with the given HVACProduct element.
@@ -250,6 +276,9 @@ class ModelicaElement:
         """ Initializes the lookup dictionary for the factory with the provided
             libraries.
 
+        The lookup is created only once per set of libraries (and their
+        model classes) and reused by following calls in the same process.
+
         Args:
             libraries: A tuple of libraries to initialize the factory with.
 
@@ -257,8 +286,15 @@ class ModelicaElement:
             AssertionError: If a library is not defined or if there are
                 conflicts in models.
         """
-        conflict = False
         ModelicaElement.dummy = Dummy
+        key = tuple((library, tuple(library.__subclasses__()))
+                    for library in libraries)
+        if key in ModelicaElement._lookups:
+            ModelicaElement.lookup = dict(ModelicaElement._lookups[key])
+            ModelicaElement._initialized = True
+            return
+
+        conflict = False
         for library in libraries:
             if ModelicaElement not in library.__bases__:
                 logger.warning(
@@ -290,6 +326,7 @@ class ModelicaElement:
                 "Conflict(s) in Models. (See log for details).")
 
         ModelicaElement._initialized = True
+        ModelicaElement._lookups[key] = dict(ModelicaElement.lookup)
 
         models = set(ModelicaElement.lookup.values())
         models_txt = "\n".join(
@@ -379,9 +416,12 @@ class ModelicaParameter:
     Attributes:
         _decisions: Collection of decisions related to parameters.
         _answers: Dictionary to store answers for parameter decisions.
+        _function_input_plans: Split of function inputs into element
+            attributes and other inputs per function and element class.
     """
     _decisions = DecisionBunch()
     _answers: dict = {}
+    _function_input_plans: Dict[tuple, tuple] = {}
 
     def __init__(self, name: str, unit: pint.Unit, required: bool,
                  element: HVACProduct, **kwargs):
@@ -435,13 +475,33 @@ class ModelicaParameter:
                 self._decisions.append(
                     self._create_parameter_decision(self.name, self.unit))
         elif self.function:
+            attribute_inputs, other_inputs = self._get_function_input_plan()
+            for function_input in attribute_inputs:
+                self.attributes.append(function_input)
+                self.element.request(str(function_input))
+            self._function_inputs.extend(other_inputs)
+
+    def _get_function_input_plan(self) -> tuple:
+        """ Splits the function inputs into element attributes and others.
+
+        The split only depends on the function and the class of the element
+        and is therefore computed once and reused for all parameters sharing
+        both.
+
+        Returns:
+            tuple of attribute inputs and other inputs
+        """
+        key = (self.function.__code__, type(self.element))
+        plan = self._function_input_plans.get(key)
+        if plan is None:
             function_inputs = self.function.__code__.co_varnames
-            for function_input in function_inputs:
-                if function_input in self.element.attributes:
-                    self.attributes.append(function_input)
-                    self.element.request(str(function_input))
-                else:
-                    self._function_inputs.append(function_input)
+            plan = (
+                tuple(function_input for function_input in function_inputs
+                      if function_input in self.element.attributes),
+                tuple(function_input for function_input in function_inputs
+                      if function_input not in self.element.attributes))
+            self._function_input_plans[key] = plan
+        return plan
 
     def _create_parameter_decision(self,
                                    name: str,
@@ -476,6 +536,8 @@ class ModelicaParameter:
         decisions.sort(key=lambda d: d.key)
         yield decisions
         cls._answers.update(decisions.to_answer_dict())
+        # answered decisions must not be yielded again by following exports
+        cls._decisions = DecisionBunch()
 
     def collect(self):
         """ Collects the value of the parameter based on its source.
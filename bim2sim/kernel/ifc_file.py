@@ -28,6 +28,7 @@ class IfcFileClass:
             ifc_path: Path,
             reset_guids: bool = False,
             ifc_domain: IFCDomain = None):
+        self.ifc_path = ifc_path
         self.ifc_file_name = ifc_path.name
         self.file = self.load_ifcopenshell_file(ifc_path)
         self.finder = None
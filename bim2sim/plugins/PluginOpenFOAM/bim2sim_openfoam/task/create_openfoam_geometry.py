@@ -41,6 +41,7 @@ from bim2sim.plugins.PluginOpenFOAM.bim2sim_openfoam.utils.openfoam_utils \
     import OpenFOAMUtils
 from bim2sim.tasks.base import ITask
 from bim2sim.utilities.common_functions import filter_elements
+from bim2sim.utilities.point_sampling import point_cloud_cache
 from bim2sim.utilities.pyocc_tools import PyOCCTools
 
 logger = logging.getLogger(__name__)
@@ -59,26 +60,31 @@ class CreateOpenFOAMGeometry(ITask):
         super().__init__(playground)
 
     def run(self, openfoam_case, elements):
-        openfoam_elements = dict()
-        self.init_zone(openfoam_case,
-                       elements, openfoam_elements,
-                       space_guid=self.playground.sim_settings.select_space_guid)
-        # todo: add geometry for heater and air terminals
-        self.init_heater(openfoam_case, elements, openfoam_elements)
-        self.init_airterminals(openfoam_case, elements, openfoam_elements,
-                               self.playground.sim_settings.inlet_type,
-                               self.playground.sim_settings.outlet_type)
-        self.get_base_surface(openfoam_case, openfoam_elements)
-        self.init_furniture(openfoam_case, elements, openfoam_elements)
-        self.init_people(openfoam_case, elements, openfoam_elements)
-        # setup geometry for constant
-        self.export_stlbound_triSurface(openfoam_case, openfoam_elements)
-        self.export_heater_triSurface(openfoam_elements)
-        self.export_airterminal_triSurface(openfoam_elements)
-        self.export_furniture_triSurface(openfoam_elements)
-        self.export_people_triSurface(openfoam_elements)
-        if self.playground.sim_settings.adjust_refinements:
-            self.adjust_refinements(openfoam_case, openfoam_elements)
+        try:
+            openfoam_elements = dict()
+            self.init_zone(
+                openfoam_case, elements, openfoam_elements,
+                space_guid=self.playground.sim_settings.select_space_guid)
+            # todo: add geometry for heater and air terminals
+            self.init_heater(openfoam_case, elements, openfoam_elements)
+            self.init_airterminals(openfoam_case, elements, openfoam_elements,
+                                   self.playground.sim_settings.inlet_type,
+                                   self.playground.sim_settings.outlet_type)
+            self.get_base_surface(openfoam_case, openfoam_elements)
+            self.init_furniture(openfoam_case, elements, openfoam_elements)
+            self.init_people(openfoam_case, elements, openfoam_elements)
+            # setup geometry for constant
+            self.export_stlbound_triSurface(openfoam_case, openfoam_elements)
+            self.export_heater_triSurface(openfoam_elements)
+            self.export_airterminal_triSurface(openfoam_elements)
+            self.export_furniture_triSurface(openfoam_elements)
+            self.export_people_triSurface(openfoam_elements)
+            if self.playground.sim_settings.adjust_refinements:
+                self.adjust_refinements(openfoam_case, openfoam_elements)
+        finally:
+            # the point clouds of the distance computations are only needed
+            # for the geometry of this case
+            point_cloud_cache.clear()
 
         return openfoam_case, openfoam_elements
 
@@ -18,6 +18,9 @@ from bim2sim.kernel import log
 from bim2sim.tasks.base import Playground
 from bim2sim.plugins import Plugin, load_plugin
 from bim2sim.utilities.common_functions import all_subclasses
+from bim2sim.utilities.geometry_service import geometry_stats
+from bim2sim.utilities.shape_cache import set_shape_cache
+from bim2sim.utilities.shape_data import shape_data_cache
 from bim2sim.sim_settings import BaseSimSettings
 from bim2sim.utilities.types import LOD
 
@@ -497,6 +500,9 @@ class Project:
     def finalize(self, success=False):
         """cleanup method"""
 
+        # wait for results of tasks running in background, e.g. plots
+        self.playground.wait_for_background_jobs()
+
         # clean up run relics
         #  backup decisions
         if not success:
@@ -513,6 +519,21 @@ class Project:
                              f'{self.paths.export}')
             self.logger.info(f'Project "{self.name}" finished successful')
 
+        # report where the time for shape creation was spent
+        if geometry_stats:
+            geometry_stats.log_summary()
+            try:
+                geometry_stats.save(self.paths.log / 'geometry_stats.json')
+            except OSError as ex:
+                self.logger.warning(
+                    "Unable to save geometry statistics (%s)", ex)
+            geometry_stats.reset()
+
+        # the cached shape data keeps the shapes of this project alive
+        shape_data_cache.clear()
+        # the shape cache is bound to the IFC files of this project
+        set_shape_cache(None)
+
         # reset sim_settings:
         self.playground.sim_settings.load_default_settings()
         # clean logger
@@ -449,6 +449,25 @@ class BaseSimSettings(metaclass=AutoSettingNameMeta):
         mandatory=False
     )
 
+    number_of_processes = NumberSetting(
+        value=1,
+        min_value=1,
+        max_value=256,
+        description='Maximum number of processes used by tasks that can '
+                    'distribute independent parts of their work, e.g. '
+                    'independent parts of the hydraulic network. Also used '
+                    'as number of threads for bulk geometry creation. 1 '
+                    'disables parallel execution.',
+        for_frontend=True
+    )
+    use_geometry_cache = BooleanSetting(
+        value=False,
+        description='Store shapes created from IFC geometry in the project '
+                    'folder and reuse them in following runs as long as the '
+                    'IFC file does not change.',
+        for_frontend=True
+    )
+
 
 class PlantSimSettings(BaseSimSettings):
     def __init__(self):
@@ -498,6 +517,39 @@ class PlantSimSettings(BaseSimSettings):
                     "ports."
     )
 
+    create_graph_plots = BooleanSetting(
+        value=False,
+        description="Create plots of the hydraulic graph after reducing it "
+                    "and after removing dead ends. Plotting large graphs is "
+                    "slow and mostly useful for debugging.",
+        for_frontend=True
+    )
+
+    graph_plots_in_background = BooleanSetting(
+        value=True,
+        description="Render graph plots in a background process while the "
+                    "remaining tasks continue. Requires create_graph_plots "
+                    "== True for activation."
+    )
+
+    graph_plot_max_nodes = NumberSetting(
+        value=2000,
+        min_value=1,
+        max_value=1e6,
+        description="Maximum number of nodes shown in a graph plot. Larger "
+                    "graphs are sampled by breadth-first search starting "
+                    "with the largest connected part of the network."
+    )
+
+    incremental_aggregation = BooleanSetting(
+        value=False,
+        description="Store the matches found for each aggregation per "
+                    "independent part of the network in the export folder. "
+                    "On the next run only parts of the network which "
+                    "changed (e.g. by another decision) are searched "
+                    "again, the matches of all other parts are reused."
+    )
+
 
 class BuildingSimSettings(BaseSimSettings):
 
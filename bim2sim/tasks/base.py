@@ -82,6 +82,7 @@ class Playground:
         self.elements_updated = False
         self.graph = None
         self.graph_updated = False
+        self.background_jobs = []
         self.logger = logging.getLogger("bim2sim.Playground")
 
     @staticmethod
@@ -160,6 +161,17 @@ class Playground:
         self.history.append(task)
         self.logger.info("%s done", task)
 
+    def wait_for_background_jobs(self):
+        """Blocks until all jobs started in background by tasks are done.
+
+        Tasks can append objects with a wait() method (e.g. a GraphPlotter)
+        to background_jobs to continue with the next task while the job is
+        still running.
+        """
+        for job in self.background_jobs:
+            job.wait()
+        self.background_jobs.clear()
+
     def update_elements(self, elements):
         """Updates the elements of the current run.
 
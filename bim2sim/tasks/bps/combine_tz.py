@@ -123,12 +123,15 @@ class CombineThermalZones(ITask):
     @classmethod
     def group_by_usage(cls, thermal_zones: list) -> dict:
         """groups together the thermal zones based on usage criterion"""
+        return cls.group_by_key(thermal_zones, lambda tz: tz.usage)
+
+    @classmethod
+    def group_by_key(cls, thermal_zones: list, key: Callable) -> dict:
+        """groups together the thermal zones with the same key, in the order
+        of their first occurrence"""
         grouped_tz = {}
         for tz in thermal_zones:
-            value = getattr(tz, 'usage')
-            if value not in grouped_tz:
-                grouped_tz[value] = []
-            grouped_tz[value].append(tz)
+            grouped_tz.setdefault(key(tz), []).append(tz)
         cls.discard_1_element_groups(grouped_tz)
         return grouped_tz
 
@@ -162,41 +165,28 @@ class CombineThermalZones(ITask):
     def group_by_external_orientation(cls, thermal_zones: list) -> dict:
         """groups together the thermal zones based on external_orientation
         criterion"""
-        grouped_tz = {}
-        for tz in thermal_zones:
-            value = cls.external_orientation_group(
-                getattr(tz, 'external_orientation'))
-            if value not in grouped_tz:
-                grouped_tz[value] = []
-            grouped_tz[value].append(tz)
-        cls.discard_1_element_groups(grouped_tz)
-        return grouped_tz
+        return cls.group_by_key(
+            thermal_zones,
+            lambda tz: cls.external_orientation_group(tz.external_orientation))
 
     @classmethod
     def group_by_glass_percentage(cls, thermal_zones: list) -> dict:
         """groups together the thermal zones based on glass percentage
         criterion"""
-        grouped_tz: dict = {}
-        for tz in thermal_zones:
-            value = cls.glass_percentage_group(getattr(tz, 'glass_percentage'))
-            if value not in grouped_tz:
-                grouped_tz[value] = []
-            grouped_tz[value].append(tz)
-        cls.discard_1_element_groups(grouped_tz)
-        return grouped_tz
+        return cls.group_by_key(
+            thermal_zones,
+            lambda tz: cls.glass_percentage_group(tz.glass_percentage))
 
     @classmethod
     def group_by_is_neighbor(cls, thermal_zones: list) -> dict:
-        """groups together the thermal zones based on is_neighbor criterion"""
-        grouped_tz = {'': list(thermal_zones)}
-        for tz in thermal_zones:
-            neighbor_statement = False
-            for neighbor in tz.space_neighbors:
-                if neighbor in thermal_zones:
-                    neighbor_statement = True
-                    break
-            if not neighbor_statement:
-                grouped_tz[''].remove(tz)
+        """groups together the thermal zones based on is_neighbor criterion
+
+        All thermal zones with at least one neighbor among thermal_zones are
+        kept in one group."""
+        members = set(thermal_zones)
+        grouped_tz = {'': [
+            tz for tz in thermal_zones
+            if any(neighbor in members for neighbor in tz.space_neighbors)]}
         cls.discard_1_element_groups(grouped_tz)
         return grouped_tz
 
@@ -230,10 +220,10 @@ class CombineThermalZones(ITask):
     def group_not_grouped_tz(grouped_thermal_zones: dict, thermal_zones: list):
         """groups together thermal zones, that are not already grouped in
         previous steps based on Norm DIN_V_18599_1"""
-        # list of all thermal elements grouped:
-        grouped_thermal_elements = []
+        # all thermal elements grouped:
+        grouped_thermal_elements = set()
         for criteria in grouped_thermal_zones:
-            grouped_thermal_elements += grouped_thermal_zones[criteria]
+            grouped_thermal_elements.update(grouped_thermal_zones[criteria])
         # check not grouped elements for fourth criterion
         not_grouped_elements: list = []
         for tz in thermal_zones:
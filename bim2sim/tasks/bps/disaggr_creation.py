@@ -23,6 +23,10 @@ class DisaggregationCreationAndTypeCheck(ITask):
 
     reads = ('elements',)
 
+    def __init__(self, playground):
+        super().__init__(playground)
+        self._subclasses = {}
+
     def run(self, elements: dict):
         """Disaggregates building elements based on their space boundaries.
 
@@ -48,12 +52,12 @@ class DisaggregationCreationAndTypeCheck(ITask):
          """
         elements_overwrite = {}
         elements_to_aggregate = {}  # dict(new_element, old_element)
-        for ele in elements.values():
-            # only handle BPSProductWithLayers
-            if not any([isinstance(ele, bps_product_layer_ele) for
-                        bps_product_layer_ele in
-                        all_subclasses(BPSProductWithLayers)]):
-                continue
+        self._subclasses = {}
+        # only handle BPSProductWithLayers
+        layer_elements = [
+            ele for ele in elements.values()
+            if self.is_subclass_instance(ele, BPSProductWithLayers)]
+        for ele in layer_elements:
             # no disaggregation needed
             if len(ele.space_boundaries) < 2:
                 self.logger.info(f'No disggregation needed for {ele}')
@@ -146,6 +150,16 @@ class DisaggregationCreationAndTypeCheck(ITask):
             if value in elements:
                 del elements[value.guid]
 
+    def is_subclass_instance(self, element, base: type) -> bool:
+        """True if element is an instance of a subclass of base.
+
+        The subclasses of each base class are only collected once per run.
+        """
+        subclasses = self._subclasses.get(base)
+        if subclasses is None:
+            subclasses = self._subclasses[base] = tuple(all_subclasses(base))
+        return isinstance(element, subclasses)
+
     def type_correction_not_disaggregation(
             self, element: BPSProductWithLayers, sbs: list['SpaceBoundary']):
         """Performs type correction for non disaggregated elements.
@@ -270,8 +284,7 @@ class DisaggregationCreationAndTypeCheck(ITask):
         Returns:
             type: The correct door type or None if not applicable.
         """
-        if any([isinstance(element, door_class) for door_class in
-                all_subclasses(Door)]):
+        if self.is_subclass_instance(element, Door):
             # Corresponding Boundaries
             if len(sbs) == 2:
                 return InnerDoor
@@ -300,8 +313,7 @@ class DisaggregationCreationAndTypeCheck(ITask):
         Returns:
             type: The correct wall type or None if not applicable.
         """
-        if any([isinstance(element, wall_class) for wall_class in
-                all_subclasses(Wall)]):
+        if self.is_subclass_instance(element, Wall):
             # Corresponding Boundaries
             if len(sbs) == 2:
                 return InnerWall
@@ -330,8 +342,7 @@ class DisaggregationCreationAndTypeCheck(ITask):
         Returns:
             type: The correct wall type or None if not applicable.
         """
-        if any([isinstance(element, slab_class) for slab_class in
-                all_subclasses(Slab)]):
+        if self.is_subclass_instance(element, Slab):
             # Corresponding Boundaries
             if len(sbs) == 2:
                 return InnerFloor
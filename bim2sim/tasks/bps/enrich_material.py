@@ -1,5 +1,3 @@
-import ast
-import logging
 from dataclasses import dataclass
 from pathlib import Path
 from typing import Dict, List
@@ -11,7 +9,9 @@ from bim2sim.sim_settings import BuildingSimSettings
 from bim2sim.tasks.base import ITask
 from bim2sim.tasks.base import Playground
 from bim2sim.utilities.common_functions import filter_elements, \
-    get_type_building_elements, get_material_templates
+    get_material_templates
+from bim2sim.utilities.template_store import get_template_store, \
+    get_resumed_material_templates, content_key
 from bim2sim.utilities.types import LOD, AttributeDataSource
 
 
@@ -36,6 +36,7 @@ class EnrichMaterial(ITask):
         super().__init__(playground)
         self.layer_sets_added = []
         self.template_materials = {}
+        self.template_layer_sets = {}
 
     def run(self, elements: dict):
         """Enriches materials and layer sets of building elements.
@@ -64,6 +65,9 @@ class EnrichMaterial(ITask):
                 elements[layer.guid] = layer
         for material in self.template_materials.values():
             elements[material.guid] = material
+        self.logger.info(
+            f"Enrichment uses {len(self.layer_sets_added)} shared layer sets "
+            f"and {len(self.template_materials)} shared materials")
 
     def create_new_layer_sets_and_materials(
             self, elements: dict,
@@ -72,8 +76,10 @@ class EnrichMaterial(ITask):
         """Create a new layer set including layers and materials.
 
         This creates a completely new layer set, including the relevant layers
-        and materials. Materials are only created once, even if they occur in
-        multiple layer sets/layers.
+        and materials. Layer sets and materials are interned by the content
+        of their templates: each is only created once and shared by all
+        elements and layers using it. Templates without elements to enrich
+        don't create any layer set.
         Additionally, some information on element level are overwritten with
         data from the templates, like inner_convection etc.
         """
@@ -84,13 +90,15 @@ class EnrichMaterial(ITask):
             list(element_templates.keys())[0]]
         for template_name, ele_types in (
                 self.mapping_templates_bim2sim.items()):
+            elements_to_enrich = []
+            for ele_type in ele_types:
+                elements_to_enrich.extend(filter_elements(elements, ele_type))
+            if not elements_to_enrich:
+                continue
             layer_set = self.create_layer_set_from_template(
                 element_template[template_name], material_template)
             ele_enrichment_data = self.enrich_element_data_from_template(
                 element_template[template_name])
-            elements_to_enrich = []
-            for ele_type in ele_types:
-                elements_to_enrich.extend(filter_elements(elements, ele_type))
             for element in elements_to_enrich:
                 # set layer_set
                 element.layerset = layer_set
@@ -117,23 +125,35 @@ class EnrichMaterial(ITask):
 
     def create_layer_set_from_template(self, element_template: dict,
                                        material_template: dict) -> LayerSet:
-        """Create layer set from template including layers and materials."""
+        """Create layer set from template including layers and materials.
+
+        Layer sets are only created once for templates with identical layers
+        and shared by all elements using them, materials are only created
+        once for identical material templates.
+        """
+        layer_templates = [
+            (layer_template['thickness'],
+             material_template[layer_template['material']['name']])
+            for layer_template in element_template['layer'].values()]
+        layers_key = tuple((thickness, content_key(mat_template))
+                           for thickness, mat_template in layer_templates)
+        if layers_key in self.template_layer_sets:
+            return self.template_layer_sets[layers_key]
         layer_set = LayerSet()
-        for layer_template in element_template['layer'].values():
+        for (thickness, mat_template), (_, material_key) in zip(
+                layer_templates, layers_key):
             layer = Layer()
-            layer.thickness = layer_template['thickness']
-            material_name = layer_template['material']['name']
-            if material_name in self.template_materials:
-                material = self.template_materials[material_name]
-            else:
-                material = self.create_material_from_template(
-                    material_template[material_name])
-                self.template_materials[material_name] = material
+            layer.thickness = thickness
+            material = self.template_materials.get(material_key)
+            if material is None:
+                material = self.create_material_from_template(mat_template)
+                self.template_materials[material_key] = material
             material.parents.append(layer)
             layer.material = material
             layer.to_layerset.append(layer_set)
             layer_set.layers.append(layer)
         self.layer_sets_added.append(layer_set)
+        self.template_layer_sets[layers_key] = layer_set
         return layer_set
 
     @staticmethod
@@ -180,31 +200,19 @@ class EnrichMaterial(ITask):
     def get_material_templates(attrs: dict = None) -> dict:
         """get dict with the material templates and its respective
         attributes"""
+        if attrs is None:
+            return get_resumed_material_templates()
         material_templates = get_material_templates()
         resumed = {}
         for k in material_templates:
             resumed[material_templates[k]['name']]: dict = {}
-            if attrs is not None:
-                for attr in attrs:
-                    if attr == 'thickness':
-                        resumed[material_templates[k]['name']][attr] = \
-                            material_templates[k]['thickness_default']
-                    else:
-                        resumed[material_templates[k]['name']][attr] = \
-                            material_templates[k][attr]
-            else:
-                for attr in material_templates[k]:
-                    if attr == 'thickness_default':
-                        resumed[material_templates[k]['name']]['thickness'] = \
-                            material_templates[k][attr]
-                    elif attr == 'name':
-                        resumed[material_templates[k]['name']]['material'] = \
-                            material_templates[k][attr]
-                    elif attr == 'thickness_list':
-                        continue
-                    else:
-                        resumed[material_templates[k]['name']][attr] = \
-                            material_templates[k][attr]
+            for attr in attrs:
+                if attr == 'thickness':
+                    resumed[material_templates[k]['name']][attr] = \
+                        material_templates[k]['thickness_default']
+                else:
+                    resumed[material_templates[k]['name']][attr] = \
+                        material_templates[k][attr]
         return resumed
 
     @dataclass
@@ -263,58 +271,6 @@ class EnrichMaterial(ITask):
         raise ValueError(
             f"Unknown {construction_type} construction class: {data_source}")
 
-    @staticmethod
-    def get_element_template(element_type: str, year_of_construction: int,
-                             years_dict: dict, construction_data: str,
-                             logger: logging.Logger) -> dict:
-        """Retrieves the template for a specific building element based on construction year.
-
-        Args:
-            element_type: Type of building element
-            year_of_construction: Year when the building was constructed
-            years_dict: Dictionary containing templates for different year ranges
-            construction_data: Construction data identifier
-            logger: Logger instance for warnings
-
-        Returns:
-            dict: Template for the specified building element
-        """
-        # Handle single template case
-        if len(years_dict) == 1:
-            template_options = years_dict[list(years_dict.keys())[0]]
-            if len(template_options) == 1:
-                return template_options[list(template_options.keys())[0]]
-            return template_options[construction_data]
-
-        # Find template for specific year range
-        template_options = None
-        for year_range, template in years_dict.items():
-            years = ast.literal_eval(year_range)
-            if years[0] <= year_of_construction <= years[1]:
-                template_options = template
-                break
-
-        if not template_options:
-            return None
-
-        if len(template_options) == 1:
-            return template_options[list(template_options.keys())[0]]
-
-        # Special handling for windows
-        if element_type == 'Window':
-            try:
-                return template_options[construction_data]
-            except KeyError:
-                # Fallback to last available window type
-                new_construction_data = list(template_options.keys())[-1]
-                logger.warning(
-                    f"The window_construction_data {construction_data} is not "
-                    f"available for year_of_construction {year_of_construction}. "
-                    f"Using {new_construction_data} instead.")
-                return template_options[new_construction_data]
-
-        return template_options[construction_data]
-
     def get_templates_for_buildings(
             self, buildings: List,
             sim_settings: 'BuildingSimSettings') -> Dict:
@@ -357,34 +313,31 @@ class EnrichMaterial(ITask):
                     'door', sim_settings.construction_class_doors)
             )
 
-            # Load element templates
-            element_templates = {
-                'walls': get_type_building_elements(construction_files.walls),
-                'windows': get_type_building_elements(
-                    construction_files.windows),
-                'doors': get_type_building_elements(construction_files.doors)
+            # Load element templates, each data file is loaded only once
+            stores = {
+                'walls': get_template_store(construction_files.walls),
+                'windows': get_template_store(construction_files.windows),
+                'doors': get_template_store(construction_files.doors)
             }
 
             # Build template for current building
             bldg_template = {}
-            for element_type, years_dict in element_templates[
-                'windows'].items():
-                if element_type == 'Window':
-                    bldg_template[element_type] = self.get_element_template(
-                        element_type, year_of_construction, years_dict,
-                        sim_settings.construction_class_windows, self.logger)
-
-            for element_type, years_dict in element_templates['doors'].items():
-                if element_type == 'Door':
-                    bldg_template[element_type] = self.get_element_template(
-                        element_type, year_of_construction, years_dict,
-                        sim_settings.construction_class_doors, self.logger)
-
-            for element_type, years_dict in element_templates['walls'].items():
+            if 'Window' in stores['windows'].element_types:
+                bldg_template['Window'] = stores['windows'].get_template(
+                    'Window', year_of_construction,
+                    sim_settings.construction_class_windows)
+
+            if 'Door' in stores['doors'].element_types:
+                bldg_template['Door'] = stores['doors'].get_template(
+                    'Door', year_of_construction,
+                    sim_settings.construction_class_doors)
+
+            for element_type in stores['walls'].element_types:
                 if element_type not in ('Window', 'Door'):
-                    bldg_template[element_type] = self.get_element_template(
-                        element_type, year_of_construction, years_dict,
-                        sim_settings.construction_class_walls, self.logger)
+                    bldg_template[element_type] = stores[
+                        'walls'].get_template(
+                        element_type, year_of_construction,
+                        sim_settings.construction_class_walls)
 
             templates[building] = bldg_template
 
@@ -4,10 +4,11 @@ from bim2sim.kernel.decision import ListDecision, DecisionBunch
 from bim2sim.elements.bps_elements import ThermalZone
 from bim2sim.tasks.base import ITask
 from bim2sim.utilities.common_functions import get_use_conditions_dict, \
-    get_pattern_usage, wildcard_match, filter_elements
+    filter_elements
 from bim2sim.tasks.base import Playground
 from bim2sim.sim_settings import BuildingSimSettings
 from bim2sim.utilities.types import AttributeDataSource
+from bim2sim.utilities.usage_matching import UsageMatcher, get_usage_matcher
 
 
 class EnrichUseConditions(ITask):
@@ -40,10 +41,10 @@ class EnrichUseConditions(ITask):
 
             self.logger.info("enriches thermal zones usage")
             self.use_conditions = get_use_conditions_dict(custom_use_cond_path)
-            pattern_usage = get_pattern_usage(self.use_conditions,
+            usage_matcher = get_usage_matcher(self.use_conditions,
                                               custom_usage_path)
             final_usages = yield from self.enrich_usages(
-                pattern_usage, tz_elements)
+                usage_matcher, tz_elements)
             for tz, usage in final_usages.items():
                 orig_usage = tz.usage
                 tz.usage = usage
@@ -203,7 +204,7 @@ class EnrichUseConditions(ITask):
     @classmethod
     def enrich_usages(
             cls,
-            pattern_usage: dict,
+            pattern_usage: Union[dict, UsageMatcher],
             thermal_zones: Dict[str, ThermalZone]) -> Dict[str, ThermalZone]:
         """Sets the usage of the given thermal_zones and enriches them.
 
@@ -216,38 +217,27 @@ class EnrichUseConditions(ITask):
                 be stored for easier simulation.
 
         Args:
-            pattern_usage: Dict with custom and common pattern
+            pattern_usage: Dict with custom and common pattern or a
+                UsageMatcher created from it
             thermal_zones: dict with tz elements guid as key and the element
             itself as value
         Returns:
             final_usages: key: str of usage type, value: ThermalZone element
 
         """
+        if isinstance(pattern_usage, UsageMatcher):
+            usage_matcher = pattern_usage
+        else:
+            usage_matcher = UsageMatcher(pattern_usage)
         # selected_usage = {}
         final_usages = {}
         for tz in list(thermal_zones.values()):
             orig_usage = str(tz.usage)
-            if orig_usage in pattern_usage:
+            if orig_usage in usage_matcher:
                 final_usages[tz] = orig_usage
             else:
-                matches = []
-                list_org = tz.usage.replace(' (', ' ').replace(')', ' '). \
-                    replace(' -', ' ').replace(', ', ' ').split()
-                for usage in pattern_usage.keys():
-                    # check custom first
-                    if "custom" in pattern_usage[usage]:
-                        for cus_usage in pattern_usage[usage]["custom"]:
-                            # if cus_usage == tz.usage:
-                            if wildcard_match(cus_usage, tz.usage):
-                                if usage not in matches:
-                                    matches.append(usage)
-                    # if not found in custom, continue with common
-                    if len(matches) == 0:
-                        for i in pattern_usage[usage]["common"]:
-                            for i_name in list_org:
-                                if i.match(i_name):
-                                    if usage not in matches:
-                                        matches.append(usage)
+                # custom patterns first, if not found continue with common
+                matches = usage_matcher.match(tz.usage)
                 # if just one match
                 if len(matches) == 1:
                     # case its an office
@@ -263,7 +253,7 @@ class EnrichUseConditions(ITask):
                         final_usages[tz] = matches[0]
                 # if no matches given forward all (for decision)
                 elif len(matches) == 0:
-                    matches = list(pattern_usage.keys())
+                    matches = list(usage_matcher.usages)
                 if len(matches) > 1:
                     final_usages[tz] = cls.list_decision_usage(
                         tz, matches)
@@ -1,23 +1,32 @@
 import logging
+from typing import Optional
 
-import ifcopenshell
 from ifcopenshell import guid
 from OCC.Core.BRepAlgoAPI import BRepAlgoAPI_Cut
 from OCC.Core.BRepBuilderAPI import BRepBuilderAPI_MakeVertex
+from OCC.Core.BRepTools import breptools_ReadFromString, \
+    breptools_WriteToString
 from OCC.Core.BRepExtrema import BRepExtrema_DistShapeShape
 from OCC.Core.Extrema import Extrema_ExtFlag_MIN
-from OCC.Core.TopoDS import TopoDS_Face
+from OCC.Core.TopoDS import TopoDS_Face, TopoDS_Shape
 from OCC.Core.gp import gp_Pnt
 
 from bim2sim.elements.bps_elements import SpaceBoundary2B, ThermalZone, Door, \
     Window
 from bim2sim.tasks.base import ITask
 from bim2sim.tasks.bps import CorrectSpaceBoundaries
+from bim2sim.utilities.bound_index import ElementBoxIndex
 from bim2sim.utilities.common_functions import get_spaces_with_bounds
+from bim2sim.utilities.geometry_service import create_shape, get_settings
+from bim2sim.utilities.parallel import can_fork, map_in_processes
 from bim2sim.utilities.pyocc_tools import PyOCCTools
+from bim2sim.utilities.shape_cache import cached_shape, get_shape_profile
 
 logger = logging.getLogger(__name__)
 
+# state inherited by forked worker processes
+_worker_state = {}
+
 
 class AddSpaceBoundaries2B(ITask):
     """Fill gaps in set of space boundary per space with 2B space boundaries."""
@@ -80,6 +89,11 @@ class AddSpaceBoundaries2B(ITask):
         algorithm could be further improved by a verification of the space
         boundary type (type 2a or 2b).
 
+        The gaps of the spaces are independent of each other and are
+        computed in parallel if number_of_processes allows it. The building
+        elements of the new boundaries are searched in a bounding box index
+        per storey.
+
         Args:
             elements: dict[guid: element]
 
@@ -89,44 +103,54 @@ class AddSpaceBoundaries2B(ITask):
         logger.info("Generate space boundaries of type 2B")
         inst_2b = dict()
         spaces = get_spaces_with_bounds(elements)
-        for space_obj in spaces:
-            # compare surface area of IfcSpace shape with sum of space
-            # boundary shapes of this thermal zone.
-            space_surf_area = PyOCCTools.get_shape_area(space_obj.space_shape)
-            sb_area = 0
-            for bound in space_obj.space_boundaries:
-                if bound.parent_bound:
-                    continue
-                sb_area += PyOCCTools.get_shape_area(bound.bound_shape)
-            if (space_surf_area - sb_area) < 1e-2:
+        gap_shapes = self.compute_gap_shapes(
+            spaces, int(self.playground.sim_settings.number_of_processes))
+        element_shapes = {}
+        element_indices = {}
+        for space_obj, gap_shape in zip(spaces, gap_shapes):
+            if gap_shape is None:
                 continue
-            # spaces which reach this point have gaps in their boundaries.
-            space_obj.b_bound_shape = space_obj.space_shape
-            for bound in space_obj.space_boundaries:
-                if bound.bound_area.m == 0:
-                    continue
-                if PyOCCTools.get_shape_area(space_obj.b_bound_shape) == 0:
-                    continue
-                # exclude surfaces that are too far from space shape.
-                distance = BRepExtrema_DistShapeShape(
-                    space_obj.b_bound_shape,
-                    bound.bound_shape,
-                    Extrema_ExtFlag_MIN).Value()
-                if distance > 1e-6:
-                    continue
-                # cut the current shape from the (leftover) space shape.
-                space_obj.b_bound_shape = BRepAlgoAPI_Cut(
-                    space_obj.b_bound_shape, bound.bound_shape).Shape()
+            space_obj.b_bound_shape = gap_shape
             # extract faces from the leftover shape.
             faces = PyOCCTools.get_faces_from_shape(space_obj.b_bound_shape)
             if faces:
+                storey = space_obj.storeys[0] if space_obj.storeys else None
+                if storey not in element_indices:
+                    element_indices[storey] = ElementBoxIndex(
+                        shapes=element_shapes)
                 # create a new 2b space boundary for each face..
-                inst_2b.update(self.create_2b_space_boundaries(faces, space_obj))
+                inst_2b.update(self.create_2b_space_boundaries(
+                    faces, space_obj, element_indices[storey]))
         return inst_2b
 
+    @staticmethod
+    def compute_gap_shapes(spaces: list[ThermalZone], processes: int = 1)\
+            -> list[Optional[TopoDS_Shape]]:
+        """Compute the leftover shapes of spaces after cutting their bounds.
+
+        Args:
+            spaces: ThermalZone instances with space boundaries
+            processes: maximum number of worker processes
+
+        Returns:
+            leftover shape for each space, None if the space has no gaps
+        """
+        if processes <= 1 or len(spaces) < 2 or not can_fork():
+            return [compute_gap_shape(space_obj) for space_obj in spaces]
+        _worker_state['spaces'] = spaces
+        try:
+            results = map_in_processes(
+                _compute_gap_shape_in_worker, range(len(spaces)), processes,
+                fork=True)
+        finally:
+            _worker_state.clear()
+        return [breptools_ReadFromString(result)
+                if result is not None else None for result in results]
+
     @staticmethod
     def create_2b_space_boundaries(faces: list[TopoDS_Face],
-                                   space_obj: ThermalZone)\
+                                   space_obj: ThermalZone,
+                                   element_index: ElementBoxIndex = None)\
             -> dict[str: SpaceBoundary2B]:
         """Create new 2b space boundaries.
 
@@ -136,28 +160,37 @@ class AddSpaceBoundaries2B(ITask):
         Args:
             faces: list of TopoDS_Face
             space_obj: ThermalZone instance
+            element_index: index of the building element shapes, shared
+                between the spaces of a storey
 
         Returns:
             dict[guid: SpaceBoundary2B]
 
         """
-        settings = ifcopenshell.geom.main.settings()
-        settings.set(settings.USE_PYTHON_OPENCASCADE, True)
-        settings.set(settings.USE_WORLD_COORDS, True)
-        settings.set(settings.EXCLUDE_SOLIDS_AND_SURFACES, False)
-        settings.set(settings.INCLUDE_CURVES, True)
+        if element_index is None:
+            element_index = ElementBoxIndex()
+        profile = get_shape_profile(
+            'element_2b_shape', get_settings('element_2b_shape'))
         inst_2b = dict()
         bound_obj = []
 
         # generate a list of IFCBased elements (e.g. Wall) that are the
         # space surrounding elements. Initialize a shape (geometry) for these
-        # elements.
+        # elements once and add it to the index.
         for bound in space_obj.space_boundaries:
             if bound.bound_element and bound.bound_element.ifc.Representation:
-                bi = bound.bound_element.ifc
-                bound.bound_element.shape = ifcopenshell.geom.create_shape(
-                    settings, bi).geometry
-                bound_obj.append(bound.bound_element)
+                bound_element = bound.bound_element
+                if bound_element not in element_index:
+                    shape = element_index.get_shape(bound_element)
+                    if shape is None:
+                        shape = cached_shape(
+                            bound_element.ifc, profile,
+                            lambda: create_shape(
+                                bound_element.ifc,
+                                'element_2b_shape').geometry)
+                    element_index.add(bound_element, shape)
+                bound_element.shape = element_index.get_shape(bound_element)
+                bound_obj.append(bound_element)
 
         for i, face in enumerate(faces):
             b_bound = SpaceBoundary2B()
@@ -166,8 +199,14 @@ class AddSpaceBoundaries2B(ITask):
                 continue
             b_bound.guid = guid.new()
             b_bound.bound_thermal_zone = space_obj
-            # get the building element that is bounded by the current 2b bound
+            # get the building element that is bounded by the current 2b
+            # bound, only elements with a bounding box containing the center
+            # need an exact distance check.
+            candidates = element_index.query_point(
+                b_bound.bound_center.Coord())
             for instance in bound_obj:
+                if instance not in candidates:
+                    continue
                 if isinstance(instance, Door) or isinstance(instance, Window):
                     continue
                 center_shape = BRepBuilderAPI_MakeVertex(
@@ -181,3 +220,54 @@ class AddSpaceBoundaries2B(ITask):
             b_bound.bound_element.space_boundaries.append(b_bound)
             inst_2b[b_bound.guid] = b_bound
         return inst_2b
+
+
+def compute_gap_shape(space_obj: ThermalZone) -> Optional[TopoDS_Shape]:
+    """Cut all space boundaries from the space shape.
+
+    Args:
+        space_obj: ThermalZone instance
+
+    Returns:
+        leftover shape of the space, None if the space boundaries cover the
+        space shape
+    """
+    # compare surface area of IfcSpace shape with sum of space
+    # boundary shapes of this thermal zone.
+    space_surf_area = PyOCCTools.get_shape_area(space_obj.space_shape)
+    sb_area = 0
+    for bound in space_obj.space_boundaries:
+        if bound.parent_bound:
+            continue
+        sb_area += PyOCCTools.get_shape_area(bound.bound_shape)
+    if (space_surf_area - sb_area) < 1e-2:
+        return None
+    # spaces which reach this point have gaps in their boundaries.
+    b_bound_shape = space_obj.space_shape
+    for bound in space_obj.space_boundaries:
+        if bound.bound_area.m == 0:
+            continue
+        if PyOCCTools.get_shape_area(b_bound_shape) == 0:
+            continue
+        # exclude surfaces that are too far from space shape.
+        distance = BRepExtrema_DistShapeShape(
+            b_bound_shape,
+            bound.bound_shape,
+            Extrema_ExtFlag_MIN).Value()
+        if distance > 1e-6:
+            continue
+        # cut the current shape from the (leftover) space shape.
+        b_bound_shape = BRepAlgoAPI_Cut(
+            b_bound_shape, bound.bound_shape).Shape()
+    return b_bound_shape
+
+
+def _compute_gap_shape_in_worker(index: int) -> Optional[str]:
+    """Worker function executed in forked process for one space.
+
+    OCC shapes can't be pickled, hence the shape is returned as BRep string.
+    """
+    shape = compute_gap_shape(_worker_state['spaces'][index])
+    if shape is None:
+        return None
+    return breptools_WriteToString(shape)
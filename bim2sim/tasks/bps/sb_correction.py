@@ -11,6 +11,9 @@ import copy
 import logging
 from typing import Union
 
+from OCC.Core.BRepTools import breptools_ReadFromString, \
+    breptools_WriteToString
+
 from ifcopenshell import guid
 from OCC.Core.BRepBuilderAPI import BRepBuilderAPI_Transform, \
     BRepBuilderAPI_Sewing
@@ -21,7 +24,7 @@ from OCC.Core.Extrema import Extrema_ExtFlag_MIN
 from OCC.Core.GProp import GProp_GProps
 from OCC.Core.TopAbs import TopAbs_FACE
 from OCC.Core.TopExp import TopExp_Explorer
-from OCC.Core.TopoDS import topods_Face, TopoDS_Shape
+from OCC.Core.TopoDS import topods_Face, TopoDS_Shape, TopoDS_Face
 from OCC.Core.gp import gp_Pnt, gp_Trsf, gp_XYZ, gp_Vec
 
 from bim2sim.elements.bps_elements import ExternalSpatialElement, \
@@ -32,11 +35,15 @@ from bim2sim.tasks.common.inner_loop_remover import convex_decomposition, \
     is_convex_no_holes, is_convex_slow
 from bim2sim.utilities.common_functions import filter_elements, \
     get_spaces_with_bounds
+from bim2sim.utilities.decomposition import ConvexDecomposer
+from bim2sim.utilities.parallel import can_fork, map_in_processes
 from bim2sim.utilities.pyocc_tools import PyOCCTools
 from bim2sim.tasks.base import Playground
 
 logger = logging.getLogger(__name__)
 
+_worker_state = {}
+
 
 class CorrectSpaceBoundaries(ITask):
     """Advanced geometric preprocessing for Space Boundaries.
@@ -78,7 +85,8 @@ class CorrectSpaceBoundaries(ITask):
         # todo: refactor elements to initial_elements.
         # todo: space_boundaries should be already included in elements
         self.move_children_to_parents(elements)
-        self.fix_surface_orientation(elements)
+        self.fix_surface_orientation(
+            elements, int(self.playground.sim_settings.number_of_processes))
         self.split_non_convex_bounds(
             elements, self.playground.sim_settings.split_bounds)
         self.add_and_split_bounds_for_shadings(
@@ -109,7 +117,9 @@ class CorrectSpaceBoundaries(ITask):
                 for sb in elem.space_boundaries:
                     spatials.append(sb)
             if spatials and split_shadings:
-                self.split_non_convex_shadings(elements, spatials)
+                self.split_non_convex_shadings(
+                    elements, spatials,
+                    int(self.playground.sim_settings.number_of_processes))
 
     @staticmethod
     def move_children_to_parents(elements: dict):
@@ -170,19 +180,25 @@ class CorrectSpaceBoundaries(ITask):
                     opening_obj.reset('bound_center')
 
     @staticmethod
-    def fix_surface_orientation(elements: dict):
+    def fix_surface_orientation(elements: dict, processes: int = 1):
         """Fix orientation of space boundaries.
 
         Fix orientation of all surfaces but openings by sewing followed
         by disaggregation. Fix orientation of openings afterwards according
         to orientation of parent bounds.
 
+        Spaces are independent of each other, so the faces of all spaces are
+        sewed in worker processes first. The fixed faces are then matched to
+        the space boundaries space by space in the current process.
+
         Args:
             elements: dict[guid: element]
+            processes: maximum number of worker processes for sewing
         """
         logger.info("Fix surface orientation")
-        spaces = get_spaces_with_bounds(elements)
-        for space in spaces:
+        spaces = []
+        face_lists = []
+        for space in get_spaces_with_bounds(elements):
             face_list = []
             for bound in space.space_boundaries:
                 # get all bounds within a space except openings
@@ -199,26 +215,11 @@ class CorrectSpaceBoundaries(ITask):
                 for bound in space.space_boundaries_2B:
                     face = PyOCCTools.get_face_from_shape(bound.bound_shape)
                     face_list.append(face)
-            # sew all faces within the face_list together
-            sew = BRepBuilderAPI_Sewing(0.0001)
-            for fc in face_list:
-                sew.Add(fc)
-            sew.Perform()
-            sewed_shape = sew.SewedShape()
-            fixed_shape = sewed_shape
-            # check volume of the sewed shape. If negative, not all the
-            # surfaces have the same orientation
-            p = GProp_GProps()
-            brepgprop_VolumeProperties(fixed_shape, p)
-            if p.Mass() < 0:
-                # complements the surface orientation within the fixed shape
-                fixed_shape.Complement()
-            # disaggregate the fixed_shape to a list of fixed_faces
-            f_exp = TopExp_Explorer(fixed_shape, TopAbs_FACE)
-            fixed_faces = []
-            while f_exp.More():
-                fixed_faces.append(topods_Face(f_exp.Current()))
-                f_exp.Next()
+            spaces.append(space)
+            face_lists.append(face_list)
+        fixed_face_lists = CorrectSpaceBoundaries.compute_fixed_faces(
+            face_lists, processes)
+        for space, fixed_faces in zip(spaces, fixed_face_lists):
             for fc in fixed_faces:
                 # compute the surface normal for each face
                 face_normal = PyOCCTools.simple_face_normal(
@@ -265,6 +266,31 @@ class CorrectSpaceBoundaries(ITask):
                             bound.reset('bound_normal')
                         break
 
+    @staticmethod
+    def compute_fixed_faces(face_lists: list[list[TopoDS_Face]],
+                            processes: int = 1) -> list[list[TopoDS_Face]]:
+        """Sew the faces of each space and return the faces with fixed
+        orientation.
+
+        Args:
+            face_lists: list of the faces of each space
+            processes: maximum number of worker processes
+
+        Returns:
+            list of the fixed faces of each space, in the order of face_lists
+        """
+        if processes <= 1 or len(face_lists) < 2 or not can_fork():
+            return [sew_space_faces(faces) for faces in face_lists]
+        _worker_state['face_lists'] = face_lists
+        try:
+            results = map_in_processes(
+                _sew_space_faces_in_worker, range(len(face_lists)),
+                processes, fork=True)
+        finally:
+            _worker_state.clear()
+        return [[topods_Face(breptools_ReadFromString(face))
+                 for face in faces] for faces in results]
+
     def split_non_convex_bounds(self, elements: dict, split_bounds: bool):
         """Split non-convex space boundaries.
 
@@ -288,6 +314,12 @@ class CorrectSpaceBoundaries(ITask):
             bounds = filter_elements(elements, SpaceBoundary2B)
         # filter for boundaries, that are not opening boundaries
         bounds_except_openings = [b for b in bounds if not b.parent_bound]
+        # decompose all congruent bounds without openings only once and
+        # compute the decompositions of unique polygons in parallel
+        decomposer = ConvexDecomposer(
+            int(self.playground.sim_settings.number_of_processes))
+        n_unique = decomposer.prefetch(
+            self.get_non_convex_shapes(bounds_except_openings))
         conv = []  # list of new convex shapes (for debugging)
         non_conv = []  # list of old non-convex shapes (for debugging)
         for bound in bounds_except_openings:
@@ -315,7 +347,7 @@ class CorrectSpaceBoundaries(ITask):
                 else:
                     # if bound does not have openings, simply compute its
                     # convex decomposition and returns a list of convex_shapes
-                    convex_shapes = convex_decomposition(bound.bound_shape)
+                    convex_shapes = decomposer.decompose(bound.bound_shape)
                 non_conv.append(bound)
                 if hasattr(bound, 'bound_normal'):
                     bound.reset('bound_normal')
@@ -356,6 +388,39 @@ class CorrectSpaceBoundaries(ITask):
                 logger.warning(f"Unexpected {ex}. Converting bound "
                                f"{bound.guid} to convex shape failed. "
                                f"{type(ex)}")
+        logger.info(f"Decomposed {n_unique} unique polygons for "
+                    f"{len(non_conv)} non-convex space boundaries")
+
+    @staticmethod
+    def get_non_convex_shapes(bounds: list[SpaceBoundary]) \
+            -> list[TopoDS_Shape]:
+        """Shapes of non-convex bounds without openings.
+
+        Corresponding bounds are split together with their partner, so only
+        the first bound of each pair is considered.
+
+        Args:
+            bounds: list of SpaceBoundary without opening bounds
+
+        Returns:
+            list of shapes that will be decomposed
+        """
+        shapes = []
+        skip = set()
+        for bound in bounds:
+            if hasattr(bound, 'convex_processed') or id(bound) in skip:
+                continue
+            if bound.opening_bounds:
+                continue
+            try:
+                if is_convex_no_holes(bound.bound_shape):
+                    continue
+            except Exception:
+                continue
+            shapes.append(bound.bound_shape)
+            if bound.related_bound:
+                skip.add(id(bound.related_bound))
+        return shapes
 
     @staticmethod
     def create_new_boundary(
@@ -473,22 +538,27 @@ class CorrectSpaceBoundaries(ITask):
         return new_space_boundaries
 
     def split_non_convex_shadings(self, elements: dict,
-                                  spatial_bounds: list[SpaceBoundary]):
+                                  spatial_bounds: list[SpaceBoundary],
+                                  processes: int = 1):
         """Split non_convex shadings to convex shapes.
 
         Args:
             elements: dict[guid: element]
             spatial_bounds: list of SpaceBoundary, that are connected to an
                 ExternalSpatialElement
+            processes: maximum number of worker processes to decompose the
+                unique non-convex shading polygons
         """
         # only considers the first spatial element for now. Extend this if
         # needed.
         spatial_elem = filter_elements(elements, ExternalSpatialElement)[0]
+        decomposer = ConvexDecomposer(processes)
+        decomposer.prefetch(self.get_non_convex_shapes(spatial_bounds))
         for spatial in spatial_bounds:
             if is_convex_no_holes(spatial.bound_shape):
                 continue
             try:
-                convex_shapes = convex_decomposition(spatial.bound_shape)
+                convex_shapes = decomposer.decompose(spatial.bound_shape)
             except Exception as ex:
                 logger.warning(f"Unexpected {ex}. Converting shading bound "
                                f"{spatial.guid} to convex shape failed. "
@@ -501,3 +571,44 @@ class CorrectSpaceBoundaries(ITask):
             for new_bound in new_space_boundaries:
                 spatial_bounds.append(new_bound)
                 spatial_elem.space_boundaries.append(new_bound)
+
+
+def sew_space_faces(faces: list[TopoDS_Face]) -> list[TopoDS_Face]:
+    """Sew the faces of a space to a shell with consistent orientation.
+
+    Args:
+        faces: faces of the space boundaries of one space
+
+    Returns:
+        the faces of the sewed shape, oriented outwards
+    """
+    # sew all faces within the face_list together
+    sew = BRepBuilderAPI_Sewing(0.0001)
+    for fc in faces:
+        sew.Add(fc)
+    sew.Perform()
+    fixed_shape = sew.SewedShape()
+    # check volume of the sewed shape. If negative, not all the
+    # surfaces have the same orientation
+    p = GProp_GProps()
+    brepgprop_VolumeProperties(fixed_shape, p)
+    if p.Mass() < 0:
+        # complements the surface orientation within the fixed shape
+        fixed_shape.Complement()
+    # disaggregate the fixed_shape to a list of fixed_faces
+    f_exp = TopExp_Explorer(fixed_shape, TopAbs_FACE)
+    fixed_faces = []
+    while f_exp.More():
+        fixed_faces.append(topods_Face(f_exp.Current()))
+        f_exp.Next()
+    return fixed_faces
+
+
+def _sew_space_faces_in_worker(index: int) -> list[str]:
+    """Worker function executed in forked process for one space.
+
+    OCC shapes can't be pickled, hence the faces are returned as BRep
+    strings, which keep the orientation of the faces.
+    """
+    return [breptools_WriteToString(face) for face in
+            sew_space_faces(_worker_state['face_lists'][index])]
@@ -1,13 +1,14 @@
 import logging
 import math
-from typing import List, Union, Tuple, Dict
+import time
+from collections import ChainMap
+from typing import Dict, Iterable, List, Tuple, Union
 
 from OCC.Core.BRepBuilderAPI import BRepBuilderAPI_MakeVertex
 from OCC.Core.BRepExtrema import BRepExtrema_DistShapeShape
 from OCC.Core.Extrema import Extrema_ExtFlag_MIN
 from OCC.Core.gp import gp_Pnt, gp_Dir
 
-from bim2sim.elements.mapping.filter import TypeFilter
 from bim2sim.elements.base_elements import RelationBased, Element, IFCBased
 from bim2sim.elements.bps_elements import (
     SpaceBoundary, ExtSpatialSpaceBoundary, ThermalZone, Window, Door,
@@ -16,8 +17,11 @@ from bim2sim.elements.mapping.finder import TemplateFinder
 from bim2sim.elements.mapping.units import ureg
 from bim2sim.tasks.base import ITask
 from bim2sim.sim_settings import BaseSimSettings
+from bim2sim.utilities.bound_index import SpaceBoundaryIndex, OpeningIndex
 from bim2sim.utilities.common_functions import (
     get_spaces_with_bounds, all_subclasses)
+from bim2sim.utilities.geometry import prefetch_space_shapes, \
+    prefetch_bound_shapes
 
 logger = logging.getLogger(__name__)
 
@@ -52,17 +56,41 @@ class CreateSpaceBoundaries(ITask):
 
         if not self.playground.sim_settings.add_space_boundaries:
             return
+        zones = [ele for ele in elements.values()
+                 if isinstance(ele, ThermalZone)]
+        n_shapes = prefetch_space_shapes(
+            ifc_files, zones,
+            int(self.playground.sim_settings.number_of_processes))
+        logger.info(f"Created space shapes of {n_shapes} of {len(zones)} "
+                    f"zones in bulk")
         logger.info("Creates elements for IfcRelSpaceBoundarys")
-        type_filter = TypeFilter(('IfcRelSpaceBoundary',))
         space_boundaries = {}
         for ifc_file in ifc_files:
-            entity_type_dict, unknown_entities = type_filter.run(ifc_file.file)
+            start = time.perf_counter()
+            try:
+                entities = ifc_file.file.by_type('IfcRelSpaceBoundary')
+            except RuntimeError:
+                logger.info("No entity of type 'IfcRelSpaceBoundary' found")
+                entities = []
+            logger.info(f"Read {len(entities)} IfcRelSpaceBoundary entities "
+                        f"in {time.perf_counter() - start:.2f} s")
             bound_list = self.instantiate_space_boundaries(
-                entity_type_dict, elements, ifc_file.finder,
+                entities, elements, ifc_file.finder,
                 self.playground.sim_settings.create_external_elements,
                 ifc_file.ifc_units)
+            start = time.perf_counter()
+            n_shapes = prefetch_bound_shapes(
+                ifc_file, bound_list,
+                int(self.playground.sim_settings.number_of_processes))
+            if n_shapes:
+                logger.info(f"Created shapes of {n_shapes} space boundaries "
+                            f"in parallel in "
+                            f"{time.perf_counter() - start:.2f} s")
+            start = time.perf_counter()
             bound_elements = self.get_parents_and_children(
                 self.playground.sim_settings, bound_list, elements)
+            logger.info(f"Computed relationships between space boundaries in "
+                        f"{time.perf_counter() - start:.2f} s")
             bound_list = list(bound_elements.values())
             logger.info(f"Created {len(bound_elements)} bim2sim SpaceBoundary "
                         f"elements based on IFC file: {ifc_file.ifc_file_name}")
@@ -70,8 +98,11 @@ class CreateSpaceBoundaries(ITask):
         logger.info(f"Created {len(space_boundaries)} bim2sim SpaceBoundary "
                     f"elements in total for all IFC files.")
 
+        start = time.perf_counter()
         self.add_bounds_to_elements(elements, space_boundaries)
         self.remove_elements_without_sbs(elements)
+        logger.info(f"Added space boundaries to elements in "
+                    f"{time.perf_counter() - start:.2f} s")
 
     @staticmethod
     def remove_elements_without_sbs(elements: dict):
@@ -79,14 +110,10 @@ class CreateSpaceBoundaries(ITask):
 
         Those elements are usual not relevant for the simulation.
         """
-        elements_to_remove = []
-        for ele in elements.values():
-            if not any([isinstance(ele, bps_product_layer_ele) for
-                        bps_product_layer_ele in
-                        all_subclasses(BPSProductWithLayers)]):
-                continue
-            if not ele.space_boundaries:
-                elements_to_remove.append(ele.guid)
+        layer_classes = tuple(all_subclasses(BPSProductWithLayers))
+        elements_to_remove = [
+            ele.guid for ele in elements.values()
+            if isinstance(ele, layer_classes) and not ele.space_boundaries]
         for ele_guid_to_remove in elements_to_remove:
             del elements[ele_guid_to_remove]
 
@@ -152,9 +179,8 @@ class CreateSpaceBoundaries(ITask):
                     "base surfaces")
         drop_list = {}  # HACK: dictionary for bounds which have to be removed
         bound_dict = {bound.guid: bound for bound in boundaries}
-        temp_elements = elements.copy()
-        temp_elements.update(bound_dict)
-        # from elements (due to duplications)
+        # space boundaries take precedence over elements with the same guid
+        opening_index = OpeningIndex(ChainMap(bound_dict, elements))
         for inst_obj in boundaries:
             if inst_obj.level_description == "2b":
                 continue
@@ -163,8 +189,7 @@ class CreateSpaceBoundaries(ITask):
             if b_inst is None:
                 continue
             # assign opening elems (Windows, Doors) to parents and vice versa
-            related_opening_elems = \
-                self.get_related_opening_elems(b_inst, temp_elements)
+            related_opening_elems = opening_index.get_openings(b_inst)
             if not related_opening_elems:
                 continue
             # assign space boundaries of opening elems (Windows, Doors)
@@ -172,7 +197,7 @@ class CreateSpaceBoundaries(ITask):
             for opening in related_opening_elems:
                 op_bound = self.get_opening_boundary(
                     inst_obj, inst_obj_space, opening,
-                    sim_settings.max_wall_thickness)
+                    sim_settings.max_wall_thickness, opening_index)
                 if not op_bound:
                     continue
                 # HACK:
@@ -184,7 +209,8 @@ class CreateSpaceBoundaries(ITask):
                         < opening_area_tolerance:
                     rel_bound, drop_list = self.reassign_opening_bounds(
                         inst_obj, op_bound, b_inst, drop_list,
-                        sim_settings.max_wall_thickness)
+                        sim_settings.max_wall_thickness,
+                        opening_index=opening_index)
                     if not rel_bound:
                         continue
                     rel_bound.opening_bounds.append(op_bound)
@@ -197,39 +223,12 @@ class CreateSpaceBoundaries(ITask):
         bound_dict = {k: v for k, v in bound_dict.items() if k not in drop_list}
         return bound_dict
 
-    @staticmethod
-    def get_related_opening_elems(bound_element: Element, elements: dict) \
-            -> list[Union[Window, Door]]:
-        """Get related opening elements of current building element.
-
-        This function returns all opening elements of the current related
-        building element which is related to the current space boundary.
-
-        Args:
-            bound_element: BIM2SIM building element (e.g., Wall, Floor, ...)
-            elements: dict[guid: element]
-        Returns:
-            related_opening_elems: list of Window and Door elements
-        """
-        related_opening_elems = []
-        if not hasattr(bound_element.ifc, 'HasOpenings'):
-            return related_opening_elems
-        if len(bound_element.ifc.HasOpenings) == 0:
-            return related_opening_elems
-
-        for opening in bound_element.ifc.HasOpenings:
-            if hasattr(opening.RelatedOpeningElement, 'HasFillings'):
-                for fill in opening.RelatedOpeningElement.HasFillings:
-                    opening_obj = elements[
-                        fill.RelatedBuildingElement.GlobalId]
-                    related_opening_elems.append(opening_obj)
-        return related_opening_elems
-
     @staticmethod
     def get_opening_boundary(this_boundary: SpaceBoundary,
                              this_space: ThermalZone,
                              opening_elem: Union[Window, Door],
-                             max_wall_thickness=0.3) \
+                             max_wall_thickness=0.3,
+                             opening_index: OpeningIndex = None) \
             -> Union[SpaceBoundary, None]:
         """Get related opening boundary of another space boundary.
 
@@ -242,16 +241,26 @@ class CreateSpaceBoundaries(ITask):
             opening_elem: BIM2SIM element of Window or Door.
             max_wall_thickness: maximum expected wall thickness in the building.
                 Space boundaries of openings may be displaced by this distance.
+            opening_index: optional OpeningIndex to look up the opening
+                bounds of this_space and skip distant bounds by their boxes
         Returns:
             opening_boundary: Union[SpaceBoundary, None]
         """
         opening_boundary: Union[SpaceBoundary, None] = None
         distances = {}
-        for op_bound in opening_elem.space_boundaries:
-            if not op_bound.ifc.RelatingSpace == this_space:
-                continue
+        if opening_index:
+            op_bounds = opening_index.get_opening_bounds(
+                opening_elem, this_space)
+        else:
+            op_bounds = [b for b in opening_elem.space_boundaries
+                         if b.ifc.RelatingSpace == this_space]
+        for op_bound in op_bounds:
             if op_bound in this_boundary.opening_bounds:
                 continue
+            if opening_index and opening_index.point_distance(
+                    this_boundary, op_bound.bound_center.Coord()) \
+                    > max_wall_thickness:
+                continue
             center_shape = BRepBuilderAPI_MakeVertex(
                 gp_Pnt(op_bound.bound_center)).Shape()
             center_dist = BRepExtrema_DistShapeShape(
@@ -273,7 +282,8 @@ class CreateSpaceBoundaries(ITask):
                                 bound_element: Element,
                                 drop_list: dict[str, SpaceBoundary],
                                 max_wall_thickness=0.3,
-                                angle_tolerance=0.1) -> \
+                                angle_tolerance=0.1,
+                                opening_index: OpeningIndex = None) -> \
             tuple[SpaceBoundary, dict[str, SpaceBoundary]]:
         """Fix assignment of parent and child space boundaries.
 
@@ -302,6 +312,8 @@ class CreateSpaceBoundaries(ITask):
             max_wall_thickness: maximum expected wall thickness in the building.
                 Space boundaries of openings may be displaced by this distance.
             angle_tolerance: tolerance for comparison of surface normal angles.
+            opening_index: optional OpeningIndex to look up the bounds with
+                inner loops and skip distant bounds by their boxes
         Returns:
             rel_bound: New parent boundary for the opening that had the same
                 geometry as its previous parent boundary
@@ -327,6 +339,9 @@ class CreateSpaceBoundaries(ITask):
                 if not (angle < 0 + angle_tolerance
                         or angle > 180 - angle_tolerance):
                     continue
+                if opening_index and opening_index.box_distance(
+                        b, opening_boundary) > max_wall_thickness:
+                    continue
                 distance = BRepExtrema_DistShapeShape(
                     b.bound_shape,
                     opening_boundary.bound_shape,
@@ -337,10 +352,14 @@ class CreateSpaceBoundaries(ITask):
                 else:
                     rel_bound = b
         else:
-            tzb = \
-                [b for b in
-                 opening_boundary.bound_thermal_zone.space_boundaries if
-                 b.ifc.ConnectionGeometry.SurfaceOnRelatingElement.InnerBoundaries]
+            if opening_index:
+                tzb = opening_index.get_inner_loop_bounds(
+                    opening_boundary.bound_thermal_zone)
+            else:
+                tzb = \
+                    [b for b in
+                     opening_boundary.bound_thermal_zone.space_boundaries if
+                     b.ifc.ConnectionGeometry.SurfaceOnRelatingElement.InnerBoundaries]
             for b in tzb:
                 # check if orientation of possibly related bound is the same
                 # as opening
@@ -357,6 +376,9 @@ class CreateSpaceBoundaries(ITask):
                 if not (angle < 0 + angle_tolerance
                         or angle > 180 - angle_tolerance):
                     continue
+                if opening_index and opening_index.box_distance(
+                        b, opening_boundary) > max_wall_thickness:
+                    continue
                 distance = BRepExtrema_DistShapeShape(
                     b.bound_shape,
                     opening_boundary.bound_shape,
@@ -369,17 +391,23 @@ class CreateSpaceBoundaries(ITask):
         return rel_bound, drop_list
 
     def instantiate_space_boundaries(
-            self, entities_dict: dict, elements: dict, finder:
+            self, entities: Iterable, elements: dict, finder:
             TemplateFinder,
             create_external_elements: bool, ifc_units: dict[str, ureg]) \
             -> List[RelationBased]:
-        """Instantiate space boundary ifc_entities.
+        """Instantiate space boundaries from IfcRelSpaceBoundary entities.
 
         This function instantiates space boundaries using given element class.
         Result is a list with the resulting valid elements.
 
+        The entities are scanned once, the relating space of each
+        IfcSpace or IfcExternalSpatialElement is only looked up once. Entities
+        without relating space element are skipped before instantiation. All
+        boundaries are attached to their spaces and building elements in one
+        step afterwards, see attach_space_boundaries.
+
         Args:
-            entities_dict: dict of Ifc Entities (as str)
+            entities: IfcRelSpaceBoundary entities, e.g. from by_type
             elements: dict[guid: element]
             finder: BIM2SIM TemplateFinder
             create_external_elements: bool, True if external spatial elements 
@@ -388,31 +416,52 @@ class CreateSpaceBoundaries(ITask):
         Returns:
             list of dict[guid: SpaceBoundary]
         """
-        element_lst = {}
-        for entity in entities_dict:
+        start = time.perf_counter()
+        # for RelatingSpaces both IfcSpace and IfcExternalSpatialElement are
+        # considered
+        spaces = {}
+        selected = []
+        for entity in entities:
             if entity.is_a() == 'IfcRelSpaceBoundary1stLevel' or \
                     entity.Name == '1stLevel':
                 continue
-            if entity.RelatingSpace.is_a('IfcSpace'):
-                element = SpaceBoundary.from_ifc(
-                    entity, elements=element_lst, finder=finder,
-                    ifc_units=ifc_units)
-            elif create_external_elements and entity.RelatingSpace.is_a(
-                    'IfcExternalSpatialElement'):
-                element = ExtSpatialSpaceBoundary.from_ifc(
-                    entity, elements=element_lst, finder=finder,
-                    ifc_units=ifc_units)
-            else:
+            ifc_space = entity.RelatingSpace
+            try:
+                bound_class, relating_space = spaces[ifc_space.id()]
+            except KeyError:
+                if ifc_space.is_a('IfcSpace'):
+                    bound_class = SpaceBoundary
+                elif create_external_elements and ifc_space.is_a(
+                        'IfcExternalSpatialElement'):
+                    bound_class = ExtSpatialSpaceBoundary
+                else:
+                    bound_class = None
+                relating_space = elements.get(ifc_space.GlobalId, None)
+                spaces[ifc_space.id()] = bound_class, relating_space
+            if bound_class is None or relating_space is None:
                 continue
-            # for RelatingSpaces both IfcSpace and IfcExternalSpatialElement are
-            # considered
-            relating_space = elements.get(
-                element.ifc.RelatingSpace.GlobalId, None)
-            if relating_space is not None:
-                self.connect_space_boundaries(element, relating_space,
-                                              elements)
-                element_lst[element.guid] = element
+            selected.append((entity, bound_class, relating_space))
+        scan_time = time.perf_counter() - start
 
+        start = time.perf_counter()
+        element_lst = {}
+        bound_index = SpaceBoundaryIndex(element_lst)
+        bounds = []
+        for entity, bound_class, relating_space in selected:
+            element = bound_class.from_ifc(
+                entity, elements=element_lst, bound_index=bound_index,
+                finder=finder, ifc_units=ifc_units)
+            bounds.append((element, relating_space))
+            element_lst[element.guid] = element
+        create_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        self.attach_space_boundaries(bounds, elements)
+        attach_time = time.perf_counter() - start
+        logger.info(f"Instantiated {len(bounds)} space boundaries of "
+                    f"{len(spaces)} spaces (scan: {scan_time:.2f} s, "
+                    f"create: {create_time:.2f} s, "
+                    f"attach: {attach_time:.2f} s)")
         return list(element_lst.values())
 
     def connect_space_boundaries(
@@ -428,17 +477,47 @@ class CreateSpaceBoundaries(ITask):
             relating_space: ThermalZone (relating space)
             elements: dict[guid: element]
             """
-        relating_space.space_boundaries.append(space_boundary)
-        space_boundary.bound_thermal_zone = relating_space
+        self.attach_space_boundaries([(space_boundary, relating_space)],
+                                     elements)
 
-        if space_boundary.ifc.RelatedBuildingElement:
+    def attach_space_boundaries(
+            self, bounds: List[Tuple[SpaceBoundary, ThermalZone]],
+            elements: dict[str, IFCBased]):
+        """Connect space boundaries with their relating spaces in bulk.
+
+        Like connect_space_boundaries for each boundary, but the boundaries
+        are grouped by relating space and building element first and added
+        to their lists in one step. The order of all lists is the same as
+        connecting the boundaries one by one.
+
+        Args:
+            bounds: list of tuples (SpaceBoundary, relating space)
+            elements: dict[guid: element]
+        """
+        space_bounds = {}
+        element_bounds = {}
+        space_elements = {}
+        for space_boundary, relating_space in bounds:
+            space_bounds.setdefault(relating_space, []).append(space_boundary)
+            space_boundary.bound_thermal_zone = relating_space
+            if not space_boundary.ifc.RelatedBuildingElement:
+                continue
             related_building_element = elements.get(
                 space_boundary.ifc.RelatedBuildingElement.GlobalId, None)
             if related_building_element:
-                related_building_element.space_boundaries.append(space_boundary)
+                element_bounds.setdefault(
+                    related_building_element, []).append(space_boundary)
                 space_boundary.bound_element = related_building_element
-                self.connect_element_to_zone(relating_space,
-                                              related_building_element)
+                space_elements[relating_space, related_building_element] = \
+                    None
+        for relating_space, space_boundaries in space_bounds.items():
+            relating_space.space_boundaries.extend(space_boundaries)
+        for related_building_element, space_boundaries in \
+                element_bounds.items():
+            related_building_element.space_boundaries.extend(space_boundaries)
+        for relating_space, related_building_element in space_elements:
+            self.connect_element_to_zone(relating_space,
+                                         related_building_element)
 
     @staticmethod
     def connect_element_to_zone(thermal_zone: ThermalZone,
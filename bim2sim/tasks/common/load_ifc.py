@@ -5,6 +5,7 @@ from pathlib import Path
 
 from bim2sim.kernel.ifc_file import IfcFileClass
 from bim2sim.tasks.base import ITask
+from bim2sim.utilities.shape_cache import ShapeCache, set_shape_cache
 from bim2sim.utilities.types import IFCDomain
 
 
@@ -21,8 +22,23 @@ class LoadIFC(ITask):
     def run(self):
         self.logger.info("Loading IFC files")
         ifc_files = yield from self.load_ifc_files(self.paths.ifc_base)
+        self.set_geometry_cache(ifc_files)
         return ifc_files,
 
+    def set_geometry_cache(self, ifc_files: list):
+        """Activate the geometry cache for ifc_files if enabled.
+
+        Shapes are stored in the folder geometry_cache of the project.
+        """
+        if not self.playground.sim_settings.use_geometry_cache:
+            set_shape_cache(None)
+            return
+        cache = ShapeCache(self.paths.root / 'geometry_cache')
+        for ifc_file in ifc_files:
+            cache.register_file(ifc_file.file, ifc_file.ifc_path)
+        set_shape_cache(cache)
+        self.logger.info("Geometry cache activated in %s", cache.directory)
+
     def load_ifc_files(self, base_path: Path):
         """Load all ifc files in given base_path or a specific file in this path
 
@@ -0,0 +1,219 @@
+"""Array based polygon kernel for batches of planar polygons.
+
+The functions in inner_loop_remover work on single polygons given as lists of
+vertex tuples. This module stores many polygons in one vertex array
+(`PolygonBatch`) and evaluates convexity tests with vectorised cross
+products for the whole batch at once. Polygons without holes are
+triangulated by ear clipping with vectorised ear tests, which does not need
+an OCC mesh, and fused to convex pieces with `fuse_pieces`.
+
+The convexity tests give the same results as their counterparts in
+inner_loop_remover (see the parity tests).
+"""
+from typing import Iterable, List, Sequence
+
+import numpy as np
+from OCC.Core.TopoDS import TopoDS_Shape
+
+from bim2sim.tasks.common.inner_loop_remover import Vertex, Triangulation, \
+    fuse_pieces
+from bim2sim.utilities.pyocc_tools import PyOCCTools
+
+
+class PolygonBatch:
+    """Many polygons stored in one array of vertices.
+
+    Args:
+        vertices: array of shape (n, 3) with the vertices of all polygons
+        offsets: array of shape (m + 1,), the vertices of polygon i are
+            vertices[offsets[i]:offsets[i + 1]]
+    """
+
+    def __init__(self, vertices: np.ndarray, offsets: np.ndarray):
+        self.vertices = np.asarray(vertices, dtype=float).reshape(-1, 3)
+        self.offsets = np.asarray(offsets, dtype=np.intp)
+
+    @classmethod
+    def from_polygons(cls, polygons: Iterable[Sequence[Vertex]]) \
+            -> 'PolygonBatch':
+        """Create batch from polygons given as lists of vertex tuples."""
+        polygons = list(polygons)
+        lengths = [len(polygon) for polygon in polygons]
+        offsets = np.zeros(len(polygons) + 1, dtype=np.intp)
+        np.cumsum(lengths, out=offsets[1:])
+        vertices = [vertex for polygon in polygons for vertex in polygon]
+        return cls(np.array(vertices, dtype=float).reshape(-1, 3), offsets)
+
+    @classmethod
+    def from_shapes(cls, shapes: Iterable[TopoDS_Shape]) -> 'PolygonBatch':
+        """Create batch from the (outer) points of planar faces."""
+        return cls.from_polygons(
+            [pnt.Coord() for pnt in PyOCCTools.get_points_of_face(shape)]
+            for shape in shapes)
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    @property
+    def lengths(self) -> np.ndarray:
+        """Number of vertices of each polygon."""
+        return np.diff(self.offsets)
+
+    def polygon(self, index: int) -> np.ndarray:
+        """Vertices of polygon index as array view."""
+        return self.vertices[self.offsets[index]:self.offsets[index + 1]]
+
+    def polygon_ids(self) -> np.ndarray:
+        """Index of the polygon each vertex belongs to."""
+        return np.repeat(np.arange(len(self)), self.lengths)
+
+    def shifted(self, shift: int) -> np.ndarray:
+        """Vertex array with the vertex shift positions later in each polygon.
+
+        The shift wraps around within each polygon, e.g. shift 1 returns the
+        following vertex of each vertex.
+        """
+        positions = np.arange(len(self.vertices)) - np.repeat(
+            self.offsets[:-1], self.lengths)
+        lengths = np.repeat(self.lengths, self.lengths)
+        return self.vertices[np.repeat(self.offsets[:-1], self.lengths)
+                             + (positions + shift) % lengths]
+
+
+def polygon_normals(batch: PolygonBatch) -> np.ndarray:
+    """Normals of all polygons (Newell's method), not normalized."""
+    if not len(batch.vertices):
+        return np.zeros((len(batch), 3))
+    terms = np.cross(batch.vertices, batch.shifted(1))
+    starts = batch.offsets[:-1]
+    normals = np.zeros((len(batch), 3))
+    non_empty = batch.lengths > 0
+    normals[non_empty] = np.add.reduceat(terms, starts[non_empty], axis=0)
+    return normals
+
+
+def is_convex_no_holes_batch(batch: PolygonBatch) -> np.ndarray:
+    """Vectorised `is_polygon_convex_no_holes` for all polygons of batch.
+
+    As the original, this compares the z-components of the cross products of
+    consecutive edges: a polygon is non-convex if the sign changes between
+    consecutive vertices while the cross product is not negligible.
+
+    Returns:
+        boolean array, True for convex polygons
+    """
+    p0 = batch.vertices
+    p1 = batch.shifted(1)
+    p2 = batch.shifted(2)
+    cross = np.cross(p1 - p0, p2 - p1)[:, 2]
+    previous = np.roll(cross, 1)
+    violation = (previous != 0) & (np.abs(cross) >= 1e-6) & \
+        (np.sign(cross) != np.sign(previous))
+    # the first vertex of each polygon has no predecessor to compare with
+    violation[batch.offsets[:-1][batch.lengths > 0]] = False
+    n_violations = np.zeros(len(batch), dtype=np.intp)
+    np.add.at(n_violations, batch.polygon_ids(), violation)
+    return n_violations == 0
+
+
+def is_convex_angle_batch(p1: np.ndarray, p2: np.ndarray, p3: np.ndarray,
+                          normals: np.ndarray) -> np.ndarray:
+    """Vectorised `_is_convex_angle` for arrays of vertices of shape (n, 3)."""
+    cross = np.cross(p2 - p1, p3 - p1)
+    return np.einsum('ij,ij->i', cross, normals) >= -1e-6
+
+
+def _project_to_plane(points: np.ndarray, normal: np.ndarray) -> np.ndarray:
+    """2D coordinates of points, counter-clockwise seen from normal."""
+    axis = int(np.argmax(np.abs(normal)))
+    u, v = [(1, 2), (2, 0), (0, 1)][axis]
+    projected = points[:, [u, v]]
+    if normal[axis] < 0:
+        projected = projected[:, ::-1]
+    return projected
+
+
+def _triangulate_polygon(points: np.ndarray, normal: np.ndarray,
+                         eps: float = 1e-12) -> List[List[int]]:
+    """Ear clipping of a simple polygon, returns triangles as indices."""
+    uv = _project_to_plane(points, normal)
+    remaining = list(range(len(points)))
+    triangles = []
+    while len(remaining) > 3:
+        idx = np.array(remaining)
+        prev = np.roll(idx, 1)
+        nxt = np.roll(idx, -1)
+        a, b, c = uv[prev], uv[idx], uv[nxt]
+        ab, bc = b - a, c - b
+        cross = ab[:, 0] * bc[:, 1] - ab[:, 1] * bc[:, 0]
+        ear = None
+        for k in np.flatnonzero(cross > eps):
+            # no other remaining vertex may lie inside or on the triangle
+            others = np.delete(uv[idx], [(k - 1) % len(idx), k,
+                                         (k + 1) % len(idx)], axis=0)
+            if not len(others) or not _points_in_triangle(
+                    others, a[k], b[k], c[k], eps).any():
+                ear = k
+                break
+        if ear is None:
+            # only degenerate (collinear) or reflex vertices are left, remove
+            # the most degenerate vertex to continue
+            ear = int(np.argmin(np.abs(cross)))
+            if abs(cross[ear]) > eps:
+                triangles.append([prev[ear], idx[ear], nxt[ear]])
+        else:
+            triangles.append([prev[ear], idx[ear], nxt[ear]])
+        del remaining[ear]
+    if len(remaining) == 3:
+        a, b, c = uv[remaining]
+        ab, bc = b - a, c - b
+        if abs(ab[0] * bc[1] - ab[1] * bc[0]) > eps:
+            triangles.append(remaining)
+    return [[int(i) for i in triangle] for triangle in triangles]
+
+
+def _points_in_triangle(points: np.ndarray, a: np.ndarray, b: np.ndarray,
+                        c: np.ndarray, eps: float) -> np.ndarray:
+    """Which of the 2D points lie inside or on the ccw triangle a, b, c."""
+    def side(p, q):
+        return (q[0] - p[0]) * (points[:, 1] - p[1]) - \
+            (q[1] - p[1]) * (points[:, 0] - p[0])
+    return (side(a, b) >= -eps) & (side(b, c) >= -eps) & \
+        (side(c, a) >= -eps)
+
+
+def triangulate_batch(batch: PolygonBatch) -> List[Triangulation]:
+    """Triangulate all polygons (without holes) of batch.
+
+    The triangles keep the orientation of their polygon and are returned as
+    lists of vertex tuples like the triangulations in inner_loop_remover.
+    """
+    normals = polygon_normals(batch)
+    result = []
+    for index in range(len(batch)):
+        points = batch.polygon(index)
+        vertices = [tuple(point) for point in points.tolist()]
+        if len(points) < 3 or not np.any(normals[index]):
+            result.append([])
+            continue
+        result.append([[vertices[i] for i in triangle] for triangle in
+                       _triangulate_polygon(points, normals[index])])
+    return result
+
+
+def convex_pieces_batch(batch: PolygonBatch) -> List[List[List[Vertex]]]:
+    """Convex pieces of all polygons (without holes) of batch.
+
+    Convex polygons are returned unchanged, all others are triangulated and
+    fused to convex pieces with `fuse_pieces`.
+    """
+    convex = is_convex_no_holes_batch(batch)
+    triangulations = triangulate_batch(batch)
+    result = []
+    for index in range(len(batch)):
+        if convex[index] or not triangulations[index]:
+            result.append(
+                [[tuple(point) for point in batch.polygon(index).tolist()]])
+        else:
+            result.append(fuse_pieces(triangulations[index]))
+    return result
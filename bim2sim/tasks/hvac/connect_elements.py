@@ -329,6 +329,12 @@ class ConnectElements(ITask):
             Generator[DecisionBunch, None, None]:
         """Check inner connections of HVACProducts.
 
+        Elements without inner connections are grouped by their port layout
+        (see HVACProduct.get_port_layout). Only one VL and RL decision is
+        created per group and all decisions are yielded in a single
+        DecisionBunch. The answer for the first element of a group is applied
+        to all other elements of the group by port index.
+
         Args:
             elements: An iterable of elements, where each element is a subclass
                 of ProductBased.
@@ -337,12 +343,31 @@ class ConnectElements(ITask):
             Yields decisions to set inner connections.
 
         """
-        # TODO: if a lot of decisions occur, it would help to merge
-        #  DecisionBunches before yielding them
+        groups = {}
         for element in elements:
             if isinstance(element, hvac.HVACProduct) \
-                    and not element.inner_connections:
-                yield from element.decide_inner_connections()
+                    and not element.inner_connections \
+                    and len(element.ports) >= 2:
+                groups.setdefault(element.get_port_layout(), []).append(
+                    element)
+        if not groups:
+            return
+
+        decisions = {}
+        for layout, group in groups.items():
+            decisions[layout] = group[0].get_inner_connection_decisions(
+                len(group) - 1)
+        yield DecisionBunch(
+            [decision for pair in decisions.values() for decision in pair])
+
+        for layout, group in groups.items():
+            decision_vl, decision_rl = decisions[layout]
+            guids = [port.guid for port in group[0].ports]
+            vl_index = guids.index(decision_vl.value)
+            rl_index = guids.index(decision_rl.value)
+            for element in group:
+                element.set_inner_connection(
+                    element.ports[vl_index], element.ports[rl_index])
 
     @staticmethod
     def connections_by_boundingbox(open_ports, elements):
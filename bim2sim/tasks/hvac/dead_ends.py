@@ -1,5 +1,6 @@
 from bim2sim.kernel.decision import BoolDecision, DecisionBunch
 from bim2sim.elements.graphs.hvac_graph import HvacGraph
+from bim2sim.elements.graphs.plotting import GraphPlotter
 from bim2sim.tasks.base import ITask
 from bim2sim.tasks.base import Playground
 
@@ -18,7 +19,7 @@ class DeadEnds(ITask):
         3. Prompts and yields decisions regarding the removal of dead ends and
         updates the graph accordingly.
         4. Logs the number of ports removed due to dead ends.
-        5. Optionally, plots the HVAC graph in debug mode.
+        5. Optionally, plots the HVAC graph if create_graph_plots is set.
 
         Args:
             graph: HVAC graph containing elements and ports.
@@ -33,10 +34,13 @@ class DeadEnds(ITask):
         graph, n_removed = yield from self.decide_dead_ends(
             graph, pot_dead_ends, False)
         self.logger.info("Removed %s ports due to found dead ends." % n_removed)
-        if __debug__:
+        if self.playground.sim_settings.create_graph_plots:
             self.logger.info("Plotting graph ...")
-            graph.plot(self.paths.export)
-            graph.plot(self.paths.export, ports=True)
+            plotter = GraphPlotter.from_sim_settings(
+                self.paths.export, self.playground.sim_settings)
+            self.playground.background_jobs.append(plotter)
+            plotter.plot(graph)
+            plotter.plot(graph, ports=True)
         return graph,
 
     @staticmethod
@@ -3,7 +3,10 @@ import logging
 from bim2sim.elements.aggregation.hvac_aggregations import UnderfloorHeating, \
     Consumer, PipeStrand, ParallelPump, ConsumerHeatingDistributorModule, \
     GeneratorOneFluid
+from bim2sim.elements.aggregation.matching import MatchCache, \
+    find_matches_per_component
 from bim2sim.elements.graphs.hvac_graph import HvacGraph
+from bim2sim.elements.graphs.plotting import GraphPlotter
 from bim2sim.kernel.decision import BoolDecision, DecisionBunch
 from bim2sim.tasks.base import ITask
 
@@ -19,9 +22,14 @@ class Reduce(ITask):
         This task applies aggregations to the HVAC graph based on the specified
         aggregation classes. It logs information about the number of elements
         before and after applying aggregations, as well as the statistics for
-        each aggregation class. The task also updates the graph and logs
-        relevant information. If the code is running in debug mode, it plots
-        the graph using different options.
+        each aggregation class. If number_of_processes in the sim_settings is
+        larger than one, matches are searched in parallel for the independent
+        parts of the network. If incremental_aggregation is set, the matches of
+        each part are stored in the export folder and reused in the next run
+        for all parts which did not change. The task also updates the graph
+        and logs relevant information. If create_graph_plots is set in the
+        sim_settings, the graph is plotted using different options, by default
+        in a background process while the following tasks continue.
 
         Args:
             graph: The HVAC graph.
@@ -43,13 +51,19 @@ class Reduce(ITask):
         aggregations = [aggregations_cls[agg] for agg in
                         self.playground.sim_settings.aggregations]
 
+        processes = int(self.playground.sim_settings.number_of_processes)
+        cache = None
+        if self.playground.sim_settings.incremental_aggregation:
+            cache = MatchCache(self.paths.export / 'aggregation_matches.pickle')
+            cache.load()
         statistics = {}
         number_of_elements_before = len(graph.elements)
 
         for agg_class in aggregations:
             name = agg_class.__name__
             self.logger.info(f"Aggregating {name} ...")
-            matches, metas = agg_class.find_matches(graph)
+            matches, metas = find_matches_per_component(
+                agg_class, graph, processes, cache)
             i = 0
             for match, meta in zip(matches, metas):
                 try:
@@ -71,6 +85,11 @@ class Reduce(ITask):
             else:
                 self.logger.info(f"Found non Aggregations of type {name}")
         number_of_elements_after = len(graph.elements)
+        if cache is not None:
+            cache.save()
+            self.logger.info(
+                "Reused matches of %d unchanged parts of the network, "
+                "searched %d parts.", cache.hits, cache.misses)
 
         log_str = "Aggregations reduced number of elements from %d to %d:" % \
                   (number_of_elements_before, number_of_elements_after)
@@ -78,11 +97,14 @@ class Reduce(ITask):
             log_str += "\n  - %s: %d" % (aggregation, count)
         self.logger.info(log_str)
 
-        if __debug__:
+        if self.playground.sim_settings.create_graph_plots:
             self.logger.info("Plotting graph ...")
-            graph.plot(self.paths.export)
-            graph.plot(self.paths.export, ports=True)
-            graph.plot(self.paths.export, ports=False, use_pyvis=True)
+            plotter = GraphPlotter.from_sim_settings(
+                self.paths.export, self.playground.sim_settings)
+            self.playground.background_jobs.append(plotter)
+            plotter.plot(graph)
+            plotter.plot(graph, ports=True)
+            plotter.plot(graph, ports=False, use_pyvis=True)
 
         return graph,
 
@@ -90,10 +112,11 @@ class Reduce(ITask):
     def set_flow_sides(graph: HvacGraph):
         """ Set flow sides for ports in HVAC graph based on known flow sides.
 
-        This function iteratively sets flow sides for ports in the HVAC graph.
-        It uses a recursive method (`recurse_set_unknown_sides`) to determine
-        the flow side for each unset port. The function may prompt the user
-        for decisions in case of conflicts or unknown sides.
+        This function sets flow sides for all ports in the HVAC graph with
+        unknown flow side. It uses the graph pass
+        `HvacGraph.propagate_flow_sides` to determine the flow side of all
+        unset ports in one traversal. The function may prompt the user for
+        decisions in case of conflicts and repeats the pass afterwards.
 
         Args:
              graph: The HVAC graph.
@@ -102,43 +125,28 @@ class Reduce(ITask):
             DecisionBunch: A collection of decisions may be yielded during the
                 task.
         """
-        # TODO: needs testing!
         # TODO: at least one master element required
-        accepted = []
+        decided = set()
         while True:
-            unset_port = None
-            for port in graph.get_nodes():
-                if port.flow_side == 0 and graph.graph[port] \
-                        and port not in accepted:
-                    unset_port = port
-                    break
-            if unset_port:
-                side, visited, masters = graph.recurse_set_unknown_sides(
-                    unset_port)
-                if side in (-1, 1):
-                    # apply suggestions
-                    for port in visited:
-                        port.flow_side = side
-                elif side == 0:
-                    # TODO: ask user?
-                    accepted.extend(visited)
-                elif masters:
-                    # ask user to fix conflicts (and retry in next while loop)
-                    for port in masters:
-                        decision = BoolDecision(
-                            "Use %r as VL (y) or RL (n)?" % port,
-                            global_key= "Use_port_%s" % port.guid)
-                        yield DecisionBunch([decision])
-                        use = decision.value
-                        if use:
-                            port.flow_side = 1
-                        else:
-                            port.flow_side = -1
-                else:
-                    # can not be solved (no conflicting masters)
-                    # TODO: ask user?
-                    accepted.extend(visited)
-            else:
-                # done
+            sides, conflicts = graph.propagate_flow_sides()
+            # apply suggestions
+            for port, side in sides.items():
+                port.flow_side = side
+            # ask user to fix conflicts (and retry in next loop)
+            undecided = list(dict.fromkeys(
+                port for _, masters in conflicts for port in masters
+                if port not in decided))
+            if not undecided:
+                # regions without masters or with unsolvable conflicts
+                # TODO: ask user?
                 logging.info("Flow_side set")
                 break
+            decisions = DecisionBunch()
+            for port in undecided:
+                decisions.append(BoolDecision(
+                    "Use %r as VL (y) or RL (n)?" % port,
+                    global_key="Use_port_%s" % port.guid))
+            yield decisions
+            for port, decision in zip(undecided, decisions):
+                port.flow_side = 1 if decision.value else -1
+                decided.add(port)
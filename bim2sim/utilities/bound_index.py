@@ -0,0 +1,231 @@
+"""Spatial indices used in the processing of space boundaries.
+
+Virtual space boundaries without related building element have no IFC
+reference to their partner in the adjacent space. Searching the partner by
+comparing with every other boundary is quadratic in the number of
+boundaries. The SpaceBoundaryIndex holds a KD-tree over the centers of the
+candidate boundaries, so a partner search only needs exact checks for the
+few boundaries in the neighbourhood of the searching boundary.
+
+The ElementBoxIndex holds the bounding boxes of building element shapes, so
+exact distance calculations are only needed for elements whose box contains
+a given point.
+
+The OpeningIndex holds the openings (windows and doors) of building elements
+and the space boundaries of these openings per space. It replaces searches
+over all elements and space boundaries in the assignment of opening bounds
+to their parent bounds by lookups, and skips exact distance calculations
+for bounds whose bounding boxes are already too far apart.
+"""
+import logging
+from typing import Dict, List, Mapping, Set
+
+import numpy as np
+from OCC.Core.BRepBndLib import brepbndlib_Add
+from OCC.Core.Bnd import Bnd_Box
+from OCC.Core.TopoDS import TopoDS_Shape
+from scipy.spatial import KDTree
+
+logger = logging.getLogger(__name__)
+
+
+class SpaceBoundaryIndex:
+    """KD-tree over the centers of virtual space boundaries.
+
+    One index is shared by all space boundaries created from the same IFC
+    file. The tree is built lazily on the first query, when all boundaries
+    of the file are instantiated, and rebuilt if boundaries were added or
+    removed since then or if the shape of a boundary was replaced (see
+    invalidate).
+
+    Args:
+        elements: dict[guid: SpaceBoundary], shared with the space boundaries
+    """
+
+    def __init__(self, elements: dict):
+        self.elements = elements
+        self._tree = None
+        self._bounds = []
+        self._n_elements = None
+        self._dirty = True
+
+    @staticmethod
+    def is_virtual_candidate(bound) -> bool:
+        """Virtual boundaries without related building element."""
+        return not bound.ifc.RelatedBuildingElement
+
+    def invalidate(self):
+        """Rebuild the tree on the next query, e.g. after a bound shape of
+        one of the elements was replaced."""
+        self._dirty = True
+
+    def _build(self):
+        self._bounds = [bound for bound in self.elements.values()
+                        if self.is_virtual_candidate(bound)]
+        self._n_elements = len(self.elements)
+        self._dirty = False
+        if not self._bounds:
+            self._tree = None
+            return
+        centers = np.array([bound.bound_center.Coord()
+                            for bound in self._bounds])
+        self._tree = KDTree(centers)
+        logger.debug("Built spatial index of %d virtual space boundaries",
+                     len(self._bounds))
+
+    def query_virtual(self, bound, max_distance: float) -> List:
+        """Virtual candidates with a center close to the center of bound.
+
+        Args:
+            bound: the space boundary to find partners for
+            max_distance: maximum distance between the centers
+
+        Returns:
+            candidates in the order of the elements dict
+        """
+        if self._dirty or self._n_elements != len(self.elements):
+            self._build()
+        if self._tree is None:
+            return []
+        indices = self._tree.query_ball_point(
+            bound.bound_center.Coord(), max_distance)
+        return [self._bounds[i] for i in sorted(indices)
+                if self.elements.get(self._bounds[i].guid)
+                is self._bounds[i]]
+
+
+class ElementBoxIndex:
+    """Bounding boxes of the shapes of building elements.
+
+    Args:
+        tolerance: boxes are enlarged by this value in each direction
+        shapes: dict[element: shape], can be shared between several indices
+            to create the shape of each element only once
+    """
+
+    def __init__(self, tolerance: float = 1e-3, shapes: Dict = None):
+        self.tolerance = tolerance
+        self.shapes = shapes if shapes is not None else {}
+        self._elements = []
+        self._positions = {}
+        self._boxes = []
+        self._mins = None
+        self._maxs = None
+
+    def __contains__(self, element) -> bool:
+        return element in self._positions
+
+    def get_shape(self, element) -> TopoDS_Shape:
+        """Shape of element, None if it was never added to an index."""
+        return self.shapes.get(element)
+
+    def add(self, element, shape: TopoDS_Shape = None):
+        """Add element with its shape, the shape may be known already."""
+        if element in self._positions:
+            return
+        if shape is None:
+            shape = self.shapes[element]
+        self.shapes[element] = shape
+        box = Bnd_Box()
+        brepbndlib_Add(shape, box)
+        self._positions[element] = len(self._elements)
+        self._elements.append(element)
+        if box.IsVoid():
+            # keep elements without box as candidates for every point
+            self._boxes.append((-np.inf,) * 3 + (np.inf,) * 3)
+        else:
+            self._boxes.append(box.Get())
+        self._mins = None
+
+    def query_point(self, point) -> Set:
+        """Elements whose bounding box contains point (x, y, z)."""
+        if not self._elements:
+            return set()
+        if self._mins is None:
+            boxes = np.array(self._boxes)
+            self._mins = boxes[:, :3] - self.tolerance
+            self._maxs = boxes[:, 3:] + self.tolerance
+        point = np.asarray(point, dtype=float)
+        inside = np.all((self._mins <= point) & (point <= self._maxs), axis=1)
+        return {self._elements[i] for i in np.flatnonzero(inside)}
+
+
+class OpeningIndex:
+    """Openings of building elements and their space boundaries.
+
+    Args:
+        elements: mapping guid -> element which contains the opening elements
+            (e.g. a ChainMap of the space boundaries and all elements)
+    """
+
+    def __init__(self, elements: Mapping):
+        self.elements = elements
+        self._openings = {}
+        self._opening_bounds = {}
+        self._inner_loop_bounds = {}
+        self._boxes = {}
+
+    def get_openings(self, bound_element) -> List:
+        """Opening elements filling the openings of bound_element."""
+        openings = self._openings.get(bound_element.guid)
+        if openings is None:
+            openings = self._openings[bound_element.guid] = []
+            for opening in getattr(bound_element.ifc, 'HasOpenings', ()):
+                for fill in getattr(
+                        opening.RelatedOpeningElement, 'HasFillings', ()):
+                    openings.append(
+                        self.elements[fill.RelatedBuildingElement.GlobalId])
+        return openings
+
+    def get_opening_bounds(self, opening, space) -> List:
+        """Space boundaries of opening which bound the IfcSpace space."""
+        by_space = self._opening_bounds.get(opening.guid)
+        if by_space is None:
+            by_space = self._opening_bounds[opening.guid] = {}
+            for bound in opening.space_boundaries:
+                by_space.setdefault(
+                    bound.ifc.RelatingSpace.id(), []).append(bound)
+        return by_space.get(space.id(), [])
+
+    def get_inner_loop_bounds(self, zone) -> List:
+        """Space boundaries of zone with inner loops in their IFC geometry."""
+        bounds = self._inner_loop_bounds.get(zone.guid)
+        if bounds is None:
+            bounds = self._inner_loop_bounds[zone.guid] = [
+                b for b in zone.space_boundaries if b.ifc.ConnectionGeometry.
+                SurfaceOnRelatingElement.InnerBoundaries]
+        return bounds
+
+    def _get_box(self, bound) -> np.ndarray:
+        box = self._boxes.get(bound.guid)
+        if box is None:
+            bnd_box = Bnd_Box()
+            brepbndlib_Add(bound.bound_shape, bnd_box)
+            if bnd_box.IsVoid():
+                box = np.array((-np.inf,) * 3 + (np.inf,) * 3)
+            else:
+                box = np.array(bnd_box.Get())
+            self._boxes[bound.guid] = box
+        return box
+
+    def box_distance(self, bound, other) -> float:
+        """Distance between the bounding boxes of two bounds.
+
+        This is a lower limit of the distance between the bound shapes.
+        """
+        box = self._get_box(bound)
+        other_box = self._get_box(other)
+        gaps = np.maximum.reduce([np.zeros(3), box[:3] - other_box[3:],
+                                  other_box[:3] - box[3:]])
+        return float(np.linalg.norm(gaps))
+
+    def point_distance(self, bound, point) -> float:
+        """Distance between the bounding box of bound and point (x, y, z).
+
+        This is a lower limit of the distance between shape and point.
+        """
+        box = self._get_box(bound)
+        point = np.asarray(point, dtype=float)
+        gaps = np.maximum.reduce([np.zeros(3), box[:3] - point,
+                                  point - box[3:]])
+        return float(np.linalg.norm(gaps))
@@ -0,0 +1,207 @@
+"""Cached convex decomposition of space boundary shapes.
+
+Many buildings contain a lot of congruent non-convex boundaries (e.g. the
+L- and U-shaped wall surfaces around windows of a facade). The
+ConvexDecomposer transforms the polygon of a face into a canonical local
+frame, which is independent of the position, rotation and start vertex of
+the polygon. Decompositions are cached by this canonical polygon, so
+congruent polygons are decomposed only once. The cached pieces refer to the
+vertices of the polygon by index, so the pieces of each face share the exact
+vertices of the face, even if it only nearly matches the cached polygon.
+Decompositions of polygons which are not cached yet can be computed in bulk
+by worker processes, as the canonical polygons are plain coordinate tuples.
+
+Faces with holes are decomposed directly without cache.
+"""
+import logging
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+
+import numpy as np
+from OCC.Core.TopAbs import TopAbs_WIRE
+from OCC.Core.TopExp import TopExp_Explorer
+from OCC.Core.TopoDS import TopoDS_Shape
+
+from bim2sim.tasks.common.inner_loop_remover import convex_decomposition
+from bim2sim.utilities.parallel import map_in_processes
+from bim2sim.utilities.pyocc_tools import PyOCCTools
+
+logger = logging.getLogger(__name__)
+
+Polygon = Tuple[Tuple[float, float, float], ...]
+# piece of a decomposition, vertices are indices of polygon vertices or local
+# coordinates of additional points
+Piece = Tuple[Union[int, Tuple[float, float, float]], ...]
+
+
+class CanonicalPolygon:
+    """Polygon of a planar face in its canonical local frame.
+
+    The local frame has its origin in a vertex of the polygon, the x-axis
+    along the following edge and the z-axis along the polygon normal. Among
+    all vertices the one resulting in the smallest rounded coordinates is
+    chosen as origin.
+
+    Args:
+        points: vertices of the polygon as array of shape (n, 3)
+        digits: number of decimal digits used for the cache key
+    """
+
+    def __init__(self, points: np.ndarray, digits: int = 5):
+        normal = _newell_normal(points)
+        self.normal = normal / np.linalg.norm(normal)
+        best = None
+        for start in range(len(points)):
+            rolled = np.roll(points, -start, axis=0)
+            axes = self._get_axes(rolled)
+            local = (rolled - rolled[0]) @ axes.T
+            key = tuple(map(tuple, (np.round(local, digits) + 0.).tolist()))
+            if best is None or key < best[0]:
+                best = (key, rolled, axes, local)
+        self.key, rolled, self.axes, local = best
+        self.origin = rolled[0]
+        self.points: Polygon = tuple(map(tuple, rolled.tolist()))
+        self.local_points: Polygon = tuple(map(tuple, local.tolist()))
+
+    def _get_axes(self, points: np.ndarray) -> np.ndarray:
+        x_axis = points[1] - points[0]
+        x_axis = x_axis - x_axis.dot(self.normal) * self.normal
+        x_axis /= np.linalg.norm(x_axis)
+        y_axis = np.cross(self.normal, x_axis)
+        return np.array([x_axis, y_axis, self.normal])
+
+    def to_global(self, piece: Piece) -> List[Tuple[float, float, float]]:
+        """Global coordinates of piece, indices refer to the own vertices."""
+        return [self.points[vertex] if isinstance(vertex, int) else
+                tuple((np.asarray(vertex) @ self.axes + self.origin).tolist())
+                for vertex in piece]
+
+
+def index_pieces(pieces: Iterable[Polygon], polygon: Polygon,
+                 tolerance: float = 1e-6) -> List[Piece]:
+    """Replace the vertices of pieces by indices of the polygon vertices.
+
+    Points of pieces which are no vertex of polygon keep their coordinates.
+    """
+    vertices = np.asarray(polygon, dtype=float)
+    indexed = []
+    for piece in pieces:
+        distances = np.linalg.norm(
+            np.asarray(piece, dtype=float)[:, None] - vertices, axis=2)
+        nearest = distances.argmin(axis=1)
+        indexed.append(tuple(
+            int(i) if distances[n, i] <= tolerance else tuple(point)
+            for n, (i, point) in enumerate(zip(nearest, piece))))
+    return indexed
+
+
+def _newell_normal(points: np.ndarray) -> np.ndarray:
+    following = np.roll(points, -1, axis=0)
+    return np.array([
+        np.sum((points[:, 1] - following[:, 1])
+               * (points[:, 2] + following[:, 2])),
+        np.sum((points[:, 2] - following[:, 2])
+               * (points[:, 0] + following[:, 0])),
+        np.sum((points[:, 0] - following[:, 0])
+               * (points[:, 1] + following[:, 1])),
+    ])
+
+
+def decompose_polygon(polygon: Polygon) -> List[Polygon]:
+    """Convex decomposition of a polygon given by coordinate tuples.
+
+    This function only depends on picklable arguments and is therefore used
+    in worker processes.
+    """
+    face = PyOCCTools.make_faces_from_pnts(list(polygon))
+    return [tuple(pnt.Coord() for pnt in PyOCCTools.get_points_of_face(piece))
+            for piece in convex_decomposition(face)]
+
+
+class ConvexDecomposer:
+    """Convex decomposition with a cache for congruent polygons.
+
+    Args:
+        processes: maximum number of worker processes for `prefetch`
+    """
+
+    def __init__(self, processes: int = 1):
+        self.processes = processes
+        self._decompositions: Dict[Polygon, List[Piece]] = {}
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def get_canonical_polygon(shape: TopoDS_Shape) \
+            -> Optional[CanonicalPolygon]:
+        """Canonical polygon of shape, None if shape is no simple polygon."""
+        n_wires = 0
+        explorer = TopExp_Explorer(shape, TopAbs_WIRE)
+        while explorer.More():
+            n_wires += 1
+            explorer.Next()
+        if n_wires != 1:
+            return None
+        points = np.array([pnt.Coord() for pnt in
+                           PyOCCTools.get_points_of_face(shape)])
+        if len(points) < 3 or not np.linalg.norm(_newell_normal(points)):
+            return None
+        return CanonicalPolygon(points)
+
+    def prefetch(self, shapes: Iterable[TopoDS_Shape]) -> int:
+        """Decompose all not yet cached polygons of shapes in bulk.
+
+        Returns:
+            number of decomposed polygons
+        """
+        missing = {}
+        for shape in shapes:
+            polygon = self.get_canonical_polygon(shape)
+            if polygon is not None and polygon.key not in \
+                    self._decompositions:
+                missing.setdefault(polygon.key, polygon.local_points)
+        results = map_in_processes(
+            _decompose_or_none, list(missing.values()), self.processes)
+        for key, pieces in zip(missing, results):
+            if pieces is not None:
+                self._decompositions[key] = index_pieces(pieces, missing[key])
+        return len(missing)
+
+    def decompose(self, shape: TopoDS_Shape) -> List[TopoDS_Shape]:
+        """Convex decomposition of shape, see `convex_decomposition`.
+
+        Args:
+            shape: planar face to decompose
+
+        Returns:
+            list of convex faces with the orientation of shape
+        """
+        polygon = self.get_canonical_polygon(shape)
+        if polygon is None:
+            return convex_decomposition(shape)
+        pieces = self._decompositions.get(polygon.key)
+        if pieces is None:
+            self.misses += 1
+            pieces = index_pieces(decompose_polygon(polygon.local_points),
+                                  polygon.local_points)
+            self._decompositions[polygon.key] = pieces
+        else:
+            self.hits += 1
+        org_normal = PyOCCTools.simple_face_normal(shape)
+        faces = []
+        for piece in pieces:
+            face = PyOCCTools.make_faces_from_pnts(polygon.to_global(piece))
+            new_normal = PyOCCTools.simple_face_normal(face)
+            if not all([abs(i) < 1e-3 for i in
+                        ((new_normal - org_normal).Coord())]):
+                face = PyOCCTools.flip_orientation_of_face(face)
+            faces.append(face)
+        return faces
+
+
+def _decompose_or_none(polygon: Polygon) -> Optional[List[Polygon]]:
+    """Worker function, failed decompositions are retried in `decompose`."""
+    try:
+        return decompose_polygon(polygon)
+    except Exception as ex:
+        logger.warning("Convex decomposition of polygon failed (%s)", ex)
+        return None
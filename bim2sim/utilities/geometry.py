@@ -0,0 +1,351 @@
+"""Bulk creation of OCC shapes from IFC entities.
+
+Creating shapes entity by entity with ifcopenshell.geom.create_shape is one
+of the most time-consuming steps for large models. The functions in this
+module create the shapes of many entities at once and assign the results to
+the shape attributes of the corresponding bim2sim elements:
+
+* space shapes are converted by the multithreaded ifcopenshell.geom.iterator
+* bound shapes need additional OCC post-processing and are created in
+  worker processes, each holding its own opened IFC file. As OCC shapes
+  can't be pickled, they are returned as BRep strings.
+
+Entities that fail in bulk creation are left untouched, so their attributes
+are still calculated by the regular attribute functions on first access.
+If a ShapeCache is active (see bim2sim.utilities.shape_cache), cached shapes
+are used and newly created shapes are stored.
+"""
+import logging
+import time
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, TYPE_CHECKING
+
+import ifcopenshell
+import ifcopenshell.geom
+from OCC.Core.BRepBuilderAPI import BRepBuilderAPI_Transform
+from OCC.Core.BRepLib import BRepLib_FuseEdges
+from OCC.Core.BRepTools import breptools_ReadFromString, \
+    breptools_WriteToString
+from OCC.Core.ShapeUpgrade import ShapeUpgrade_UnifySameDomain
+from OCC.Core.TopoDS import TopoDS_Shape
+from OCC.Core.gp import gp_Trsf, gp_Vec, gp_Mat, gp_Quaternion
+
+from bim2sim.elements.mapping.attribute import Attribute
+from bim2sim.elements.mapping.units import ureg
+from bim2sim.tasks.common.inner_loop_remover import remove_inner_loops
+from bim2sim.utilities.geometry_service import create_shape, \
+    geometry_stats, get_settings
+from bim2sim.utilities.parallel import map_in_processes
+from bim2sim.utilities.pyocc_tools import PyOCCTools
+from bim2sim.utilities.shape_cache import get_shape_cache, get_shape_profile
+from bim2sim.utilities.types import AttributeDataSource
+
+if TYPE_CHECKING:
+    from bim2sim.elements.bps_elements import SpaceBoundary, ThermalZone
+    from bim2sim.kernel.ifc_file import IfcFileClass
+
+logger = logging.getLogger(__name__)
+
+
+def get_space_shape_settings() -> ifcopenshell.geom.settings:
+    """Shared geometry settings used to create the shapes of IfcSpaces."""
+    return get_settings('space_shape')
+
+
+def get_bound_shape_settings() -> ifcopenshell.geom.settings:
+    """Shared geometry settings used to create the shapes of space
+    boundaries."""
+    return get_settings('bound_shape')
+
+
+def iterate_shapes(ifc_file: ifcopenshell.file,
+                   entities: Iterable[ifcopenshell.entity_instance],
+                   settings: ifcopenshell.geom.settings,
+                   num_threads: int = 1) -> Dict[int, object]:
+    """Create shapes of entities with the ifcopenshell geometry iterator.
+
+    Args:
+        ifc_file: ifcopenshell file the entities belong to
+        entities: IFC entities to convert
+        settings: geometry settings, must use python opencascade
+        num_threads: number of threads used by the iterator
+
+    Returns:
+        dict with entity id as key and TopoDS_Shape as value. Entities which
+        could not be converted are missing.
+    """
+    entities = list(entities)
+    shapes = {}
+    if not entities:
+        return shapes
+    start = time.perf_counter()
+    try:
+        iterator = ifcopenshell.geom.iterator(
+            settings, ifc_file, max(1, int(num_threads)), include=entities)
+        if not iterator.initialize():
+            return shapes
+        while True:
+            shape = iterator.get()
+            shapes[shape.id] = shape.geometry
+            if not iterator.next():
+                break
+    except Exception as ex:
+        logger.warning("Geometry iterator failed after %d of %d entities "
+                       "(%s), remaining shapes are created one by one.",
+                       len(shapes), len(entities), ex)
+    # the iterator converts all entities at once, so it is recorded as one
+    # measurement for the class of the first entity
+    geometry_stats.record(
+        entities[0].is_a(), 'iterator', time.perf_counter() - start,
+        len(shapes) < len(entities))
+    return shapes
+
+
+def prefetch_space_shapes(ifc_files: List['IfcFileClass'],
+                          zones: Iterable['ThermalZone'],
+                          num_threads: int = 1) -> int:
+    """Create the space_shape of all zones in one pass per IFC file.
+
+    Only zones whose space_shape was not calculated yet are considered.
+
+    Args:
+        ifc_files: loaded IFC files the zones originate from
+        zones: ThermalZone elements
+        num_threads: number of threads used by the geometry iterator
+
+    Returns:
+        number of zones whose space_shape was set
+    """
+    pending = {zone.guid: zone for zone in zones
+               if zone.ifc is not None and zone.attributes['space_shape'][1]
+               in (Attribute.STATUS_UNKNOWN, Attribute.STATUS_RESET)}
+    if not pending:
+        return 0
+    settings = get_space_shape_settings()
+    profile = get_shape_profile('space_shape', settings)
+    cache = get_shape_cache()
+    n_set = 0
+    if cache is not None:
+        for zone in list(pending.values()):
+            shape = cache.get(zone.ifc, profile)
+            if shape is not None:
+                zone.space_shape = shape, AttributeDataSource.function
+                del pending[zone.guid]
+                n_set += 1
+    for ifc_file in ifc_files:
+        entities = {}
+        for guid, zone in pending.items():
+            try:
+                entity = ifc_file.file.by_guid(guid)
+            except RuntimeError:
+                continue
+            if entity == zone.ifc:
+                entities[entity.id()] = zone
+        shapes = iterate_shapes(
+            ifc_file.file, [zone.ifc for zone in entities.values()],
+            settings, num_threads)
+        for entity_id, shape in shapes.items():
+            zone = entities.get(entity_id)
+            if zone is None or shape is None:
+                continue
+            zone.space_shape = shape, AttributeDataSource.function
+            if cache is not None:
+                cache.put(zone.ifc, profile, shape)
+            del pending[zone.guid]
+            n_set += 1
+    if pending:
+        logger.info("Space shapes of %d zones could not be created in bulk "
+                    "and are created one by one.", len(pending))
+    return n_set
+
+
+def calc_bound_shape(ifc_bound: ifcopenshell.entity_instance, length_unit,
+                     bound_element_ifc: Optional[ifcopenshell.entity_instance]
+                     ) -> TopoDS_Shape:
+    """Create the shape of a space boundary from its connection geometry.
+
+    This only depends on IFC entities and can therefore run in worker
+    processes (see prefetch_bound_shapes).
+
+    Args:
+        ifc_bound: IfcRelSpaceBoundary entity
+        length_unit: length unit of the IFC file
+        bound_element_ifc: IFC entity of the bim2sim element related to the
+            space boundary, None if there is no such element
+
+    Returns:
+        shape of the space boundary
+    """
+    try:
+        sore = ifc_bound.ConnectionGeometry.SurfaceOnRelatingElement
+        # if sore.get_info()["InnerBoundaries"] is None:
+        shape = create_shape(sore, 'bound_shape')
+
+        if sore.InnerBoundaries:
+            # shape = remove_inner_loops(shape)  # todo: return None if not horizontal shape
+            # if not shape:
+            if bound_element_ifc.is_a(
+                    'IfcWall'):  # todo: remove this hotfix (generalize)
+                ifc_new = ifcopenshell.file()
+                temp_sore = ifc_new.create_entity('IfcCurveBoundedPlane',
+                                                  OuterBoundary=sore.OuterBoundary,
+                                                  BasisSurface=sore.BasisSurface)
+                temp_sore.InnerBoundaries = ()
+                shape = create_shape(
+                    temp_sore, 'bound_shape', 'without_inner_boundaries')
+            else:
+                with geometry_stats.measure(sore, 'inner_loop_removal'):
+                    shape = remove_inner_loops(shape)
+        if not (sore.InnerBoundaries and not bound_element_ifc.is_a(
+                'IfcWall')):
+            faces = PyOCCTools.get_faces_from_shape(shape)
+            if len(faces) > 1:
+                unify = ShapeUpgrade_UnifySameDomain()
+                unify.Initialize(shape)
+                unify.Build()
+                shape = unify.Shape()
+                faces = PyOCCTools.get_faces_from_shape(shape)
+            face = faces[0]
+            face = PyOCCTools.remove_coincident_and_collinear_points_from_face(
+                face)
+            shape = face
+    except:
+        try:
+            sore = ifc_bound.ConnectionGeometry.SurfaceOnRelatingElement
+            ifc_new = ifcopenshell.file()
+            temp_sore = ifc_new.create_entity('IfcCurveBoundedPlane',
+                                              OuterBoundary=sore.OuterBoundary,
+                                              BasisSurface=sore.BasisSurface)
+            temp_sore.InnerBoundaries = ()
+            shape = create_shape(
+                temp_sore, 'bound_shape', 'fallback_outer_boundary')
+        except:
+            poly = ifc_bound.ConnectionGeometry.SurfaceOnRelatingElement.OuterBoundary.Points
+            pnts = []
+            for p in poly:
+                p.Coordinates = (p.Coordinates[0], p.Coordinates[1], 0.0)
+                pnts.append((p.Coordinates[:]))
+            shape = PyOCCTools.make_faces_from_pnts(pnts)
+            geometry_stats.record(ifc_bound.is_a(), 'fallback_points', 0.)
+    with geometry_stats.measure(ifc_bound, 'post_processing'):
+        return _transform_bound_shape(shape, ifc_bound, length_unit)
+
+
+def _transform_bound_shape(shape: TopoDS_Shape,
+                           ifc_bound: ifcopenshell.entity_instance,
+                           length_unit) -> TopoDS_Shape:
+    """Move bound shape to the position of its space and clean it up."""
+    # check if the space boundary shapes need a unit conversion (i.e.,
+    # an additional transformation to the correct size and position)
+    conv_required = length_unit != ureg.meter
+    # shape scaling is covered by ifcopenshell, only the placement of the
+    # space needs a unit conversion
+    shape = BRepLib_FuseEdges(shape).Shape()
+
+    if ifc_bound.RelatingSpace.ObjectPlacement:
+        lp = PyOCCTools.local_placement(
+            ifc_bound.RelatingSpace.ObjectPlacement).tolist()
+        # transform newly created shape of space boundary to correct
+        # position if a unit conversion is required.
+        if conv_required:
+            for i in range(len(lp)):
+                for j in range(len(lp[i])):
+                    coord = lp[i][j] * length_unit
+                    lp[i][j] = coord.to(ureg.meter).m
+        mat = gp_Mat(lp[0][0], lp[0][1], lp[0][2], lp[1][0], lp[1][1],
+                     lp[1][2], lp[2][0], lp[2][1], lp[2][2])
+        vec = gp_Vec(lp[0][3], lp[1][3], lp[2][3])
+        trsf = gp_Trsf()
+        trsf.SetTransformation(gp_Quaternion(mat), vec)
+        shape = BRepBuilderAPI_Transform(shape, trsf).Shape()
+
+    # shape = shape.Reversed()
+    unify = ShapeUpgrade_UnifySameDomain()
+    unify.Initialize(shape)
+    unify.Build()
+    shape = unify.Shape()
+    return shape
+
+
+# state of bound shape worker processes
+_worker_state = {}
+
+
+def _init_bound_shape_worker(ifc_path: Path):
+    """Open the IFC file once per worker process."""
+    _worker_state['file'] = ifcopenshell.open(str(ifc_path))
+
+
+def _calc_bound_shape_in_worker(item: tuple) -> Optional[str]:
+    """Worker function creating the shape of one space boundary.
+
+    Args:
+        item: tuple of the entity id of the IfcRelSpaceBoundary, the length
+            unit and whether the space boundary has a related bound element
+
+    Returns:
+        shape serialized as BRep string, None if creation failed
+    """
+    entity_id, length_unit, has_bound_element = item
+    ifc_bound = _worker_state['file'].by_id(entity_id)
+    bound_element_ifc = ifc_bound.RelatedBuildingElement \
+        if has_bound_element else None
+    try:
+        shape = calc_bound_shape(ifc_bound, length_unit, bound_element_ifc)
+        return breptools_WriteToString(shape)
+    except Exception:
+        return None
+
+
+def prefetch_bound_shapes(ifc_file: 'IfcFileClass',
+                          bounds: Iterable['SpaceBoundary'],
+                          processes: int) -> int:
+    """Create the bound_shape of space boundaries in worker processes.
+
+    Each worker opens the IFC file itself, so only entity ids are sent to the
+    workers and BRep strings are sent back. Only space boundaries whose
+    bound_shape was not calculated yet are considered. Without parallel
+    processes nothing is done, as the lazy attribute calculation is faster
+    than the serialization overhead in this case.
+
+    Args:
+        ifc_file: loaded IFC file the space boundaries originate from
+        bounds: SpaceBoundary elements of ifc_file
+        processes: number of worker processes
+
+    Returns:
+        number of space boundaries whose bound_shape was set
+    """
+    processes = int(processes or 1)
+    if processes <= 1 or getattr(ifc_file, 'ifc_path', None) is None:
+        return 0
+    pending = [bound for bound in bounds
+               if bound.attributes['bound_shape'][1]
+               in (Attribute.STATUS_UNKNOWN, Attribute.STATUS_RESET)]
+    profile = get_shape_profile('bound_shape', get_bound_shape_settings())
+    cache = get_shape_cache()
+    if cache is not None:
+        # cached shapes are restored by the lazy attribute calculation
+        pending = [bound for bound in pending
+                   if not cache.contains(bound.ifc, profile)]
+    if len(pending) < 2:
+        return 0
+    length_unit = ifc_file.ifc_units.get('IfcLengthMeasure'.lower())
+    items = [(bound.ifc.id(), length_unit, bound.bound_element is not None)
+             for bound in pending]
+    results = map_in_processes(
+        _calc_bound_shape_in_worker, items, processes,
+        initializer=_init_bound_shape_worker,
+        initargs=(ifc_file.ifc_path,),
+        chunksize=max(1, len(items) // (processes * 4)))
+    n_set = 0
+    for bound, brep in zip(pending, results):
+        if brep is None:
+            continue
+        shape = breptools_ReadFromString(brep)
+        if cache is not None:
+            cache.put(bound.ifc, profile, shape)
+        bound.bound_shape = (bound.finish_bound_shape(shape),
+                             AttributeDataSource.function)
+        n_set += 1
+    return n_set
@@ -0,0 +1,142 @@
+"""Geometry settings profiles and timing of shape creation.
+
+All shapes created from IFC geometry use one of the named settings profiles
+in SETTINGS_PROFILES. The settings objects are created once per process and
+shared, so they must not be modified by callers.
+
+The GeometryStats record how long shape creation takes and how often it
+fails, separately for each IFC class and each branch (e.g. tessellation by
+ifcopenshell, OCC post-processing or one of the fallbacks). At the end of a
+project run the statistics are written to the log folder (see
+`GeometryStats.save`), which allows to find the entities dominating the
+geometry time.
+"""
+import json
+import logging
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, List
+
+import ifcopenshell
+import ifcopenshell.geom
+
+logger = logging.getLogger(__name__)
+
+SETTINGS_PROFILES: Dict[str, Dict[str, bool]] = {
+    'product_shape': {
+        'USE_PYTHON_OPENCASCADE': True,
+    },
+    'space_shape': {
+        'USE_PYTHON_OPENCASCADE': True,
+        'USE_WORLD_COORDS': True,
+        'EXCLUDE_SOLIDS_AND_SURFACES': False,
+        'INCLUDE_CURVES': True,
+    },
+    'bound_shape': {
+        'USE_PYTHON_OPENCASCADE': True,
+        'USE_WORLD_COORDS': True,
+        'EXCLUDE_SOLIDS_AND_SURFACES': False,
+        'INCLUDE_CURVES': True,
+    },
+    'element_2b_shape': {
+        'USE_PYTHON_OPENCASCADE': True,
+        'USE_WORLD_COORDS': True,
+        'EXCLUDE_SOLIDS_AND_SURFACES': False,
+        'INCLUDE_CURVES': True,
+    },
+}
+
+_settings: Dict[str, ifcopenshell.geom.settings] = {}
+
+
+def get_settings(profile: str) -> ifcopenshell.geom.settings:
+    """Shared geometry settings of a profile in SETTINGS_PROFILES.
+
+    Raises:
+        KeyError: if profile is unknown
+    """
+    settings = _settings.get(profile)
+    if settings is None:
+        options = SETTINGS_PROFILES[profile]
+        settings = ifcopenshell.geom.settings()
+        for option, value in options.items():
+            settings.set(getattr(settings, option), value)
+        _settings[profile] = settings
+    return settings
+
+
+class GeometryStats:
+    """Timings and failures of shape creation per IFC class and branch."""
+
+    def __init__(self):
+        self._records = {}
+
+    def __bool__(self) -> bool:
+        return bool(self._records)
+
+    def record(self, ifc_class: str, branch: str, duration: float,
+               failed: bool = False, entity_id: int = None):
+        """Add one measurement."""
+        record = self._records.get((ifc_class, branch))
+        if record is None:
+            record = self._records[(ifc_class, branch)] = dict(
+                ifc_class=ifc_class, branch=branch, count=0, failures=0,
+                total_time=0., max_time=0., slowest_entity=None)
+        record['count'] += 1
+        record['failures'] += int(failed)
+        record['total_time'] += duration
+        if duration >= record['max_time']:
+            record['max_time'] = duration
+            record['slowest_entity'] = entity_id
+
+    @contextmanager
+    def measure(self, entity: ifcopenshell.entity_instance, branch: str):
+        """Measure the enclosed block, exceptions are counted as failures."""
+        start = time.perf_counter()
+        failed = True
+        try:
+            yield
+            failed = False
+        finally:
+            self.record(entity.is_a() if entity is not None else 'None',
+                        branch, time.perf_counter() - start, failed,
+                        entity.id() if entity is not None else None)
+
+    def report(self) -> List[dict]:
+        """All records sorted by their total time, slowest first."""
+        return sorted(self._records.values(),
+                      key=lambda record: record['total_time'], reverse=True)
+
+    def log_summary(self, top: int = 5):
+        """Log the records with the highest total time."""
+        for record in self.report()[:top]:
+            logger.info(
+                "Geometry %s of %s: %d calls, %d failures, %.2f s total, "
+                "slowest entity #%s (%.2f s)", record['branch'],
+                record['ifc_class'], record['count'], record['failures'],
+                record['total_time'], record['slowest_entity'],
+                record['max_time'])
+
+    def save(self, path: Path):
+        """Write all records as json file."""
+        with open(path, 'w') as f:
+            json.dump(self.report(), f, indent=2)
+
+    def reset(self):
+        self._records.clear()
+
+
+geometry_stats = GeometryStats()
+
+
+def create_shape(entity: ifcopenshell.entity_instance, profile: str,
+                 branch: str = 'tessellation'):
+    """Timed ifcopenshell.geom.create_shape with settings of profile.
+
+    Returns:
+        the shape created by ifcopenshell, for python opencascade profiles
+        use its geometry attribute
+    """
+    with geometry_stats.measure(entity, branch):
+        return ifcopenshell.geom.create_shape(get_settings(profile), entity)
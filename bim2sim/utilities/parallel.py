@@ -0,0 +1,69 @@
+"""Helpers to distribute independent work items over worker processes.
+
+Most bim2sim objects (elements, IFC entities, OCC shapes) can't be pickled.
+Work is therefore either described by picklable arguments (e.g. a path and
+entity ids) or, on platforms supporting it, the worker processes are forked
+and inherit the objects of the main process. In the latter case only
+references like indices are sent to the workers.
+"""
+import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+def can_fork() -> bool:
+    """Returns True if worker processes can be created by forking."""
+    return 'fork' in multiprocessing.get_all_start_methods()
+
+
+def map_in_processes(
+        func: Callable,
+        items: Iterable,
+        processes: Optional[int],
+        initializer: Callable = None,
+        initargs: tuple = (),
+        fork: bool = False,
+        chunksize: int = 1) -> List:
+    """Apply func to all items using a pool of worker processes.
+
+    The results are returned in the order of items, independent of the order
+    in which the workers finish. If only one process is requested or there
+    is at most one item, everything runs sequentially in the current process
+    which avoids the overhead of creating the pool.
+
+    Args:
+        func: module level function taking one item
+        items: work items, picklable unless fork is True
+        processes: maximum number of worker processes, None or 1 disables
+            parallel execution
+        initializer: called once in each worker (or once in the current
+            process for sequential execution), e.g. to open an IFC file
+        initargs: arguments for initializer
+        fork: workers are forked to inherit the memory of the current
+            process. If forking is not supported func runs sequentially.
+        chunksize: number of items sent to a worker at once
+
+    Returns:
+        list of results in order of items
+    """
+    items = list(items)
+    processes = min(int(processes or 1), len(items))
+    if fork and not can_fork():
+        logger.info("Forking worker processes is not supported on this "
+                    "platform, running sequentially.")
+        processes = 1
+    if processes <= 1:
+        if initializer:
+            initializer(*initargs)
+        return [func(item) for item in items]
+
+    context = multiprocessing.get_context('fork') if fork else None
+    logger.info("Distributing %d work items over %d processes",
+                len(items), processes)
+    with ProcessPoolExecutor(
+            max_workers=processes, mp_context=context,
+            initializer=initializer, initargs=initargs) as executor:
+        return list(executor.map(func, items, chunksize=chunksize))
@@ -0,0 +1,219 @@
+"""Sampling of points on shapes and point based distances.
+
+Point based distances between complex shapes (e.g. furniture and people in
+the OpenFOAM geometry) approximate both shapes by point clouds. The shapes
+are triangulated once with BRepMesh_IncrementalMesh, the triangles are
+extracted into numpy arrays and sampled by barycentric interpolation, where
+the number of samples of each triangle is proportional to its area.
+
+The point clouds and their KD-trees are cached per shape (same TShape and
+location), so each shape is sampled only once, even if its distance to many
+other shapes is computed. The cache is limited by the number of shapes and
+the total number of points and should be cleared by the task using it.
+"""
+import logging
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+import numpy as np
+from OCC.Core.BRep import BRep_Tool
+from OCC.Core.BRepMesh import BRepMesh_IncrementalMesh
+from OCC.Core.TopAbs import TopAbs_FACE
+from OCC.Core.TopExp import TopExp_Explorer
+from OCC.Core.TopLoc import TopLoc_Location
+from OCC.Core.TopoDS import TopoDS_Shape, topods_Face
+from scipy.spatial import KDTree
+
+from bim2sim.utilities.shape_data import shape_data_cache
+
+logger = logging.getLogger(__name__)
+
+
+def get_mesh_arrays(shape: TopoDS_Shape, deflection: float = 0.01) \
+        -> Tuple[np.ndarray, np.ndarray]:
+    """Triangulate shape and return its mesh as numpy arrays.
+
+    Args:
+        shape: shape to triangulate, the triangulation is stored in shape
+        deflection: linear deflection of the mesh
+
+    Returns:
+        vertices: array of shape (n, 3) in global coordinates
+        triangles: array of shape (m, 3) with vertex indices
+    """
+    BRepMesh_IncrementalMesh(shape, deflection)
+    vertices = []
+    triangles = []
+    n_vertices = 0
+    explorer = TopExp_Explorer(shape, TopAbs_FACE)
+    while explorer.More():
+        location = TopLoc_Location()
+        triangulation = BRep_Tool.Triangulation(
+            topods_Face(explorer.Current()), location)
+        explorer.Next()
+        if not triangulation:
+            continue
+        trsf = location.Transformation()
+        vertices.extend(
+            triangulation.Node(i).Transformed(trsf).Coord()
+            for i in range(1, triangulation.NbNodes() + 1))
+        # OCC node indices start at 1 within each face
+        face_triangles = np.array(
+            [triangulation.Triangle(i).Get()
+             for i in range(1, triangulation.NbTriangles() + 1)],
+            dtype=np.intp).reshape(-1, 3)
+        triangles.append(face_triangles + n_vertices - 1)
+        n_vertices += triangulation.NbNodes()
+    return (np.array(vertices, dtype=float).reshape(-1, 3),
+            np.concatenate(triangles) if triangles
+            else np.empty((0, 3), dtype=np.intp))
+
+
+def get_cached_mesh_arrays(shape: TopoDS_Shape, deflection: float = 0.01) \
+        -> Tuple[np.ndarray, np.ndarray]:
+    """get_mesh_arrays cached in the shape data cache, read only."""
+    def compute():
+        arrays = get_mesh_arrays(shape, deflection)
+        for array in arrays:
+            array.flags.writeable = False
+        return arrays
+
+    return shape_data_cache.get(shape, ('mesh_arrays', deflection), compute)
+
+
+def barycentric_grid(subdivisions: int) -> np.ndarray:
+    """Barycentric weights of a regular grid on a triangle.
+
+    Returns:
+        array of shape ((k + 1) * (k + 2) / 2, 3) for k subdivisions
+    """
+    i, j = np.meshgrid(np.arange(subdivisions + 1),
+                       np.arange(subdivisions + 1), indexing='ij')
+    inside = i + j <= subdivisions
+    i, j = i[inside], j[inside]
+    return np.column_stack([i, j, subdivisions - i - j]) / subdivisions
+
+
+def sample_points_on_mesh(vertices: np.ndarray, triangles: np.ndarray,
+                          num_points: int) -> np.ndarray:
+    """Sample about num_points points on the triangles of a mesh.
+
+    Each triangle is sampled by a regular barycentric grid with a number of
+    points proportional to its area, but at least its corners. The vertices
+    of the mesh are always included.
+
+    Returns:
+        array of shape (n, 3) with the sampled points
+    """
+    if not len(triangles):
+        return vertices.copy()
+    corners = vertices[triangles]
+    areas = 0.5 * np.linalg.norm(np.cross(
+        corners[:, 1] - corners[:, 0], corners[:, 2] - corners[:, 0]), axis=1)
+    total_area = areas.sum()
+    if total_area <= 0:
+        return vertices.copy()
+    # subdivisions k of each triangle such that (k+1)(k+2)/2 ~ its share
+    share = num_points * areas / total_area
+    subdivisions = np.maximum(
+        1, np.floor((np.sqrt(8. * share + 1.) - 3.) / 2.)).astype(int)
+    points = [vertices]
+    for k in np.unique(subdivisions):
+        if k == 1:
+            # the corners are part of vertices already
+            continue
+        weights = barycentric_grid(int(k))
+        points.append(np.einsum('pc,tcx->tpx', weights,
+                                corners[subdivisions == k]).reshape(-1, 3))
+    return np.concatenate(points)
+
+
+class PointCloudCache:
+    """Sampled points and KD-trees of shapes, cached per shape.
+
+    Shapes are identified by their TShape and location, the orientation is
+    irrelevant for point clouds.
+
+    Args:
+        maxsize: maximum number of cached shapes
+        max_points: maximum total number of cached points, the least
+            recently used entries are removed first, but the most recent
+            entry is always kept
+    """
+
+    def __init__(self, maxsize: int = 16, max_points: int = 2000000):
+        self.maxsize = maxsize
+        self.max_points = max_points
+        self._entries = OrderedDict()
+        self._n_points = 0
+        self.hits = 0
+        self.misses = 0
+
+    def _get_entry(self, shape: TopoDS_Shape, num_points: int) -> dict:
+        key = (hash(shape), int(num_points))
+        entry = self._entries.get(key)
+        if entry is not None and entry['shape'].IsSame(shape):
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+        self.misses += 1
+        vertices, triangles = get_cached_mesh_arrays(shape)
+        if len(vertices) < 5e4:
+            points = sample_points_on_mesh(vertices, triangles, num_points)
+        else:
+            # meshes with many vertices are dense enough already
+            points = vertices
+        entry = dict(shape=shape, points=points, tree=None)
+        old_entry = self._entries.pop(key, None)
+        if old_entry is not None:
+            self._n_points -= len(old_entry['points'])
+        self._entries[key] = entry
+        self._n_points += len(points)
+        while len(self._entries) > 1 and (
+                len(self._entries) > self.maxsize
+                or self._n_points > self.max_points):
+            _, removed = self._entries.popitem(last=False)
+            self._n_points -= len(removed['points'])
+        return entry
+
+    def get_points(self, shape: TopoDS_Shape, num_points: int) -> np.ndarray:
+        """Points sampled on the faces of shape."""
+        return self._get_entry(shape, num_points)['points']
+
+    def get_tree(self, shape: TopoDS_Shape, num_points: int) -> KDTree:
+        """KD-tree of the points sampled on the faces of shape."""
+        entry = self._get_entry(shape, num_points)
+        if entry['tree'] is None:
+            entry['tree'] = KDTree(entry['points'])
+        return entry['tree']
+
+    def distance(self, shape1: TopoDS_Shape, shape2: TopoDS_Shape,
+                 num_points: int = 100000,
+                 upper_bound: Optional[float] = None) -> float:
+        """Approximate minimal distance between two shapes.
+
+        Args:
+            shape1: first shape, its KD-tree is cached
+            shape2: second shape
+            num_points: number of points sampled on each shape
+            upper_bound: distances larger than this are not searched, if no
+                point is closer, infinity is returned
+
+        Returns:
+            minimal distance between the point clouds of the shapes
+        """
+        tree = self.get_tree(shape1, num_points)
+        points = self.get_points(shape2, num_points)
+        if not len(points) or not tree.n:
+            return float('inf')
+        distances, _ = tree.query(
+            points, distance_upper_bound=upper_bound
+            if upper_bound is not None else np.inf)
+        return float(np.min(distances))
+
+    def clear(self):
+        self._entries.clear()
+        self._n_points = 0
+
+
+point_cloud_cache = PointCloudCache()
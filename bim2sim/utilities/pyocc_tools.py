@@ -11,7 +11,6 @@ from OCC.Core.BRepAlgoAPI import BRepAlgoAPI_Cut, BRepAlgoAPI_Fuse
 from OCC.Core.BRepOffsetAPI import BRepOffsetAPI_MakeOffsetShape
 from OCC.Core.GeomAPI import GeomAPI_IntCS
 from OCC.Core.ShapeUpgrade import ShapeUpgrade_UnifySameDomain
-from scipy.spatial import KDTree
 from OCC.Core.BRepBndLib import brepbndlib_Add
 from OCC.Core.BRepBuilderAPI import BRepBuilderAPI_MakeFace, \
     BRepBuilderAPI_Transform, BRepBuilderAPI_MakePolygon, \
@@ -27,6 +26,7 @@ from OCC.Core.BRepTools import BRepTools_WireExplorer
 from OCC.Core.Bnd import Bnd_Box
 from OCC.Core.Extrema import Extrema_ExtFlag_MIN
 from OCC.Core.GProp import GProp_GProps
+from OCC.Core.GeomAbs import GeomAbs_Plane
 from OCC.Core.Geom import Handle_Geom_Plane_DownCast, Geom_Line, \
     Handle_Geom_Curve_DownCast, Handle_Geom_Surface_DownCast
 from OCC.Core.ShapeAnalysis import ShapeAnalysis_ShapeContents
@@ -38,6 +38,9 @@ from OCC.Core.TopoDS import topods_Wire, TopoDS_Face, TopoDS_Shape, \
     TopoDS_Compound
 from OCC.Core.gp import gp_XYZ, gp_Pnt, gp_Trsf, gp_Vec, gp_Ax1, gp_Dir, gp_Lin
 
+from bim2sim.utilities.point_sampling import point_cloud_cache
+from bim2sim.utilities.shape_data import shape_data_cache
+
 
 class PyOCCTools:
     """Class for Tools handling and modifying Python OCC Shapes"""
@@ -121,17 +124,20 @@ class PyOCCTools:
         :param shape: TopoDS_Shape (Surface)
         :return: pnt_list (list of gp_Pnt)
         """
-        an_exp = TopExp_Explorer(shape, TopAbs_WIRE)
-        pnt_list = []
-        while an_exp.More():
-            wire = topods_Wire(an_exp.Current())
-            w_exp = BRepTools_WireExplorer(wire)
-            while w_exp.More():
-                pnt1 = BRep_Tool.Pnt(w_exp.CurrentVertex())
-                pnt_list.append(pnt1)
-                w_exp.Next()
-            an_exp.Next()
-        return pnt_list
+        def get_coords():
+            an_exp = TopExp_Explorer(shape, TopAbs_WIRE)
+            coords = []
+            while an_exp.More():
+                wire = topods_Wire(an_exp.Current())
+                w_exp = BRepTools_WireExplorer(wire)
+                while w_exp.More():
+                    coords.append(BRep_Tool.Pnt(w_exp.CurrentVertex()).Coord())
+                    w_exp.Next()
+                an_exp.Next()
+            return tuple(coords)
+
+        return [gp_Pnt(*coord) for coord in
+                shape_data_cache.get(shape, 'vertices', get_coords)]
 
     @staticmethod
     def get_center_of_face(face: TopoDS_Face) -> gp_Pnt:
@@ -139,9 +145,12 @@ class PyOCCTools:
         Calculates the center of the given face. The center point is the center
         of mass.
         """
-        prop = GProp_GProps()
-        brepgprop_SurfaceProperties(face, prop)
-        return prop.CentreOfMass()
+        def get_center():
+            prop = GProp_GProps()
+            brepgprop_SurfaceProperties(face, prop)
+            return prop.CentreOfMass().Coord()
+
+        return gp_Pnt(*shape_data_cache.get(face, 'center', get_center))
 
     @staticmethod
     def get_center_of_shape(shape: TopoDS_Shape) -> gp_Pnt:
@@ -339,16 +348,20 @@ class PyOCCTools:
     def simple_face_normal(face: TopoDS_Face, check_orientation: bool = True) \
             -> gp_XYZ:
         """Compute the normal of a TopoDS_Face."""
-        face = PyOCCTools.get_face_from_shape(face)
-        surf = BRep_Tool.Surface(face)
-        obj = surf
-        assert obj.DynamicType().Name() == "Geom_Plane"
-        plane = Handle_Geom_Plane_DownCast(surf)
-        face_normal = plane.Axis().Direction().XYZ()
-        if check_orientation:
-            if face.Orientation() == 1:
-                face_normal = face_normal.Reversed()
-        return face_normal
+        def get_normal():
+            shape_face = PyOCCTools.get_face_from_shape(face)
+            surf = BRep_Tool.Surface(shape_face)
+            obj = surf
+            assert obj.DynamicType().Name() == "Geom_Plane"
+            plane = Handle_Geom_Plane_DownCast(surf)
+            face_normal = plane.Axis().Direction().XYZ()
+            if check_orientation:
+                if shape_face.Orientation() == 1:
+                    face_normal = face_normal.Reversed()
+            return face_normal.Coord()
+
+        return gp_XYZ(*shape_data_cache.get(
+            face, ('normal', check_orientation), get_normal))
 
     @staticmethod
     def flip_orientation_of_face(face: TopoDS_Face) -> TopoDS_Face:
@@ -383,10 +396,12 @@ class PyOCCTools:
     @staticmethod
     def get_shape_area(shape: TopoDS_Shape) -> float:
         """compute area of a space boundary"""
-        bound_prop = GProp_GProps()
-        brepgprop_SurfaceProperties(shape, bound_prop)
-        area = bound_prop.Mass()
-        return area
+        def get_area():
+            bound_prop = GProp_GProps()
+            brepgprop_SurfaceProperties(shape, bound_prop)
+            return bound_prop.Mass()
+
+        return shape_data_cache.get(shape, 'area', get_area)
 
     @staticmethod
     def remove_coincident_and_collinear_points_from_face(
@@ -556,8 +571,12 @@ class PyOCCTools:
             for cut_shape in cut_shapes:
                 shape = BRepAlgoAPI_Cut(
                     shape, cut_shape).Shape()
-        triang_face = BRepMesh_IncrementalMesh(shape, 1)
-        return triang_face.Shape()
+            return BRepMesh_IncrementalMesh(shape, 1).Shape()
+        # the mesh is stored in the shape itself, so each shape is only
+        # triangulated once
+        shape_data_cache.get(shape, ('mesh', 1), lambda: (
+            BRepMesh_IncrementalMesh(shape, 1).IsDone()))
+        return shape
 
     @staticmethod
     def check_pnt_in_solid(solid: TopoDS_Solid, pnt: gp_Pnt, tol=1.0e-6) \
@@ -652,19 +671,22 @@ class PyOCCTools:
 
     @staticmethod
     def get_minimal_bounding_box(shape):
-        # Create an empty bounding box
-        bbox = Bnd_Box()
+        def get_bounding_box():
+            # Create an empty bounding box
+            bbox = Bnd_Box()
 
-        an_exp = TopExp_Explorer(shape, TopAbs_FACE)
-        while an_exp.More():
-            face = topods_Face(an_exp.Current())
-            brepbndlib_Add(face, bbox)
-            an_exp.Next()
+            an_exp = TopExp_Explorer(shape, TopAbs_FACE)
+            while an_exp.More():
+                face = topods_Face(an_exp.Current())
+                brepbndlib_Add(face, bbox)
+                an_exp.Next()
 
-        # Get the minimal bounding box
-        min_x, min_y, min_z, max_x, max_y, max_z = bbox.Get()
+            # Get the minimal bounding box
+            min_x, min_y, min_z, max_x, max_y, max_z = bbox.Get()
 
-        return (min_x, min_y, min_z), (max_x, max_y, max_z)
+            return (min_x, min_y, min_z), (max_x, max_y, max_z)
+
+        return shape_data_cache.get(shape, 'bounding_box', get_bounding_box)
 
     @staticmethod
     def simple_bounding_box(shapes: Union[TopoDS_Shape, List[TopoDS_Shape]]) \
@@ -879,47 +901,34 @@ class PyOCCTools:
             u_min, u_max = surface.FirstUParameter(), surface.LastUParameter()
             v_min, v_max = surface.FirstVParameter(), surface.LastVParameter()
             # Generate a grid of parameters
-            u_values = np.linspace(u_min, u_max, u_samples)
-            v_values = np.linspace(v_min, v_max, v_samples)
-            # Evaluate the surface at each grid point
-            for u in u_values:
-                for v in v_values:
-                    pnt = surface.Value(u, v)
-                    points.append((pnt.X(), pnt.Y(), pnt.Z()))
+            u_values, v_values = np.meshgrid(
+                np.linspace(u_min, u_max, u_samples),
+                np.linspace(v_min, v_max, v_samples), indexing='ij')
+            if surface.GetType() == GeomAbs_Plane:
+                # evaluate planes for all grid points at once
+                position = surface.Plane().Position()
+                grid = (np.array(position.Location().Coord())
+                        + u_values.reshape(-1, 1)
+                        * np.array(position.XDirection().Coord())
+                        + v_values.reshape(-1, 1)
+                        * np.array(position.YDirection().Coord()))
+                points.extend(map(tuple, grid))
+            else:
+                # Evaluate the surface at each grid point
+                points.extend(surface.Value(u, v).Coord() for u, v in
+                              zip(u_values.flat, v_values.flat))
             explorer.Next()
         return points
 
     @staticmethod
     def calculate_point_based_distance(shape1, shape2, final_num_points=1e5):
-        num_verts_1 = PyOCCTools.get_number_of_vertices(shape1)
-        if num_verts_1 < 5e4:
-            num_faces_1 = PyOCCTools.get_number_of_faces(shape1)
-            sample_points_per_face = math.floor(math.sqrt((
-                                                                  final_num_points - num_verts_1)
-                                                          / num_faces_1))
-            points_on_shape1 = PyOCCTools.sample_points_on_faces(
-                shape1, u_samples=sample_points_per_face,
-                v_samples=sample_points_per_face)
-        else:
-            points_on_shape1 = PyOCCTools.get_points_of_face(shape1)
-            points_on_shape1 = [(p.X(), p.Y(), p.Z()) for p in points_on_shape1]
-
-        num_verts_2 = PyOCCTools.get_number_of_vertices(shape2)
-        if num_verts_2 < 5e4:
-            num_faces_2 = PyOCCTools.get_number_of_faces(shape2)
-            sample_points_per_face = math.floor(math.sqrt(
-                (final_num_points - num_verts_2) / num_faces_2))
-            points_on_shape2 = PyOCCTools.sample_points_on_faces(
-                shape2, u_samples=sample_points_per_face,
-                v_samples=sample_points_per_face)
-        else:
-            points_on_shape2 = PyOCCTools.get_points_of_face(shape2)
-            points_on_shape2 = [(p.X(), p.Y(), p.Z()) for p in points_on_shape2]
+        """Approximate minimal distance of two shapes by point clouds.
 
-        tree1 = KDTree(points_on_shape1)
-        distances, _ = tree1.query(points_on_shape2)
-        # print(f"Minimum distance: {min(distances)}")
-        return min(distances)
+        Points are sampled on the triangulated faces of both shapes, the
+        samples and the KD-tree of shape1 are cached for further calls.
+        """
+        return point_cloud_cache.distance(shape1, shape2,
+                                          int(final_num_points))
 
     @staticmethod
     def create_offset_shape(shape, offset, tolerance=0.0001):
@@ -0,0 +1,155 @@
+"""Persistent on-disk cache for OCC shapes created from IFC entities.
+
+Creating shapes from IFC geometry is expensive and most runs process IFC
+files that did not change since the last run. The ShapeCache stores created
+shapes as BRep files, keyed by the hash of the IFC file content, the entity
+id and the shape profile (kind of shape and geometry settings). Shape
+creating functions use `cached_shape`, which transparently consults the
+active cache before creating a shape.
+"""
+import hashlib
+import logging
+from pathlib import Path
+from typing import Callable, Optional
+
+import ifcopenshell
+from OCC.Core.BRepTools import breptools_ReadFromString, \
+    breptools_WriteToString
+from OCC.Core.TopoDS import TopoDS_Shape
+
+logger = logging.getLogger(__name__)
+
+# increase if the post-processing of cached shapes changes
+CACHE_VERSION = 1
+
+_active_cache: Optional['ShapeCache'] = None
+
+
+def get_settings_fingerprint(settings) -> str:
+    """Short string identifying the relevant options of geometry settings."""
+    if settings is None:
+        return 'none'
+    values = []
+    for option in ('USE_PYTHON_OPENCASCADE', 'USE_WORLD_COORDS',
+                   'EXCLUDE_SOLIDS_AND_SURFACES', 'INCLUDE_CURVES'):
+        try:
+            values.append(settings.get(getattr(settings, option)))
+        except Exception:
+            values.append(None)
+    content = repr((values, ifcopenshell.version, CACHE_VERSION))
+    return hashlib.sha1(content.encode()).hexdigest()[:12]
+
+
+def get_shape_profile(name: str, settings) -> str:
+    """Profile of a kind of shape created with the given settings."""
+    return f"{name}_{get_settings_fingerprint(settings)}"
+
+
+class ShapeCache:
+    """Stores shapes of IFC entities as BRep files in a directory.
+
+    Shapes are only cached for entities of registered IFC files, as the
+    entity ids are only meaningful together with the file content.
+
+    Args:
+        directory: directory to store the BRep files in
+    """
+
+    def __init__(self, directory: Path):
+        self.directory = Path(directory)
+        self._file_hashes = {}
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def hash_file(path: Path) -> str:
+        """Hash of the file content."""
+        sha = hashlib.sha1()
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1 << 20), b''):
+                sha.update(chunk)
+        return sha.hexdigest()
+
+    def register_file(self, ifc_file: ifcopenshell.file, path: Path):
+        """Enable caching for the entities of ifc_file loaded from path."""
+        self._file_hashes[ifc_file.wrapped_data.file_pointer()] = \
+            self.hash_file(path)
+
+    def _get_path(self, entity: ifcopenshell.entity_instance,
+                  profile: str) -> Optional[Path]:
+        file_hash = self._file_hashes.get(
+            entity.wrapped_data.file_pointer())
+        if file_hash is None:
+            return None
+        return self.directory / file_hash / f"{entity.id()}_{profile}.brep"
+
+    def contains(self, entity: ifcopenshell.entity_instance,
+                 profile: str) -> bool:
+        """Check if shape of entity is cached without reading it."""
+        path = self._get_path(entity, profile)
+        return path is not None and path.is_file()
+
+    def get(self, entity: ifcopenshell.entity_instance,
+            profile: str) -> Optional[TopoDS_Shape]:
+        """Get cached shape of entity, None if not cached."""
+        path = self._get_path(entity, profile)
+        if path is None or not path.is_file():
+            self.misses += 1
+            return None
+        try:
+            shape = breptools_ReadFromString(path.read_text())
+        except Exception as ex:
+            logger.warning("Unable to read cached shape %s (%s)", path, ex)
+            self.misses += 1
+            return None
+        self.hits += 1
+        return shape
+
+    def put(self, entity: ifcopenshell.entity_instance, profile: str,
+            shape: TopoDS_Shape):
+        """Store shape of entity."""
+        path = self._get_path(entity, profile)
+        if path is None:
+            return
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            # write to temporary file first to never leave broken files
+            tmp_path = path.with_suffix('.tmp')
+            tmp_path.write_text(breptools_WriteToString(shape))
+            tmp_path.replace(path)
+        except Exception as ex:
+            logger.warning("Unable to cache shape %s (%s)", path, ex)
+
+
+def set_shape_cache(cache: Optional[ShapeCache]):
+    """Activate cache for all following shape creations, None disables."""
+    global _active_cache
+    _active_cache = cache
+
+
+def get_shape_cache() -> Optional[ShapeCache]:
+    """Returns the active ShapeCache or None."""
+    return _active_cache
+
+
+def cached_shape(entity: ifcopenshell.entity_instance, profile: str,
+                 create: Callable[[], TopoDS_Shape]) -> TopoDS_Shape:
+    """Get shape of entity from the active cache or create and store it.
+
+    Args:
+        entity: IFC entity the shape is created from
+        profile: kind of shape and settings used to create it
+        create: function creating the shape if it is not cached
+
+    Returns:
+        shape of entity
+    """
+    cache = _active_cache
+    if cache is None:
+        return create()
+    shape = cache.get(entity, profile)
+    if shape is None:
+        shape = create()
+        if shape is not None:
+            cache.put(entity, profile, shape)
+    return shape
@@ -0,0 +1,122 @@
+"""Cache of data derived from shapes.
+
+Geometric helpers of PyOCCTools like the area, center, normal, vertices or
+bounding box of a face are requested for the same space boundary shapes by
+many tasks (space boundary correction, IDF creation, OpenFOAM geometry).
+The ShapeDataCache stores these derived values once per shape.
+
+Shapes are identified by their TShape, location and orientation, like
+TopoDS_Shape.IsEqual. Each ShapeData gets a new version from a counter of
+the cache. Invalidating a shape (e.g. when the shape of a space boundary is
+replaced) drops its data and marks it as invalid, data created afterwards
+for the same shape has a new version. As the cached data keeps its shape
+alive, the cache is small and cleared when a project is finished.
+
+Cached values must not be modified, the helpers using the cache return new
+gp objects from the cached coordinates.
+"""
+import itertools
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Optional, Tuple
+
+from OCC.Core.TopoDS import TopoDS_Shape
+
+
+class ShapeData:
+    """Derived values of a single shape.
+
+    Args:
+        shape: the shape
+        version: version of the data, unique within its cache
+    """
+    __slots__ = ('shape', 'version', 'values', 'valid')
+
+    def __init__(self, shape: TopoDS_Shape, version: int):
+        self.shape = shape
+        self.version = version
+        self.values = {}
+        self.valid = True
+
+    def matches(self, shape: TopoDS_Shape) -> bool:
+        return self.shape.IsEqual(shape)
+
+
+class ShapeDataCache:
+    """Least recently used cache of ShapeData.
+
+    Args:
+        maxsize: maximum number of cached shapes
+    """
+
+    def __init__(self, maxsize: int = 5000):
+        self.maxsize = maxsize
+        self._entries: OrderedDict = OrderedDict()
+        self._version_counter = itertools.count()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(shape: TopoDS_Shape) -> Tuple[int, int]:
+        """Key of the shape identity (TShape, location and orientation)."""
+        return hash(shape), int(shape.Orientation())
+
+    def version(self, shape: TopoDS_Shape) -> Optional[int]:
+        """Version of the cached data of shape, None if not cached."""
+        data = self._entries.get(self.key(shape))
+        if data is not None and data.matches(shape):
+            return data.version
+        return None
+
+    def get_data(self, shape: TopoDS_Shape) -> ShapeData:
+        """Get the ShapeData of shape, create it if not cached yet."""
+        key = self.key(shape)
+        data = self._entries.get(key)
+        if data is not None and data.matches(shape):
+            self._entries.move_to_end(key)
+            return data
+        data = ShapeData(shape, next(self._version_counter))
+        self._entries[key] = data
+        if len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+        return data
+
+    def get(self, shape: TopoDS_Shape, name: Hashable,
+            compute: Callable[[], Any]) -> Any:
+        """Get a derived value of shape.
+
+        Args:
+            shape: the shape
+            name: name of the value, e.g. 'area'
+            compute: function computing the value if it is not cached
+
+        Returns:
+            the cached or computed value
+        """
+        if shape is None or shape.IsNull():
+            return compute()
+        values = self.get_data(shape).values
+        try:
+            value = values[name]
+        except KeyError:
+            self.misses += 1
+            value = values[name] = compute()
+        else:
+            self.hits += 1
+        return value
+
+    def invalidate(self, shape: Optional[TopoDS_Shape]):
+        """Drop the data of shape and mark it as invalid."""
+        if shape is None or not isinstance(shape, TopoDS_Shape) \
+                or shape.IsNull():
+            return
+        key = self.key(shape)
+        data = self._entries.get(key)
+        if data is not None and data.matches(shape):
+            del self._entries[key]
+            data.valid = False
+
+    def clear(self):
+        self._entries.clear()
+
+
+shape_data_cache = ShapeDataCache()
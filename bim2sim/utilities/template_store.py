@@ -0,0 +1,171 @@
+"""Indexed store of the construction and material templates.
+
+The TypeElements_*.json files hold the construction templates per element
+type, year range and construction type. The TemplateStore of a file loads
+it once per process and parses the year ranges into an interval index, so
+looking up the template for a year of construction does not need to parse
+and scan all year ranges.
+
+Year ranges of the data files may overlap. As before, the first year range
+(in the order of the file) containing the year is used. The index splits the
+years into elementary intervals between all range limits and stores the
+winning year range for each of them, a lookup is a binary search on the
+interval starts.
+
+The templates returned by the stores are shared and must not be modified.
+`content_key` hashes the content of a template, which allows to create only
+one element for templates with identical content.
+"""
+import ast
+import bisect
+import hashlib
+import json
+import logging
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, List, Optional, Union
+
+from bim2sim.utilities.common_functions import get_type_building_elements, \
+    get_material_templates
+
+logger = logging.getLogger(__name__)
+
+
+class YearRangeIndex:
+    """Interval index over the year ranges of one element type.
+
+    Args:
+        years_dict: dict[year range: dict[construction: template]], the year
+            ranges are given as strings like '[1919, 1948]'
+    """
+
+    def __init__(self, years_dict: dict):
+        self.years_dict = years_dict
+        ranges = [(tuple(ast.literal_eval(year_range)), options)
+                  for year_range, options in years_dict.items()]
+        limits = sorted({start for (start, _), _ in ranges}
+                        | {end + 1 for (_, end), _ in ranges})
+        self._starts: List[int] = []
+        self._options: List[Optional[dict]] = []
+        for start in limits:
+            # first range of the file containing the elementary interval
+            options = next((options for (first, last), options in ranges
+                            if first <= start <= last), None)
+            if self._options and self._options[-1] is options:
+                continue
+            self._starts.append(start)
+            self._options.append(options)
+
+    def __len__(self) -> int:
+        return len(self.years_dict)
+
+    def get(self, year: int) -> Optional[dict]:
+        """Template options of the first year range containing year."""
+        if len(self.years_dict) == 1:
+            return next(iter(self.years_dict.values()))
+        position = bisect.bisect_right(self._starts, year) - 1
+        if position < 0:
+            return None
+        return self._options[position]
+
+
+class TemplateStore:
+    """Construction templates of one TypeElements_*.json file.
+
+    Args:
+        data_file: name of the data file in assets/enrichment/material
+    """
+
+    def __init__(self, data_file: Union[str, Path]):
+        self.data_file = Path(data_file)
+        self.templates = get_type_building_elements(self.data_file)
+        self._indices: Dict[str, YearRangeIndex] = {
+            element_type: YearRangeIndex(years_dict)
+            for element_type, years_dict in self.templates.items()}
+
+    @property
+    def element_types(self) -> List[str]:
+        return list(self.templates.keys())
+
+    def get_template(self, element_type: str, year_of_construction: int,
+                     construction_data: str) -> Optional[dict]:
+        """Template of element type for year and construction data.
+
+        Args:
+            element_type: type of building element, e.g. 'OuterWall'
+            year_of_construction: year the building was constructed in
+            construction_data: construction type, e.g. 'iwu_heavy'
+
+        Returns:
+            the template, None if no year range contains the year
+        """
+        index = self._indices[element_type]
+        template_options = index.get(year_of_construction)
+        if len(index) == 1 and template_options and \
+                len(template_options) > 1:
+            # a single year range is used for all years, without fallback
+            return template_options[construction_data]
+        return select_template(element_type, template_options,
+                               construction_data, year_of_construction)
+
+
+def select_template(element_type: str, template_options: Optional[dict],
+                    construction_data: str,
+                    year_of_construction: int,
+                    warning_logger: logging.Logger = logger) -> Optional[dict]:
+    """Select the template for construction data from the options of a year
+    range.
+
+    Missing window constructions fall back to the last window construction of
+    the year range.
+    """
+    if not template_options:
+        return None
+    if len(template_options) == 1:
+        return next(iter(template_options.values()))
+    # Special handling for windows
+    if element_type == 'Window' and \
+            construction_data not in template_options:
+        # Fallback to last available window type
+        new_construction_data = list(template_options.keys())[-1]
+        warning_logger.warning(
+            f"The window_construction_data {construction_data} is not "
+            f"available for year_of_construction {year_of_construction}. "
+            f"Using {new_construction_data} instead.")
+        return template_options[new_construction_data]
+    return template_options[construction_data]
+
+
+def content_key(template: dict) -> str:
+    """Hash of the content of a (json) template, independent of key order."""
+    return hashlib.sha1(json.dumps(
+        template, sort_keys=True, default=str).encode()).hexdigest()
+
+
+@lru_cache(maxsize=None)
+def get_template_store(data_file: Union[str, Path]) -> TemplateStore:
+    """Shared TemplateStore of data file, each file is loaded once."""
+    return TemplateStore(data_file)
+
+
+@lru_cache(maxsize=None)
+def get_resumed_material_templates() -> Dict[str, dict]:
+    """Material templates by material name with the keys used by EnrichMaterial.
+
+    'name' is renamed to 'material', 'thickness_default' to 'thickness' and
+    'thickness_list' is omitted.
+    """
+    material_templates = get_material_templates()
+    resumed = {}
+    for template in material_templates.values():
+        resumed_template = resumed[template['name']] = {}
+        for attr, value in template.items():
+            if attr == 'thickness_default':
+                resumed_template['thickness'] = value
+            elif attr == 'name':
+                resumed_template['material'] = value
+            elif attr == 'thickness_list':
+                continue
+            else:
+                resumed_template[attr] = value
+    return resumed
@@ -0,0 +1,133 @@
+"""Matching of IFC space names to usages of the use conditions.
+
+The UsageMatcher finds the usages matching a zone name with the same rules
+as before (custom wildcard patterns first, then the common regex patterns
+applied to each word of the name), but evaluates them efficiently for many
+zones:
+
+* all common patterns are combined into one regex, which rejects words
+  without any match in a single pass.
+* the usages matching a word and the matches of a zone name are memoised,
+  so repeated room names are matched only once.
+* matchers are cached per process, keyed by the usages of the use
+  conditions and the hashes of the usage json files.
+"""
+import hashlib
+import json
+import re
+from pathlib import Path
+from typing import Dict, FrozenSet, List, Optional
+
+from bim2sim.utilities.common_functions import get_pattern_usage, \
+    wildcard_match
+
+COMMON_USAGES_PATH = Path(__file__).parent.parent / \
+    'assets/enrichment/usage/commonUsages.json'
+
+_matchers: Dict[str, 'UsageMatcher'] = {}
+
+
+def split_usage_name(name: str) -> List[str]:
+    """Split a zone name into the words matched by the common patterns."""
+    return name.replace(' (', ' ').replace(')', ' '). \
+        replace(' -', ' ').replace(', ', ' ').split()
+
+
+class UsageMatcher:
+    """Finds the usages matching zone names.
+
+    Args:
+        pattern_usage: dict with custom and common patterns per usage as
+            returned by get_pattern_usage
+    """
+
+    def __init__(self, pattern_usage: dict):
+        self.pattern_usage = pattern_usage
+        self.usages = list(pattern_usage.keys())
+        self._custom = [(usage, pattern_usage[usage].get("custom", []))
+                        for usage in self.usages]
+        common = [pattern for usage in self.usages
+                  for pattern in pattern_usage[usage]["common"]]
+        try:
+            self._prefilter = re.compile(
+                '|'.join('(?:%s)' % pattern.pattern for pattern in common),
+                flags=re.IGNORECASE)
+        except re.error:
+            # e.g. patterns with backreferences can't be combined
+            self._prefilter = None
+        self._word_usages: Dict[str, FrozenSet[str]] = {}
+        self._name_matches: Dict[str, List[str]] = {}
+
+    def __contains__(self, usage: str) -> bool:
+        return usage in self.pattern_usage
+
+    def _match_word(self, word: str) -> FrozenSet[str]:
+        """Usages with a common pattern matching word."""
+        usages = self._word_usages.get(word)
+        if usages is None:
+            usages = frozenset()
+            if self._prefilter is None or self._prefilter.match(word):
+                usages = frozenset(
+                    usage for usage in self.usages
+                    if any(pattern.match(word) for pattern in
+                           self.pattern_usage[usage]["common"]))
+            self._word_usages[word] = usages
+        return usages
+
+    def match(self, name: str) -> List[str]:
+        """Usages matching the zone name, in the order of the usages.
+
+        Custom patterns of all usages are checked. Common patterns are
+        only checked as long as no usage matched.
+
+        Args:
+            name: usage name of the zone as given in the IFC
+
+        Returns:
+            list of matching usages, empty if nothing matched
+        """
+        matches = self._name_matches.get(name)
+        if matches is not None:
+            return list(matches)
+        matches = []
+        common_usages = None
+        for usage, custom_patterns in self._custom:
+            for pattern in custom_patterns:
+                if usage not in matches and wildcard_match(pattern, name):
+                    matches.append(usage)
+            if not matches:
+                if common_usages is None:
+                    common_usages = frozenset().union(
+                        *(self._match_word(word)
+                          for word in split_usage_name(name)))
+                if usage in common_usages:
+                    matches.append(usage)
+        self._name_matches[name] = matches
+        return list(matches)
+
+
+def _hash_file(path: Optional[Path]) -> str:
+    if not path or not Path(path).is_file():
+        return ''
+    return hashlib.sha1(Path(path).read_bytes()).hexdigest()
+
+
+def get_usage_matcher(use_conditions: dict,
+                      custom_usages_path: Optional[Path]) -> UsageMatcher:
+    """Cached UsageMatcher for the use conditions and custom usages.
+
+    Args:
+        use_conditions: use conditions as returned by get_use_conditions_dict
+        custom_usages_path: path to the custom usages json file or None
+
+    Returns:
+        UsageMatcher, shared with all calls with the same input data
+    """
+    key = hashlib.sha1(json.dumps(
+        [list(use_conditions.keys()), _hash_file(COMMON_USAGES_PATH),
+         _hash_file(custom_usages_path)]).encode()).hexdigest()
+    matcher = _matchers.get(key)
+    if matcher is None:
+        matcher = _matchers[key] = UsageMatcher(
+            get_pattern_usage(use_conditions, custom_usages_path))
+    return matcher
@@ -1,10 +1,14 @@
+import tempfile
 import unittest
+from pathlib import Path
 
 import networkx as nx
 
 import bim2sim.elements.aggregation.hvac_aggregations
 from bim2sim.elements import aggregation
 from bim2sim.elements import hvac_elements as hvac
+from bim2sim.elements.aggregation.matching import MatchCache, \
+    find_matches_per_component
 from bim2sim.elements.graphs.hvac_graph import HvacGraph
 from bim2sim.elements.mapping.units import ureg
 from test.unit.elements.helper import SetupHelperHVAC
@@ -274,6 +278,82 @@ class TestConsumerAggregation(unittest.TestCase):
         for item in consumer:
             self.assertIn(item, all_elements)
 
+    def test_find_matches_per_component(self):
+        """ Test parallel detection of consumer cycles in two independent
+            systems."""
+        graph1, flags1 = self.helper.get_setup_system()
+        graph2, flags2 = self.helper.get_setup_system2()
+        graph = nx.compose(graph1, graph2)
+
+        matches, metas = bim2sim.elements.aggregation.hvac_aggregations.Consumer.find_matches(graph)
+        matches_par, metas_par = find_matches_per_component(
+            bim2sim.elements.aggregation.hvac_aggregations.Consumer, graph,
+            processes=2)
+
+        self.assertEqual(len(matches_par), len(matches))
+        self.assertEqual(len(metas_par), len(matches_par))
+        self.assertCountEqual(
+            [set(match.nodes) for match in matches],
+            [set(match.nodes) for match in matches_par])
+        for match in matches_par:
+            self.assertTrue(set(match.nodes).issubset(set(graph.nodes)))
+
+    def test_find_matches_per_component_views(self):
+        """ Test that sequential, parallel and cached matches are all views
+            of the searched graph."""
+        graph1, flags1 = self.helper.get_setup_system()
+        graph2, flags2 = self.helper.get_setup_system2()
+        graph = nx.compose(graph1, graph2)
+        consumer_cls = bim2sim.elements.aggregation.hvac_aggregations.Consumer
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = Path(directory) / 'aggregation_matches.pickle'
+            cache = MatchCache(path)
+            sequential, _ = find_matches_per_component(
+                consumer_cls, graph, cache=cache)
+            cache.save()
+            cache = MatchCache(path)
+            cache.load()
+            cached, _ = find_matches_per_component(
+                consumer_cls, graph, cache=cache)
+        parallel, _ = find_matches_per_component(
+            consumer_cls, graph, processes=2)
+
+        for matches in (sequential, cached, parallel):
+            self.assertTrue(matches)
+            for match in matches:
+                self.assertIs(graph, match._graph)
+
+    def test_find_matches_per_component_cached(self):
+        """ Test reuse of cached consumer matches for unchanged systems."""
+        graph1, flags1 = self.helper.get_setup_system()
+        graph2, flags2 = self.helper.get_setup_system2()
+        graph = nx.compose(graph1, graph2)
+        consumer_cls = bim2sim.elements.aggregation.hvac_aggregations.Consumer
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = Path(directory) / 'aggregation_matches.pickle'
+            cache = MatchCache(path)
+            cache.load()
+            matches, metas = find_matches_per_component(
+                consumer_cls, graph, cache=cache)
+            cache.save()
+            n_components = nx.number_connected_components(graph)
+            self.assertEqual(cache.hits, 0)
+            self.assertEqual(cache.misses, n_components)
+
+            cache = MatchCache(path)
+            cache.load()
+            matches_cached, metas_cached = find_matches_per_component(
+                consumer_cls, graph, cache=cache)
+            self.assertEqual(cache.hits, n_components)
+            self.assertEqual(cache.misses, 0)
+
+        self.assertEqual(len(metas_cached), len(matches_cached))
+        self.assertCountEqual(
+            [set(match.nodes) for match in matches],
+            [set(match.nodes) for match in matches_cached])
+
     def test_aggregation_consumer1(self):
         """ Test aggregation of consumer cycle no 1."""
         graph, flags = self.helper.get_setup_system()
@@ -1,10 +1,11 @@
-﻿import unittest
+﻿import pickle
+import unittest
 
 import networkx as nx
 
 from bim2sim.elements import hvac_elements as hvac
 from bim2sim.elements.hvac_elements import HVACPort
-from bim2sim.elements.graphs import hvac_graph
+from bim2sim.elements.graphs import hvac_graph, plotting
 from test.unit.elements.helper import SetupHelperHVAC
 
 
@@ -253,3 +254,72 @@ class TestHVACGraph(unittest.TestCase):
                          in {ele.__class__ for ele in new_port_graph.elements})
         self.assertFalse(hvac.Boiler and hvac.Distributor
                          in {node.__class__ for node in new_ele_graph.nodes})
+
+    def test_prepare_plot_data(self):
+        """ Test conversion of graph to picklable plot data with sampling."""
+        elements, flags = self.helper.get_system_elements()
+        port_graph = hvac_graph.HvacGraph(elements)
+
+        data = plotting.prepare_plot_data(port_graph, ports=False)
+        self.assertEqual(data.graph.number_of_nodes(), len(elements))
+        self.assertEqual(data.n_nodes_total, len(elements))
+        self.assertTrue(all(isinstance(node, str)
+                            for node in data.graph.nodes))
+        pickle.dumps(data)
+
+        data_ports = plotting.prepare_plot_data(
+            port_graph, ports=True, max_nodes=10)
+        self.assertEqual(data_ports.graph.number_of_nodes(), 10)
+        self.assertEqual(data_ports.n_nodes_total,
+                         port_graph.number_of_nodes())
+        self.assertTrue(nx.is_connected(data_ports.graph))
+
+    def test_propagate_flow_sides(self):
+        """ Test determination of unknown flow sides from known ports."""
+        strait = generate_element_strait(number=5)
+        graph = hvac_graph.HvacGraph(strait)
+        master = strait[0].ports[0]
+        master.flow_side = 1
+
+        sides, conflicts = graph.propagate_flow_sides()
+        self.assertEqual(conflicts, [])
+        self.assertSetEqual(
+            set(sides), set(graph.nodes) - {master})
+        self.assertTrue(all(side == 1 for side in sides.values()))
+
+        # second master with other side leads to conflict
+        other_master = strait[-1].ports[1]
+        other_master.flow_side = -1
+        sides, conflicts = graph.propagate_flow_sides()
+        self.assertEqual(sides, {})
+        self.assertEqual(len(conflicts), 1)
+        self.assertCountEqual(conflicts[0][1], [master, other_master])
+
+    def test_propagate_flow_sides_consumer(self):
+        """ Test switching of flow side over consumers."""
+        pipes_vl = generate_element_strait(number=3, prefix='vl')
+        pipes_rl = generate_element_strait(number=3, prefix='rl')
+        heater = self.helper.element_generator(hvac.SpaceHeater)
+        pipes_vl[-1].ports[1].connect(heater.ports[0])
+        heater.ports[1].connect(pipes_rl[0].ports[0])
+        graph = hvac_graph.HvacGraph([*pipes_vl, heater, *pipes_rl])
+        pipes_vl[0].ports[0].flow_side = 1
+
+        sides, conflicts = graph.propagate_flow_sides()
+        self.assertEqual(conflicts, [])
+        self.assertEqual(sides[heater.ports[0]], 1)
+        self.assertEqual(sides[heater.ports[1]], -1)
+        self.assertTrue(all(sides[port] == -1
+                            for ele in pipes_rl for port in ele.ports))
+
+    def test_propagate_flow_sides_long_strand(self):
+        """ Test flow side propagation on strands exceeding the recursion
+            limit."""
+        strait = generate_element_strait(number=5000)
+        graph = hvac_graph.HvacGraph(strait)
+        strait[0].ports[0].flow_side = -1
+
+        sides, conflicts = graph.propagate_flow_sides()
+        self.assertEqual(len(sides), graph.number_of_nodes() - 1)
+        known = graph.propagate_side(strait[0].ports[0], -1)
+        self.assertEqual(len(known), graph.number_of_nodes())
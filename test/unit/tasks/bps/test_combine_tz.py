@@ -0,0 +1,82 @@
+import random
+import unittest
+
+from bim2sim.tasks.bps.combine_tz import CombineThermalZones
+
+
+class Zone:
+    """Minimal thermal zone with the attributes used for zoning."""
+
+    def __init__(self, name, is_external=True, usage='Office',
+                 external_orientation=180, glass_percentage=40):
+        self.guid = name
+        self.is_external = is_external
+        self.usage = usage
+        self.external_orientation = external_orientation
+        self.glass_percentage = glass_percentage
+        self.space_neighbors = []
+
+    def __repr__(self):
+        return self.guid
+
+
+def reference_group_by_is_neighbor(thermal_zones: list) -> dict:
+    """is_neighbor criterion as implemented before with list lookups."""
+    grouped_tz = {'': list(thermal_zones)}
+    for tz in thermal_zones:
+        if not any(neighbor in thermal_zones
+                   for neighbor in tz.space_neighbors):
+            grouped_tz[''].remove(tz)
+    CombineThermalZones.discard_1_element_groups(grouped_tz)
+    return grouped_tz
+
+
+def create_zones(n_zones: int, seed: int = 0) -> list:
+    rng = random.Random(seed)
+    zones = [Zone(f'tz{i}', rng.random() < 0.7,
+                  rng.choice(['Office', 'Kitchen', 'Traffic area']),
+                  rng.uniform(0, 360), rng.uniform(0, 100))
+             for i in range(n_zones)]
+    for zone in zones:
+        zone.space_neighbors = rng.sample(zones, rng.randint(0, 3))
+    return zones
+
+
+class TestCombineThermalZones(unittest.TestCase):
+
+    def test_group_by_is_neighbor(self):
+        """Test is_neighbor criterion against the list based version."""
+        zones = create_zones(300)
+        for subset in (zones, zones[::3], zones[:10]):
+            self.assertEqual(
+                reference_group_by_is_neighbor(subset),
+                CombineThermalZones.group_by_is_neighbor(subset))
+
+    def test_group_by_use_all_criteria(self):
+        """Test grouping by all criteria for a small example."""
+        zones = [Zone('a'), Zone('b'), Zone('c', glass_percentage=80),
+                 Zone('d', usage='Kitchen'), Zone('e', is_external=False),
+                 Zone('f', is_external=False), Zone('g')]
+        zones[0].space_neighbors = [zones[1]]
+        zones[1].space_neighbors = [zones[0]]
+        zones[4].space_neighbors = [zones[5]]
+        zones[5].space_neighbors = [zones[4]]
+        grouped = CombineThermalZones.group_thermal_zones_by_use_all_criteria(
+            zones)
+        self.assertEqual({
+            'external_Office_S-W_30-50%_': [zones[0], zones[1]],
+            'internal_Office_': [zones[4], zones[5]],
+            'not_combined': [zones[2], zones[3], zones[6]]}, grouped)
+
+    def test_many_zones(self):
+        """Test that grouping of many zones assigns every zone once."""
+        zones = create_zones(20000)
+        grouped = CombineThermalZones.group_thermal_zones_by_use_all_criteria(
+            zones)
+        grouped_zones = [tz for group in grouped.values() for tz in group]
+        self.assertEqual(len(grouped_zones), len(set(grouped_zones)))
+        self.assertLessEqual(len(grouped_zones), len(zones))
+
+
+if __name__ == '__main__':
+    unittest.main()
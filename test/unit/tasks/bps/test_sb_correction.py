@@ -0,0 +1,47 @@
+import unittest
+
+from OCC.Core.BRepPrimAPI import BRepPrimAPI_MakeBox
+from OCC.Core.gp import gp_Pnt
+
+from bim2sim.tasks.bps.sb_correction import CorrectSpaceBoundaries, \
+    sew_space_faces
+from bim2sim.utilities.pyocc_tools import PyOCCTools
+
+
+def get_box_faces(origin=(0., 0., 0.), flip=(0, 3)):
+    """Faces of a unit box, the faces with index in flip are reversed."""
+    box = BRepPrimAPI_MakeBox(gp_Pnt(*origin), 1., 1., 1.).Shape()
+    faces = PyOCCTools.get_faces_from_shape(box)
+    return [PyOCCTools.flip_orientation_of_face(face) if i in flip else face
+            for i, face in enumerate(faces)]
+
+
+def get_normals(faces):
+    return sorted(tuple(round(c, 6) for c in PyOCCTools.simple_face_normal(
+        face, check_orientation=False).Coord()) for face in faces)
+
+
+class TestFixSurfaceOrientation(unittest.TestCase):
+
+    def test_sew_space_faces(self):
+        """Test if sewed faces of a box have a consistent orientation."""
+        fixed_faces = sew_space_faces(get_box_faces())
+        self.assertEqual(6, len(fixed_faces))
+        self.assertEqual(6, len(set(get_normals(fixed_faces))))
+
+    def test_compute_fixed_faces_in_processes(self):
+        """Test if parallel sewing gives the results of sequential sewing."""
+        face_lists = [get_box_faces((i * 2., 0., 0.), flip=(i % 6,))
+                      for i in range(4)]
+        sequential = CorrectSpaceBoundaries.compute_fixed_faces(face_lists)
+        parallel = CorrectSpaceBoundaries.compute_fixed_faces(
+            face_lists, processes=2)
+        self.assertEqual(len(sequential), len(parallel))
+        for seq_faces, par_faces in zip(sequential, parallel):
+            self.assertEqual(get_normals(seq_faces), get_normals(par_faces))
+            self.assertEqual([face.Orientation() for face in seq_faces],
+                             [face.Orientation() for face in par_faces])
+
+
+if __name__ == '__main__':
+    unittest.main()
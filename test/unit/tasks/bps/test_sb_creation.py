@@ -0,0 +1,118 @@
+import random
+import unittest
+
+from bim2sim.elements.bps_elements import SpaceBoundary, \
+    ExtSpatialSpaceBoundary
+from bim2sim.tasks.bps.sb_creation import CreateSpaceBoundaries
+
+
+class Entity:
+    """Minimal IFC entity with the attributes used for space boundaries."""
+    _ids = 0
+
+    def __init__(self, ifc_type, guid, **attributes):
+        Entity._ids += 1
+        self._id = Entity._ids
+        self._type = ifc_type
+        self.GlobalId = guid
+        self.Name = None
+        self.__dict__.update(attributes)
+
+    def id(self):
+        return self._id
+
+    def is_a(self, ifc_type=None):
+        if ifc_type is None:
+            return self._type
+        return self._type == ifc_type
+
+
+class Product:
+    """Minimal thermal zone or building element."""
+
+    def __init__(self, guid):
+        self.guid = guid
+        self.space_boundaries = []
+        self.bound_elements = []
+        self.thermal_zones = []
+
+
+def create_model(n_bounds: int, seed: int = 0):
+    rng = random.Random(seed)
+    ifc_spaces = [Entity('IfcSpace', f'space{i}') for i in range(20)] + [
+        Entity('IfcExternalSpatialElement', f'ext{i}') for i in range(3)]
+    ifc_elements = [Entity('IfcWall', f'wall{i}') for i in range(50)]
+    # some spaces and walls have no bim2sim element
+    elements = {entity.GlobalId: Product(entity.GlobalId)
+                for entity in ifc_spaces[2:] + ifc_elements[5:]}
+    entities = []
+    for i in range(n_bounds):
+        entities.append(Entity(
+            rng.choice(['IfcRelSpaceBoundary2ndLevel',
+                        'IfcRelSpaceBoundary1stLevel']), f'bound{i}',
+            RelatingSpace=rng.choice(ifc_spaces),
+            RelatedBuildingElement=rng.choice(ifc_elements + [None])))
+    return entities, elements
+
+
+def reference_instantiate(entities, elements, create_external_elements):
+    """Instantiation as implemented before, one boundary at a time."""
+    element_lst = {}
+    for entity in entities:
+        if entity.is_a() == 'IfcRelSpaceBoundary1stLevel' or \
+                entity.Name == '1stLevel':
+            continue
+        if entity.RelatingSpace.is_a('IfcSpace'):
+            element = SpaceBoundary.from_ifc(entity, elements=element_lst)
+        elif create_external_elements and entity.RelatingSpace.is_a(
+                'IfcExternalSpatialElement'):
+            element = ExtSpatialSpaceBoundary.from_ifc(
+                entity, elements=element_lst)
+        else:
+            continue
+        relating_space = elements.get(
+            element.ifc.RelatingSpace.GlobalId, None)
+        if relating_space is None:
+            continue
+        relating_space.space_boundaries.append(element)
+        element.bound_thermal_zone = relating_space
+        if element.ifc.RelatedBuildingElement:
+            related = elements.get(
+                element.ifc.RelatedBuildingElement.GlobalId, None)
+            if related:
+                related.space_boundaries.append(element)
+                element.bound_element = related
+                CreateSpaceBoundaries.connect_element_to_zone(
+                    relating_space, related)
+        element_lst[element.guid] = element
+    return list(element_lst.values())
+
+
+def summary(bounds, elements):
+    return (
+        [(b.guid, type(b), b.bound_thermal_zone.guid,
+          getattr(b.bound_element, 'guid', None)) for b in bounds],
+        {guid: ([b.guid for b in ele.space_boundaries],
+                [e.guid for e in ele.bound_elements],
+                [z.guid for z in ele.thermal_zones])
+         for guid, ele in elements.items()})
+
+
+class TestInstantiateSpaceBoundaries(unittest.TestCase):
+
+    def test_parity_with_single_instantiation(self):
+        """Test bulk instantiation against connecting bounds one by one."""
+        for create_external_elements in (True, False):
+            entities, elements = create_model(2000)
+            reference = reference_instantiate(
+                entities, elements, create_external_elements)
+            expected = summary(reference, elements)
+            entities, elements = create_model(2000)
+            task = CreateSpaceBoundaries.__new__(CreateSpaceBoundaries)
+            bounds = task.instantiate_space_boundaries(
+                entities, elements, None, create_external_elements, None)
+            self.assertEqual(expected, summary(bounds, elements))
+
+
+if __name__ == '__main__':
+    unittest.main()
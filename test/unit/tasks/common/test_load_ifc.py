@@ -23,6 +23,7 @@ class TestLoadIFC(unittest.TestCase):
         project = mock.Mock()
         paths = mock.Mock()
         cls.playground.project = project
+        cls.playground.sim_settings.use_geometry_cache = False
 
         # Instantiate export task and set required values via mocks
         cls.load_ifc_task = LoadIFC(cls.playground)
@@ -0,0 +1,124 @@
+import logging
+import math
+import random
+import time
+import unittest
+from pathlib import Path
+
+import ifcopenshell
+import numpy as np
+
+from bim2sim.elements.mapping.units import ureg
+from bim2sim.tasks.common.inner_loop_remover import _calculate_plane_vectors, \
+    _is_convex_angle, is_convex_no_holes, is_polygon_convex_no_holes
+from bim2sim.tasks.common.polygon_kernel import PolygonBatch, \
+    convex_pieces_batch, is_convex_angle_batch, is_convex_no_holes_batch, \
+    polygon_normals, triangulate_batch
+from bim2sim.utilities.geometry import calc_bound_shape
+
+logger = logging.getLogger(__name__)
+test_rsrc_path = Path(__file__).parent.parent.parent.parent / 'resources'
+
+
+def star(n, r1, r2, rotation=None, offset=(0., 0., 0.)):
+    """Polygon alternating between the radius r1 and r2."""
+    points = np.array([
+        ((r1 if i % 2 == 0 else r2) * math.cos(2 * math.pi * i / n),
+         (r1 if i % 2 == 0 else r2) * math.sin(2 * math.pi * i / n), 0.)
+        for i in range(n)])
+    if rotation is not None:
+        points = points @ rotation.T
+    return [tuple(point) for point in (points + offset).tolist()]
+
+
+def area(polygon):
+    points = np.array(polygon)
+    return np.linalg.norm(
+        np.cross(points, np.roll(points, -1, axis=0)).sum(axis=0)) / 2
+
+
+class TestPolygonKernel(unittest.TestCase):
+
+    def setUp(self):
+        self.random = random.Random(42)
+        self.rng = np.random.default_rng(42)
+
+    def random_rotation(self):
+        return np.linalg.qr(self.rng.random((3, 3)))[0]
+
+    def test_is_convex_parity(self):
+        """Test if the batch results equal is_polygon_convex_no_holes."""
+        polygons = []
+        for _ in range(200):
+            n = self.random.randint(3, 12)
+            if self.random.random() < 0.5:
+                polygon = star(n, 1, self.random.choice([0.5, 1, 1.5]))
+            else:
+                polygon = [(self.random.random(), self.random.random(), 0.)
+                           for _ in range(n)]
+            if self.random.random() < 0.3:
+                polygon.reverse()
+            polygons.append(polygon)
+        batch = PolygonBatch.from_polygons(polygons)
+        self.assertEqual(
+            [is_polygon_convex_no_holes(polygon) for polygon in polygons],
+            list(is_convex_no_holes_batch(batch)))
+
+    def test_normals_and_angles_parity(self):
+        """Test normals and convex angles against the original functions."""
+        triangles = [[tuple(p) for p in self.rng.random((3, 3)).tolist()]
+                     for _ in range(50)]
+        normals = polygon_normals(PolygonBatch.from_polygons(triangles))
+        normals /= np.linalg.norm(normals, axis=1)[:, None]
+        for triangle, normal in zip(triangles, normals):
+            np.testing.assert_allclose(
+                _calculate_plane_vectors(triangle)[0], normal, atol=1e-9)
+        points = self.rng.random((100, 3, 3))
+        directions = self.rng.random((100, 3)) - 0.5
+        self.assertEqual(
+            [_is_convex_angle(*map(tuple, p), tuple(n))
+             for p, n in zip(points, directions)],
+            list(is_convex_angle_batch(
+                points[:, 0], points[:, 1], points[:, 2], directions)))
+
+    def test_triangulate_and_convex_pieces(self):
+        """Test if triangles and convex pieces cover the polygon."""
+        polygons = [star(n, 1, r2, self.random_rotation(), self.rng.random(3))
+                    for n in (4, 6, 8, 12) for r2 in (0.3, 1., 1.5)]
+        batch = PolygonBatch.from_polygons(polygons)
+        for polygon, triangles, pieces in zip(
+                polygons, triangulate_batch(batch), convex_pieces_batch(batch)):
+            self.assertEqual(len(polygon) - 2, len(triangles))
+            self.assertAlmostEqual(
+                area(polygon), sum(area(t) for t in triangles))
+            self.assertAlmostEqual(
+                area(polygon), sum(area(piece) for piece in pieces))
+            self.assertTrue(all(is_convex_no_holes_batch(
+                PolygonBatch.from_polygons(pieces))))
+
+    @unittest.skipUnless(
+        (test_rsrc_path / 'arch/ifc/AC20-FZK-Haus.ifc').is_file(),
+        "test resources not available")
+    def test_benchmark_sampled_bounds(self):
+        """Compare convexity test of sampled real bounds and log timings."""
+        ifc_file = ifcopenshell.open(
+            str(test_rsrc_path / 'arch/ifc/AC20-FZK-Haus.ifc'))
+        entities = ifc_file.by_type('IfcRelSpaceBoundary')
+        entities = self.random.sample(entities, min(100, len(entities)))
+        shapes = [calc_bound_shape(entity, ureg.meter, None)
+                  for entity in entities]
+
+        start = time.perf_counter()
+        expected = [is_convex_no_holes(shape) for shape in shapes]
+        time_single = time.perf_counter() - start
+        start = time.perf_counter()
+        result = is_convex_no_holes_batch(PolygonBatch.from_shapes(shapes))
+        time_batch = time.perf_counter() - start
+
+        self.assertEqual(expected, list(result))
+        logger.info("Convexity of %d bounds: %.4f s single, %.4f s batch",
+                    len(shapes), time_single, time_batch)
+
+
+if __name__ == '__main__':
+    unittest.main()
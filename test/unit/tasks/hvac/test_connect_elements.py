@@ -0,0 +1,50 @@
+import unittest
+
+from bim2sim.elements import hvac_elements as hvac
+from bim2sim.tasks.hvac.connect_elements import ConnectElements
+from test.unit.elements.helper import SetupHelperHVAC
+
+
+class TestInnerConnections(unittest.TestCase):
+    """Test batched decisions for inner connections."""
+
+    helper = None
+
+    @classmethod
+    def setUpClass(cls):
+        cls.helper = SetupHelperHVAC()
+
+    def tearDown(self):
+        self.helper.reset()
+
+    def test_decisions_grouped_by_port_layout(self):
+        """Structurally identical elements share one VL and RL decision."""
+        heaters = [self.helper.element_generator(hvac.SpaceHeater)
+                   for i in range(5)]
+        other = self.helper.element_generator(hvac.SpaceHeater)
+        other.ports[1].flow_direction = -1
+        for element in heaters + [other]:
+            element.inner_connections.clear()
+
+        gen = ConnectElements.check_inner_connections(heaters + [other])
+        decisions = next(gen)
+        self.assertEqual(4, len(decisions))
+        for decision in decisions:
+            # select second port as VL and first as RL for all elements
+            decision.value = decision.choices[1] if decision.key == 'VL' \
+                else decision.choices[0]
+        with self.assertRaises(StopIteration):
+            next(gen)
+
+        for element in heaters + [other]:
+            self.assertEqual(1, len(element.inner_connections))
+        for heater in heaters:
+            vl, rl = heater.inner_connections[0]
+            self.assertIs(heater.ports[1], vl)
+            self.assertIs(heater.ports[0], rl)
+            self.assertEqual(1, vl.flow_side)
+            self.assertEqual(-1, rl.flow_side)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -112,6 +112,15 @@ class TestStandardLibraryExports(TestTask):
             'Modelica.Utilities.Files.loadResource("C:\\\\Users")',
             parse_to_modelica(None, Path(r'C:\Users')))
 
+    def test_init_factory_reuses_lookup(self):
+        """ Test if the factory lookup is restored for the same libraries."""
+        ModelicaElement.init_factory(self.loaded_libs)
+        lookup = dict(ModelicaElement.lookup)
+        ModelicaElement.lookup = {}
+        ModelicaElement.init_factory(self.loaded_libs)
+        self.assertTrue(lookup)
+        self.assertEqual(lookup, ModelicaElement.lookup)
+
     def test_missing_required_parameter(self):
         """ Test if an AssertionError is raised if a required parameter is not
             provided."""
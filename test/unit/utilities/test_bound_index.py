@@ -0,0 +1,136 @@
+import unittest
+from types import SimpleNamespace
+
+from OCC.Core.BRepPrimAPI import BRepPrimAPI_MakeBox
+from OCC.Core.gp import gp_XYZ, gp_Pnt
+
+from bim2sim.utilities.bound_index import SpaceBoundaryIndex, \
+    ElementBoxIndex, OpeningIndex
+
+
+def make_bound(guid, center, related_element=None):
+    return SimpleNamespace(
+        guid=guid,
+        bound_center=gp_XYZ(*center),
+        ifc=SimpleNamespace(RelatedBuildingElement=related_element))
+
+
+class TestSpaceBoundaryIndex(unittest.TestCase):
+
+    def setUp(self):
+        self.elements = {}
+        for i in range(10):
+            bound = make_bound(f'vb{i}', (i * 2., 0., 0.))
+            self.elements[bound.guid] = bound
+        physical = make_bound('pb', (0., 0., 0.), related_element='wall')
+        self.elements[physical.guid] = physical
+        self.index = SpaceBoundaryIndex(self.elements)
+
+    def test_query_virtual(self):
+        """Test if only close virtual bounds are returned in dict order."""
+        bound = make_bound('search', (4.5, 0., 0.))
+        result = self.index.query_virtual(bound, 0.7)
+        self.assertEqual(['vb2'], [b.guid for b in result])
+        result = self.index.query_virtual(bound, 2.)
+        self.assertEqual(['vb2', 'vb3'], [b.guid for b in result])
+        bound = make_bound('search', (0., 0., 0.))
+        result = self.index.query_virtual(bound, 0.1)
+        self.assertEqual(['vb0'], [b.guid for b in result])
+
+    def test_rebuild_on_change(self):
+        """Test if added and removed bounds are considered."""
+        bound = make_bound('search', (4., 0., 0.))
+        self.assertEqual(['vb2'], [
+            b.guid for b in self.index.query_virtual(bound, 0.5)])
+        del self.elements['vb2']
+        new = make_bound('new', (4.1, 0., 0.))
+        self.elements[new.guid] = new
+        self.elements['other'] = make_bound('other', (100., 0., 0.))
+        self.assertEqual(['new'], [
+            b.guid for b in self.index.query_virtual(bound, 0.5)])
+
+    def test_rebuild_on_invalidate(self):
+        """Test if moved bounds are considered after invalidation."""
+        bound = make_bound('search', (4., 0., 0.))
+        self.assertEqual(['vb2'], [
+            b.guid for b in self.index.query_virtual(bound, 0.5)])
+        self.elements['vb2'].bound_center = gp_XYZ(50., 0., 0.)
+        self.elements['vb5'].bound_center = gp_XYZ(4.2, 0., 0.)
+        self.index.invalidate()
+        self.assertEqual(['vb5'], [
+            b.guid for b in self.index.query_virtual(bound, 0.5)])
+
+
+class TestElementBoxIndex(unittest.TestCase):
+
+    def test_query_point(self):
+        """Test if elements with a box containing the point are returned."""
+        shapes = {}
+        index = ElementBoxIndex(shapes=shapes)
+        index.add('wall0', BRepPrimAPI_MakeBox(1., 1., 1.).Shape())
+        index.add('wall1', BRepPrimAPI_MakeBox(
+            gp_Pnt(1., 0., 0.), 1., 1., 1.).Shape())
+        self.assertIn('wall0', index)
+        self.assertEqual({'wall0'}, index.query_point((0.5, 0.5, 0.5)))
+        self.assertEqual({'wall0', 'wall1'}, index.query_point((1., 0.5, 0.)))
+        self.assertEqual(set(), index.query_point((5., 0.5, 0.5)))
+        # shapes are shared with other indices
+        other_index = ElementBoxIndex(shapes=shapes)
+        self.assertIs(shapes['wall1'], other_index.get_shape('wall1'))
+        self.assertNotIn('wall1', other_index)
+
+
+class FakeEntity(SimpleNamespace):
+
+    def id(self):
+        return self.step_id
+
+
+class TestOpeningIndex(unittest.TestCase):
+
+    def setUp(self):
+        self.space = FakeEntity(step_id=1)
+        other_space = FakeEntity(step_id=2)
+        self.window_bounds = [
+            SimpleNamespace(guid=f'wb{i}', ifc=FakeEntity(RelatingSpace=space))
+            for i, space in enumerate((self.space, other_space, self.space))]
+        self.window = SimpleNamespace(
+            guid='window', space_boundaries=self.window_bounds)
+        fill = SimpleNamespace(
+            RelatedBuildingElement=SimpleNamespace(GlobalId='window'))
+        opening = SimpleNamespace(RelatedOpeningElement=SimpleNamespace(
+            HasFillings=[fill]))
+        self.wall = SimpleNamespace(
+            guid='wall', ifc=SimpleNamespace(HasOpenings=[opening]))
+        self.index = OpeningIndex({'window': self.window, 'wall': self.wall})
+
+    def test_get_openings(self):
+        """Test if the fillings of the openings are found."""
+        self.assertEqual([self.window], self.index.get_openings(self.wall))
+        slab = SimpleNamespace(guid='slab', ifc=SimpleNamespace())
+        self.assertEqual([], self.index.get_openings(slab))
+
+    def test_get_opening_bounds(self):
+        """Test if opening bounds are grouped by their space."""
+        self.assertEqual(
+            ['wb0', 'wb2'], [b.guid for b in self.index.get_opening_bounds(
+                self.window, self.space)])
+        self.assertEqual([], self.index.get_opening_bounds(
+            self.window, FakeEntity(step_id=3)))
+
+    def test_box_distances(self):
+        """Test if box distances are lower limits of shape distances."""
+        bound = SimpleNamespace(
+            guid='b0', bound_shape=BRepPrimAPI_MakeBox(1., 1., 1.).Shape())
+        other = SimpleNamespace(guid='b1', bound_shape=BRepPrimAPI_MakeBox(
+            gp_Pnt(3., 0., 0.), 1., 1., 1.).Shape())
+        self.assertAlmostEqual(2., self.index.box_distance(bound, other),
+                               delta=1e-3)
+        self.assertAlmostEqual(0., self.index.point_distance(
+            bound, (0.5, 0.5, 0.5)))
+        self.assertAlmostEqual(5., self.index.point_distance(
+            bound, (4., 5., 0.5)), delta=1e-3)
+
+
+if __name__ == '__main__':
+    unittest.main()
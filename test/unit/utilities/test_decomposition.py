@@ -0,0 +1,64 @@
+import unittest
+
+from bim2sim.tasks.common.inner_loop_remover import is_convex_no_holes
+from bim2sim.utilities.decomposition import ConvexDecomposer
+from bim2sim.utilities.pyocc_tools import PyOCCTools
+
+L_SHAPE = [(0., 0., 0.), (2., 0., 0.), (2., 1., 0.), (1., 1., 0.),
+           (1., 3., 0.), (0., 3., 0.)]
+
+
+class TestConvexDecomposer(unittest.TestCase):
+
+    def assert_valid_decomposition(self, shape, pieces):
+        self.assertGreater(len(pieces), 1)
+        self.assertAlmostEqual(
+            PyOCCTools.get_shape_area(shape),
+            sum(PyOCCTools.get_shape_area(piece) for piece in pieces),
+            places=4)
+        normal = PyOCCTools.simple_face_normal(shape)
+        for piece in pieces:
+            self.assertTrue(is_convex_no_holes(piece))
+            self.assertAlmostEqual(
+                1., PyOCCTools.simple_face_normal(piece).Dot(normal),
+                places=4)
+
+    def test_congruent_polygons_decomposed_once(self):
+        """Test if congruent polygons reuse the cached decomposition."""
+        decomposer = ConvexDecomposer()
+        shape = PyOCCTools.make_faces_from_pnts(L_SHAPE)
+        # same polygon moved, standing upright and with other start vertex
+        moved = [(x + 5., 2., y) for x, y, _ in L_SHAPE]
+        moved = moved[2:] + moved[:2]
+        moved_shape = PyOCCTools.make_faces_from_pnts(moved)
+        self.assert_valid_decomposition(shape, decomposer.decompose(shape))
+        self.assert_valid_decomposition(
+            moved_shape, decomposer.decompose(moved_shape))
+        self.assertEqual(1, decomposer.misses)
+        self.assertEqual(1, decomposer.hits)
+
+    def test_nearly_congruent_polygons_keep_own_vertices(self):
+        """Test if cached pieces use the exact vertices of the face."""
+        decomposer = ConvexDecomposer()
+        shape = PyOCCTools.make_faces_from_pnts(L_SHAPE)
+        nearly = [(x + 1e-7 * y, y, z) for x, y, z in L_SHAPE]
+        nearly_shape = PyOCCTools.make_faces_from_pnts(nearly)
+        decomposer.decompose(shape)
+        pieces = decomposer.decompose(nearly_shape)
+        self.assertEqual(1, decomposer.hits)
+        self.assert_valid_decomposition(nearly_shape, pieces)
+        for piece in pieces:
+            for pnt in PyOCCTools.get_points_of_face(piece):
+                self.assertIn(pnt.Coord(), nearly)
+
+    def test_prefetch(self):
+        """Test if prefetched decompositions are used."""
+        decomposer = ConvexDecomposer()
+        shape = PyOCCTools.make_faces_from_pnts(L_SHAPE)
+        self.assertEqual(1, decomposer.prefetch([shape, shape]))
+        self.assert_valid_decomposition(shape, decomposer.decompose(shape))
+        self.assertEqual(0, decomposer.misses)
+
+
+if __name__ == '__main__':
+    unittest.main()
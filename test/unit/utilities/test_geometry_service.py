@@ -0,0 +1,52 @@
+import json
+import tempfile
+import unittest
+from pathlib import Path
+
+import ifcopenshell
+
+from bim2sim.utilities.geometry_service import GeometryStats, get_settings
+
+
+class TestGeometryService(unittest.TestCase):
+
+    def test_get_settings(self):
+        """Test if settings of a profile are created once and shared."""
+        settings = get_settings('space_shape')
+        self.assertIs(settings, get_settings('space_shape'))
+        self.assertTrue(settings.get(settings.USE_WORLD_COORDS))
+        self.assertFalse(get_settings('product_shape').get(
+            settings.USE_WORLD_COORDS))
+        with self.assertRaises(KeyError):
+            get_settings('unknown')
+
+    def test_stats(self):
+        """Test if timings and failures are recorded per class and branch."""
+        ifc_file = ifcopenshell.file()
+        wall = ifc_file.create_entity('IfcWall')
+        slab = ifc_file.create_entity('IfcSlab')
+        stats = GeometryStats()
+        self.assertFalse(stats)
+        with stats.measure(wall, 'tessellation'):
+            pass
+        with self.assertRaises(ValueError):
+            with stats.measure(wall, 'tessellation'):
+                raise ValueError
+        stats.record('IfcSlab', 'post_processing', 10., entity_id=slab.id())
+        report = stats.report()
+        self.assertEqual(2, len(report))
+        self.assertEqual('post_processing', report[0]['branch'])
+        self.assertEqual(slab.id(), report[0]['slowest_entity'])
+        self.assertEqual(2, report[1]['count'])
+        self.assertEqual(1, report[1]['failures'])
+        with tempfile.TemporaryDirectory() as directory:
+            path = Path(directory) / 'geometry_stats.json'
+            stats.save(path)
+            with open(path) as f:
+                self.assertEqual(report, json.load(f))
+        stats.reset()
+        self.assertFalse(stats)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,95 @@
+import unittest
+
+import numpy as np
+from OCC.Core.BRepExtrema import BRepExtrema_DistShapeShape
+from OCC.Core.BRepPrimAPI import BRepPrimAPI_MakeBox
+from OCC.Core.gp import gp_Pnt
+
+from bim2sim.utilities.point_sampling import barycentric_grid, \
+    sample_points_on_mesh, get_mesh_arrays, PointCloudCache
+from bim2sim.utilities.pyocc_tools import PyOCCTools
+
+
+class TestSampling(unittest.TestCase):
+
+    def test_barycentric_grid(self):
+        """test that grid weights are on the triangle and sum up to one"""
+        for k in range(1, 6):
+            weights = barycentric_grid(k)
+            self.assertEqual((k + 1) * (k + 2) // 2, len(weights))
+            np.testing.assert_allclose(weights.sum(axis=1), 1.)
+            self.assertTrue((weights >= 0).all())
+
+    def test_sample_points_on_mesh(self):
+        """test that samples lie on the mesh and follow the triangle areas"""
+        vertices = np.array([[0., 0., 0.], [1., 0., 0.], [0., 1., 0.],
+                             [0., 0., 1.], [0., 0., 2.], [4., 0., 0.]])
+        triangles = np.array([[0, 1, 2], [0, 5, 4]])
+        points = sample_points_on_mesh(vertices, triangles, 1000)
+        self.assertGreater(len(points), 500)
+        self.assertLess(len(points), 1500)
+        np.testing.assert_array_equal(vertices, points[:len(vertices)])
+        on_first = (points[:, 2] == 0) & (points[:, 0] + points[:, 1] <= 1)
+        on_second = (points[:, 1] == 0) & (points[:, 0] / 4 + points[:, 2] / 2
+                                           <= 1 + 1e-12)
+        self.assertTrue((on_first | on_second).all())
+        # the second triangle has eight times the area of the first one
+        self.assertGreater(on_second.sum(), 4 * on_first.sum())
+
+    def test_sample_points_on_empty_mesh(self):
+        vertices = np.empty((0, 3))
+        points = sample_points_on_mesh(vertices, np.empty((0, 3), int), 100)
+        self.assertEqual((0, 3), points.shape)
+
+
+class TestPointCloudCache(unittest.TestCase):
+
+    def test_mesh_arrays(self):
+        """test the mesh of a box in global coordinates"""
+        box = BRepPrimAPI_MakeBox(gp_Pnt(1., 2., 3.), 1., 1., 1.).Shape()
+        vertices, triangles = get_mesh_arrays(box)
+        self.assertEqual(12, len(triangles))
+        np.testing.assert_allclose([1., 2., 3.], vertices.min(axis=0))
+        np.testing.assert_allclose([2., 3., 4.], vertices.max(axis=0))
+
+    def test_distance(self):
+        """test point based distance against the exact distance"""
+        box1 = BRepPrimAPI_MakeBox(gp_Pnt(0., 0., 0.), 1., 1., 1.).Shape()
+        box2 = BRepPrimAPI_MakeBox(gp_Pnt(2., 0.5, 0.), 1., 1., 1.).Shape()
+        exact = BRepExtrema_DistShapeShape(box1, box2).Value()
+        cache = PointCloudCache()
+        distance = cache.distance(box1, box2, 10000)
+        self.assertAlmostEqual(exact, distance, places=2)
+        self.assertEqual(2, cache.misses)
+        self.assertAlmostEqual(distance, PyOCCTools.
+                               calculate_point_based_distance(box1, box2, 1e4))
+        cache.distance(box1, box2, 10000)
+        self.assertEqual(2, cache.misses)
+        self.assertEqual(2, cache.hits)
+
+    def test_cache_is_limited(self):
+        cache = PointCloudCache(maxsize=2)
+        boxes = [BRepPrimAPI_MakeBox(float(i + 1), 1., 1.).Shape()
+                 for i in range(3)]
+        for box in boxes:
+            cache.get_points(box, 100)
+        self.assertEqual(2, len(cache._entries))
+        cache.get_points(boxes[0], 100)
+        self.assertEqual(4, cache.misses)
+
+    def test_cache_is_limited_by_points(self):
+        """test that old entries are removed if the points exceed max_points
+        """
+        cache = PointCloudCache(max_points=1500)
+        boxes = [BRepPrimAPI_MakeBox(float(i + 1), 1., 1.).Shape()
+                 for i in range(3)]
+        for box in boxes:
+            cache.get_points(box, 1000)
+        self.assertEqual(1, len(cache._entries))
+        cache.clear()
+        self.assertEqual(0, len(cache._entries))
+        self.assertEqual(0, cache._n_points)
+
+
+if __name__ == '__main__':
+    unittest.main()
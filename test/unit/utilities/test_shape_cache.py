@@ -0,0 +1,65 @@
+import tempfile
+import unittest
+from pathlib import Path
+
+import ifcopenshell
+from OCC.Core.BRepPrimAPI import BRepPrimAPI_MakeBox
+
+from bim2sim.utilities.pyocc_tools import PyOCCTools
+from bim2sim.utilities.shape_cache import ShapeCache, cached_shape, \
+    set_shape_cache
+
+test_rsrc_path = Path(__file__).parent.parent.parent / 'resources'
+
+
+class TestShapeCache(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.ifc_path = test_rsrc_path / 'arch/ifc/AC20-FZK-Haus.ifc'
+        self.ifc_file = ifcopenshell.open(str(self.ifc_path))
+        self.cache = ShapeCache(Path(self.temp_dir.name))
+        self.cache.register_file(self.ifc_file, self.ifc_path)
+
+    def tearDown(self):
+        set_shape_cache(None)
+        self.temp_dir.cleanup()
+
+    def test_put_and_get(self):
+        """Test if a stored shape is restored with the same volume."""
+        entity = self.ifc_file.by_type('IfcWall')[0]
+        shape = BRepPrimAPI_MakeBox(1., 2., 3.).Shape()
+        self.assertIsNone(self.cache.get(entity, 'test'))
+        self.cache.put(entity, 'test', shape)
+        restored = self.cache.get(entity, 'test')
+        self.assertAlmostEqual(PyOCCTools.get_shape_volume(restored), 6.)
+        self.assertEqual(1, self.cache.hits)
+        self.assertIsNone(self.cache.get(entity, 'other_profile'))
+
+    def test_unregistered_file(self):
+        """Test if entities of unregistered files are not cached."""
+        other_file = ifcopenshell.open(str(self.ifc_path))
+        entity = other_file.by_type('IfcWall')[0]
+        self.cache.put(entity, 'test', BRepPrimAPI_MakeBox(1., 1., 1.).Shape())
+        self.assertFalse(self.cache.contains(entity, 'test'))
+
+    def test_cached_shape(self):
+        """Test if shapes are only created once with active cache."""
+        entity = self.ifc_file.by_type('IfcWall')[0]
+        calls = []
+
+        def create():
+            calls.append(1)
+            return BRepPrimAPI_MakeBox(1., 1., 1.).Shape()
+
+        set_shape_cache(self.cache)
+        cached_shape(entity, 'test', create)
+        cached_shape(entity, 'test', create)
+        self.assertEqual(1, len(calls))
+        set_shape_cache(None)
+        cached_shape(entity, 'test', create)
+        self.assertEqual(2, len(calls))
+
+
+if __name__ == '__main__':
+    unittest.main()
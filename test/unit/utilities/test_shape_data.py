@@ -0,0 +1,94 @@
+import unittest
+
+from OCC.Core.BRepPrimAPI import BRepPrimAPI_MakeBox
+from OCC.Core.TopLoc import TopLoc_Location
+from OCC.Core.gp import gp_Pnt, gp_Trsf, gp_Vec
+
+from bim2sim.utilities.pyocc_tools import PyOCCTools
+from bim2sim.utilities.shape_data import ShapeDataCache
+
+
+def get_box_face(origin=(0., 0., 0.)):
+    box = BRepPrimAPI_MakeBox(gp_Pnt(*origin), 1., 2., 3.).Shape()
+    return PyOCCTools.get_faces_from_shape(box)[0]
+
+
+class TestShapeDataCache(unittest.TestCase):
+
+    def test_values_are_computed_once(self):
+        """test that values are computed once per shape and name"""
+        cache = ShapeDataCache()
+        face = get_box_face()
+        calls = []
+        for _ in range(3):
+            value = cache.get(face, 'area', lambda: calls.append(1) or 6.)
+            self.assertEqual(6., value)
+        self.assertEqual(1, len(calls))
+        self.assertEqual(2, cache.hits)
+        self.assertEqual(1, cache.misses)
+
+    def test_shape_identity(self):
+        """test that orientation and location distinguish shapes"""
+        cache = ShapeDataCache()
+        face = get_box_face()
+        trsf = gp_Trsf()
+        trsf.SetTranslation(gp_Vec(1., 0., 0.))
+        moved = face.Moved(TopLoc_Location(trsf))
+        reversed_face = face.Reversed()
+        cache.get(face, 'name', lambda: 'face')
+        cache.get(moved, 'name', lambda: 'moved')
+        cache.get(reversed_face, 'name', lambda: 'reversed')
+        self.assertEqual('face', cache.get(face, 'name', lambda: None))
+        self.assertEqual('moved', cache.get(moved, 'name', lambda: None))
+        self.assertEqual(
+            'reversed', cache.get(reversed_face, 'name', lambda: None))
+
+    def test_invalidate(self):
+        """test that invalidation drops values and creates a new version"""
+        cache = ShapeDataCache()
+        face = get_box_face()
+        data = cache.get_data(face)
+        cache.get(face, 'area', lambda: 6.)
+        cache.invalidate(face)
+        self.assertFalse(data.valid)
+        self.assertIsNone(cache.version(face))
+        self.assertEqual(7., cache.get(face, 'area', lambda: 7.))
+        self.assertNotEqual(data.version, cache.version(face))
+        cache.invalidate(None)
+        cache.clear()
+        self.assertEqual(0, len(cache._entries))
+
+    def test_maxsize(self):
+        cache = ShapeDataCache(maxsize=2)
+        faces = [get_box_face((float(i), 0., 0.)) for i in range(3)]
+        for face in faces:
+            cache.get(face, 'area', lambda: 6.)
+        self.assertEqual(2, len(cache._entries))
+
+
+class TestCachedPyOCCTools(unittest.TestCase):
+
+    def test_cached_helpers(self):
+        """test that cached helpers return equal, but new objects"""
+        face = get_box_face()
+        area = PyOCCTools.get_shape_area(face)
+        center = PyOCCTools.get_center_of_face(face)
+        normal = PyOCCTools.simple_face_normal(face)
+        points = PyOCCTools.get_points_of_face(face)
+        box = PyOCCTools.get_minimal_bounding_box(face)
+        self.assertIsNot(center, PyOCCTools.get_center_of_face(face))
+        self.assertTrue(center.IsEqual(
+            PyOCCTools.get_center_of_face(face), 1e-9))
+        self.assertTrue(normal.IsEqual(
+            PyOCCTools.simple_face_normal(face), 1e-9))
+        self.assertTrue(normal.Reversed().IsEqual(
+            PyOCCTools.simple_face_normal(face.Reversed()), 1e-9))
+        self.assertEqual(area, PyOCCTools.get_shape_area(face))
+        self.assertEqual(box, PyOCCTools.get_minimal_bounding_box(face))
+        self.assertEqual(
+            [p.Coord() for p in points],
+            [p.Coord() for p in PyOCCTools.get_points_of_face(face)])
+
+
+if __name__ == '__main__':
+    unittest.main()
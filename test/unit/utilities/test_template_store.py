@@ -0,0 +1,93 @@
+import ast
+import unittest
+
+from bim2sim.utilities.common_functions import get_type_building_elements, \
+    get_material_templates
+from bim2sim.utilities.template_store import YearRangeIndex, \
+    get_template_store, get_resumed_material_templates, content_key
+
+DATA_FILES = ['TypeElements_IWU.json', 'TypeElements_KFW.json',
+              'TypeElements_TABULA_DE.json', 'TypeElements_TABULA_DK.json']
+
+
+def reference_options(years_dict: dict, year: int):
+    """Lookup of the year range as implemented before in EnrichMaterial."""
+    if len(years_dict) == 1:
+        return years_dict[list(years_dict.keys())[0]]
+    for year_range, template in years_dict.items():
+        years = ast.literal_eval(year_range)
+        if years[0] <= year <= years[1]:
+            return template
+    return None
+
+
+class TestYearRangeIndex(unittest.TestCase):
+
+    def test_parity_with_linear_search(self):
+        """test the index against the linear search for all data files,
+        including files with overlapping year ranges"""
+        for data_file in DATA_FILES:
+            templates = get_type_building_elements(data_file)
+            for element_type, years_dict in templates.items():
+                index = YearRangeIndex(years_dict)
+                for year in range(-1, 2110):
+                    self.assertIs(
+                        reference_options(years_dict, year), index.get(year),
+                        f"{data_file} {element_type} {year}")
+
+    def test_overlapping_ranges(self):
+        """test that the first range of overlapping ranges is used"""
+        years_dict = {'[0, 1950]': 'a', '[1900, 2000]': 'b',
+                      '[1800, 1850]': 'c'}
+        index = YearRangeIndex(years_dict)
+        self.assertEqual('a', index.get(1800))
+        self.assertEqual('a', index.get(1950))
+        self.assertEqual('b', index.get(1951))
+        self.assertEqual('b', index.get(2000))
+        self.assertIsNone(index.get(2001))
+        self.assertIsNone(index.get(-1))
+
+
+class TestTemplateStore(unittest.TestCase):
+
+    def test_store_is_shared(self):
+        """test that each data file is loaded only once"""
+        store = get_template_store('TypeElements_IWU.json')
+        self.assertIs(store, get_template_store('TypeElements_IWU.json'))
+        self.assertIn('OuterWall', store.element_types)
+
+    def test_get_template(self):
+        """test template lookup including the window fallback"""
+        store = get_template_store('TypeElements_IWU.json')
+        template = store.get_template('OuterWall', 1900, 'iwu_heavy')
+        self.assertIs(
+            store.templates['OuterWall']['[0, 1918]']['iwu_heavy'], template)
+        window = store.get_template('Window', 2010, 'unknown window')
+        self.assertIsNotNone(window)
+
+    def test_resumed_material_templates(self):
+        """test that material templates are resumed once by their name"""
+        resumed = get_resumed_material_templates()
+        self.assertIs(resumed, get_resumed_material_templates())
+        # as before, the last template wins for duplicate names
+        last_templates = {template['name']: template for template in
+                          get_material_templates().values()}
+        self.assertEqual(len(last_templates), len(resumed))
+        for template in last_templates.values():
+            resumed_template = resumed[template['name']]
+            self.assertEqual(template['name'], resumed_template['material'])
+            self.assertEqual(template['thickness_default'],
+                             resumed_template['thickness'])
+            self.assertNotIn('thickness_list', resumed_template)
+
+    def test_content_key(self):
+        """test that identical templates have the same key"""
+        template = {'material': 'brick', 'density': 1800, 'layer': [1, 2]}
+        same = {'layer': [1, 2], 'density': 1800, 'material': 'brick'}
+        other = dict(template, density=1900)
+        self.assertEqual(content_key(template), content_key(same))
+        self.assertNotEqual(content_key(template), content_key(other))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,58 @@
+import unittest
+
+from bim2sim.utilities.common_functions import get_pattern_usage, \
+    get_use_conditions_dict, wildcard_match
+from bim2sim.utilities.usage_matching import UsageMatcher, \
+    get_usage_matcher, split_usage_name
+
+
+def reference_match(pattern_usage: dict, name: str) -> list:
+    """Matching as implemented before in EnrichUseConditions."""
+    matches = []
+    for usage in pattern_usage.keys():
+        for cus_usage in pattern_usage[usage].get("custom", []):
+            if wildcard_match(cus_usage, name) and usage not in matches:
+                matches.append(usage)
+        if len(matches) == 0:
+            for pattern in pattern_usage[usage]["common"]:
+                for word in split_usage_name(name):
+                    if pattern.match(word) and usage not in matches:
+                        matches.append(usage)
+    return matches
+
+
+class TestUsageMatcher(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.use_conditions = get_use_conditions_dict(None)
+        cls.pattern_usage = get_pattern_usage(cls.use_conditions, None)
+
+    def test_match_parity(self):
+        """Test if matches equal the previous matching implementation."""
+        matcher = UsageMatcher(self.pattern_usage)
+        names = list(self.use_conditions.keys()) + [
+            'Wohnen', 'Büro 1.02', 'Kitchen (EG)', 'Flur', 'Office - Group',
+            'WC Damen', 'Schlafzimmer', 'Space_13', 'xyz 123', 'Lager']
+        for name in names + names:
+            self.assertEqual(reference_match(self.pattern_usage, name),
+                             matcher.match(name), name)
+
+    def test_custom_usages(self):
+        """Test if custom wildcard patterns are checked first."""
+        pattern_usage = get_pattern_usage(self.use_conditions, None)
+        pattern_usage['Living']['custom'] = ['Room_*']
+        matcher = UsageMatcher(pattern_usage)
+        self.assertEqual(['Living'], matcher.match('Room_12'))
+        self.assertEqual(reference_match(pattern_usage, 'Office Room_12'),
+                         matcher.match('Office Room_12'))
+
+    def test_get_usage_matcher_cached(self):
+        """Test if matchers are reused for the same input data."""
+        matcher = get_usage_matcher(self.use_conditions, None)
+        self.assertIs(matcher, get_usage_matcher(self.use_conditions, None))
+        self.assertIn('Living', matcher)
+
+
+if __name__ == '__main__':
+    unittest.main()